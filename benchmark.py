@@ -0,0 +1,389 @@
+"""Benchmarks for the recolor tool, run against the bundled mock VTube Studio.
+
+    python benchmark.py --meshes 3000 --latency 2 --jitter 1
+
+Covers group apply throughput, scene apply, multi-instance fan-out, artmesh refresh latency,
+catalog, filter and rule group cost, message encode/decode cost and startup time. Results are written as JSON
+(by default to benchmark_results/<date>-<time>.json) so runs can be
+compared over time. No VTube Studio or display is needed.
+"""
+import json
+import asyncio
+import argparse
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from mock_vts_server import MockVTubeStudio
+from vtube_recolor_tool import (
+    ArtMeshCatalog,
+    ClientPool,
+    IncrementalFilter,
+    MessageCodec,
+    VTubeStudioClient,
+    configure_logging,
+    orjson,
+    resolve_scene,
+)
+
+RESULTS_DIR = "benchmark_results"
+
+
+def summarize(samples):
+    """Timing summary in milliseconds for a list of durations in seconds"""
+    ms = sorted(sample * 1000 for sample in samples)
+    return {
+        "runs": len(ms),
+        "min_ms": round(ms[0], 3),
+        "median_ms": round(statistics.median(ms), 3),
+        "p95_ms": round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 3),
+        "mean_ms": round(statistics.fmean(ms), 3),
+    }
+
+
+def progress(message):
+    print(message, file=sys.stderr, flush=True)
+
+
+async def connected_client(server):
+    client = VTubeStudioClient()
+    client.uri = server.uri
+    if not await client.connect():
+        raise ConnectionError(f"could not reach the mock server at {server.uri}")
+    await client.authenticate()
+    return client
+
+
+async def bench_startup(server, runs):
+    """Connect, authenticate and load the artmesh list with a fresh client"""
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        client = await connected_client(server)
+        await client.get_artmeshes()
+        samples.append(time.perf_counter() - started)
+        await client.close()
+
+    # Cold start of the module itself, in a fresh interpreter
+    import_samples = []
+    for _ in range(min(runs, 5)):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "import vtube_recolor_tool"], check=True,
+                       cwd=os.path.dirname(os.path.abspath(__file__)))
+        import_samples.append(time.perf_counter() - started)
+    return {"connect_to_artmeshes": summarize(samples), "import": summarize(import_samples)}
+
+
+async def bench_group_apply(server, sizes, runs):
+    """Tint one group of each size, alternating colors so nothing is skipped"""
+    client = await connected_client(server)
+    catalog = await client.get_artmeshes()
+    results = {}
+    try:
+        for size in sizes:
+            names = catalog.names[:size]
+            samples = []
+            requests_before = client.requests_sent
+            for run in range(runs):
+                shade = (run % 2) * 0.5
+                started = time.perf_counter()
+                tinted, failed, _ = await client.tint_artmeshes(names, shade, 0.2, 0.4, 1.0)
+                samples.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            await client.tint_artmeshes(names, shade, 0.2, 0.4, 1.0)
+            unchanged = time.perf_counter() - started
+
+            summary = summarize(samples)
+            summary["meshes_per_s"] = round(size / statistics.median(samples))
+            summary["requests_per_apply"] = (client.requests_sent - requests_before) / runs
+            summary["failed_last_run"] = len(failed)
+            summary["unchanged_reapply_ms"] = round(unchanged * 1000, 3)
+            results[str(size)] = summary
+        results["client_metrics"] = client.metrics.snapshot()
+    finally:
+        await client.close()
+    return results
+
+
+async def bench_scene_apply(server, group_count, runs):
+    """Apply every artmesh split over ``group_count`` groups/colors"""
+    client = await connected_client(server)
+    catalog = await client.get_artmeshes()
+    samples = []
+    requests_before = client.requests_sent
+    try:
+        for run in range(runs):
+            colors = [[(i * 37 + run * 101) % 256, (i * 71) % 256, run % 2 * 255] for i in range(group_count)]
+            mesh_colors = {name: colors[i % group_count] for i, name in enumerate(catalog.names)}
+            started = time.perf_counter()
+            await client.tint_scene(mesh_colors)
+            samples.append(time.perf_counter() - started)
+    finally:
+        await client.close()
+    summary = summarize(samples)
+    summary["groups"] = group_count
+    summary["requests_per_apply"] = (client.requests_sent - requests_before) / runs
+    return summary
+
+
+async def bench_refresh(server, runs):
+    """Artmesh list refresh, both unchanged and after a model switch"""
+    client = await connected_client(server)
+    mesh_count = len(server.names)
+    unchanged, switched = [], []
+    try:
+        await client.get_artmeshes()
+        for run in range(runs):
+            started = time.perf_counter()
+            await client.get_artmeshes()
+            unchanged.append(time.perf_counter() - started)
+
+            server.set_model(mesh_count + 1 + run % 2, notify=False)
+            started = time.perf_counter()
+            await client.get_artmeshes()
+            switched.append(time.perf_counter() - started)
+    finally:
+        server.set_model(mesh_count, "mock-model", notify=False)
+        await client.close()
+    return {"unchanged": summarize(unchanged), "model_switch": summarize(switched)}
+
+
+async def bench_fan_out(args, instance_count, runs):
+    """Apply a scene to several mock instances, one after another and at once"""
+    servers = [
+        MockVTubeStudio(mesh_count=args.meshes, latency=args.latency * (i + 1) / 1000,
+                        jitter=args.jitter / 1000, port=0, seed=i)
+        for i in range(instance_count)
+    ]
+    for server in servers:
+        await server.start()
+    pool = ClientPool()
+    for i, server in enumerate(servers):
+        pool.add(f"instance{i}", server.uri)
+
+    sequential, concurrent, slowest = [], [], []
+    try:
+        await pool.connect()
+        for run in range(runs):
+            color = [run % 2 * 255, 128, 64]
+            scenes = {name: {"all": {"color": color, "layers": server.names}}
+                      for name, server in zip(pool.clients, servers)}
+
+            started = time.perf_counter()
+            for name in pool.clients:
+                await pool.apply_groups({name: scenes[name]}, force=True)
+            sequential.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            results = await pool.apply_groups(scenes, force=True)
+            concurrent.append(time.perf_counter() - started)
+            slowest.append(max(outcome["seconds"] for outcome in results.values()))
+    finally:
+        await pool.close()
+        for server in servers:
+            await server.stop()
+    return {
+        "instances": instance_count,
+        "sequential": summarize(sequential),
+        "concurrent": summarize(concurrent),
+        "slowest_instance": summarize(slowest),
+    }
+
+
+def bench_catalog(names, runs):
+    """Catalog build, rebuild against a previous catalog, and suggestions"""
+    build, rebuild, index, suggest = [], [], [], []
+    queries = [name + "x" for name in names[:100]]
+    for _ in range(runs):
+        started = time.perf_counter()
+        catalog = ArtMeshCatalog(names)
+        build.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        ArtMeshCatalog(names[1:] + ["ArtMeshNew"], previous=catalog)
+        rebuild.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        suggestions = catalog.suggestions
+        index.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        suggestions.suggest_many(queries)
+        suggest.append(time.perf_counter() - started)
+    return {
+        "build": summarize(build),
+        "rebuild_with_previous": summarize(rebuild),
+        "suggestion_index": summarize(index),
+        "suggest_100": summarize(suggest),
+    }
+
+
+def bench_rule_groups(names, runs):
+    """Resolving a rule group (compiled once per catalog) vs the same static group"""
+    catalog = ArtMeshCatalog(names)
+    static = {"group": {"color": [1, 2, 3], "layers": names[::2]}}
+    rules = {"group": {"color": [1, 2, 3], "layers": [], "rules": {"regex": ["[02468]$"]}}}
+    catalog.match_rules(rules["group"]["rules"])  # Compiled on the first refresh, not per apply
+    compile_samples, static_samples, rule_samples = [], [], []
+    for _ in range(runs):
+        started = time.perf_counter()
+        ArtMeshCatalog(names).match_rules(rules["group"]["rules"])
+        compile_samples.append(time.perf_counter() - started)
+        for groups, samples in ((static, static_samples), (rules, rule_samples)):
+            started = time.perf_counter()
+            resolve_scene(groups, catalog)
+            samples.append(time.perf_counter() - started)
+    return {
+        "build_and_compile": summarize(compile_samples),
+        "resolve_static": summarize(static_samples),
+        "resolve_rules_cached": summarize(rule_samples),
+    }
+
+
+def bench_filter(names, runs):
+    """Search box cost per keystroke while typing, then clearing, a query"""
+    query = names[-1] if names else "ArtMesh"
+    typing, clearing = [], []
+    name_filter = IncrementalFilter(names)
+    for _ in range(runs):
+        for end in range(1, len(query) + 1):
+            started = time.perf_counter()
+            name_filter.set_query(query[:end])
+            typing.append(time.perf_counter() - started)
+        for end in range(len(query) - 1, -1, -1):
+            started = time.perf_counter()
+            name_filter.set_query(query[:end])
+            clearing.append(time.perf_counter() - started)
+    return {"typing_keystroke": summarize(typing), "clearing_keystroke": summarize(clearing)}
+
+
+def bench_codec(names, runs):
+    """Encode/decode cost per message for each available JSON backend"""
+    chunk = names[:64]
+    tint_data = {
+        "colorTint": {"colorR": 12, "colorG": 34, "colorB": 56, "colorA": 255},
+        "artMeshMatcher": {"tintAll": False, "nameExact": chunk},
+    }
+    envelope = {"apiName": "VTubeStudioPublicAPI", "apiVersion": "1.0", "timestamp": 0, "requestID": "vrt-1"}
+    tint_response = json.dumps(dict(envelope, messageType="ColorTintResponse", data={"matchedArtMeshes": 64}))
+    list_response = json.dumps(dict(envelope, messageType="ArtMeshListResponse", data={
+        "modelLoaded": True, "numberOfArtMeshNames": len(names), "artMeshNames": names, "artMeshTags": []
+    }))
+    repeat = 1000 * runs
+
+    def per_message_us(func, count):
+        started = time.perf_counter()
+        for _ in range(count):
+            func()
+        return round((time.perf_counter() - started) / count * 1e6, 3)
+
+    results = {}
+    for backend in ["json"] + (["orjson"] if orjson is not None else []):
+        codec = MessageCodec(backend)
+        results[backend] = {
+            "encode_tint_64_us": per_message_us(
+                lambda: codec.encode("ColorTintRequest", "vrt-1", tint_data), repeat),
+            "decode_tint_us": per_message_us(lambda: codec.decode(tint_response), repeat),
+            f"decode_artmesh_list_{len(names)}_us": per_message_us(lambda: codec.decode(list_response), runs * 10),
+        }
+
+    # The pre-codec way: build the whole message and json.dumps/loads it each time
+    results["baseline_json"] = {
+        "encode_tint_64_us": per_message_us(
+            lambda: json.dumps(dict(envelope, messageType="ColorTintRequest", data=tint_data)), repeat),
+        "decode_tint_us": per_message_us(lambda: json.loads(tint_response), repeat),
+    }
+    return results
+
+
+async def run_benchmarks(args):
+    server = MockVTubeStudio(
+        mesh_count=args.meshes,
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        fail_rate=args.fail_rate,
+        port=0,
+        seed=1,
+    )
+    await server.start()
+    sizes = sorted({size for size in (10, 100, 1000, args.meshes) if size <= args.meshes})
+
+    results = {}
+    try:
+        progress("startup...")
+        results["startup"] = await bench_startup(server, args.runs)
+        progress("group apply...")
+        results["group_apply"] = await bench_group_apply(server, sizes, args.runs)
+        progress("scene apply...")
+        results["scene_apply"] = await bench_scene_apply(server, 10, args.runs)
+        progress("multi-instance fan-out...")
+        results["fan_out"] = await bench_fan_out(args, 3, args.runs)
+        progress("refresh...")
+        results["refresh"] = await bench_refresh(server, args.runs)
+        progress("catalog and filter...")
+        results["catalog"] = bench_catalog(server.names, args.runs)
+        results["filter"] = bench_filter(server.names, args.runs)
+        results["rule_groups"] = bench_rule_groups(server.names, args.runs)
+        progress("codec...")
+        results["codec"] = bench_codec(server.names, args.runs)
+    finally:
+        await server.stop()
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "meshes": args.meshes,
+            "latency_ms": args.latency,
+            "jitter_ms": args.jitter,
+            "fail_rate": args.fail_rate,
+            "runs": args.runs,
+        },
+        "server_requests": dict(server.stats),
+        "results": results,
+    }
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="Benchmark the recolor tool against a mock VTube Studio.")
+    parser.add_argument("--meshes", type=int, default=3000, help="artmeshes on the mock model (default: 3000)")
+    parser.add_argument("--latency", type=float, default=2.0, help="mock response latency in ms (default: 2)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="mock latency jitter in ms (default: 0)")
+    parser.add_argument("--fail-rate", type=float, default=0.0,
+                        help="share of tint requests the mock rejects, 0-1 (default: 0)")
+    parser.add_argument("--runs", type=int, default=10, help="repetitions per benchmark (default: 10)")
+    parser.add_argument("--output", help=f"JSON file to write (default: {RESULTS_DIR}/<date>-<time>.json)")
+    return parser
+
+
+def main():
+    args = build_arg_parser().parse_args()
+    configure_logging("warning")  # Keep the report readable
+    output = os.path.abspath(
+        args.output or os.path.join(RESULTS_DIR, time.strftime("%Y%m%d-%H%M%S") + ".json")
+    )
+
+    # The client keeps its token and caches in the working directory;
+    # use a scratch one so benchmarks never touch real settings
+    working_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as scratch:
+        os.chdir(scratch)
+        try:
+            report = asyncio.run(run_benchmarks(args))
+        finally:
+            os.chdir(working_dir)
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report["results"], indent=2))
+    print(f"Results written to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""Stand-in for the VTube Studio API, for benchmarks and testing without VTS.
+
+Speaks the part of the public API that VTubeStudioClient uses:
+authentication, ArtMeshListRequest, CurrentModelRequest, ColorTintRequest,
+EventSubscriptionRequest (ModelLoadedEvent) and APIStateRequest. Every
+request is answered concurrently after a configurable latency with
+optional jitter, and tint requests can be made to fail or go unanswered.
+
+    python mock_vts_server.py --meshes 3000 --latency 5 --jitter 2 --fail-rate 0.01
+
+Then point the tool at it as usual (it listens on ws://localhost:8001).
+"""
+import json
+import asyncio
+import random
+import argparse
+from collections import Counter
+import websockets
+
+
+class MockVTubeStudio:
+    def __init__(self, mesh_count=500, latency=0.002, jitter=0.0, fail_rate=0.0, drop_rate=0.0,
+                 host="localhost", port=8001, model_id="mock-model", seed=None):
+        self.latency = latency  # Seconds before each response
+        self.jitter = jitter  # Latency varies by up to +/- this many seconds
+        self.fail_rate = fail_rate  # Share of tint requests answered with an APIError
+        self.drop_rate = drop_rate  # Share of tint requests never answered
+        self.host = host
+        self.port = port
+        self.stats = Counter()  # Requests by messageType, plus bytes in/out
+        self._random = random.Random(seed)
+        self._server = None
+        self._subscribers = set()
+        self._tasks = set()
+        self.set_model(mesh_count, model_id, notify=False)
+
+    @property
+    def uri(self):
+        return f"ws://{self.host}:{self.port}"
+
+    def set_model(self, mesh_count, model_id=None, notify=True):
+        """Switch to a model with ``mesh_count`` artmeshes.
+
+        With ``notify`` a ModelLoadedEvent goes to subscribed clients.
+        """
+        self.model_id = model_id or f"mock-model-{mesh_count}"
+        self.model_name = f"Mock Model ({mesh_count} artmeshes)"
+        self.names = [f"ArtMesh{i}" for i in range(mesh_count)]
+        self._name_set = set(self.names)
+        if notify:
+            event = {
+                "apiName": "VTubeStudioPublicAPI",
+                "apiVersion": "1.0",
+                "messageType": "ModelLoadedEvent",
+                "data": {"modelLoaded": True, "modelName": self.model_name, "modelID": self.model_id},
+            }
+            for ws in list(self._subscribers):
+                self._spawn(self._send(ws, event))
+
+    async def start(self):
+        """Start listening; with ``port=0`` a free port is picked"""
+        self._server = await websockets.serve(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def _spawn(self, coro):
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _handle(self, ws):
+        try:
+            async for raw in ws:
+                self.stats["bytes_in"] += len(raw)
+                self._spawn(self._respond(ws, json.loads(raw)))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self._subscribers.discard(ws)
+
+    async def _send(self, ws, message):
+        raw = json.dumps(message)
+        self.stats["bytes_out"] += len(raw)
+        try:
+            await ws.send(raw)
+        except websockets.ConnectionClosed:
+            pass
+
+    async def _respond(self, ws, message):
+        message_type = message.get("messageType")
+        data = message.get("data") or {}
+        self.stats[message_type] += 1
+
+        delay = self.latency
+        if self.jitter:
+            delay += self._random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if message_type == "ColorTintRequest" and self.drop_rate and self._random.random() < self.drop_rate:
+            self.stats["dropped"] += 1
+            return
+
+        response_type, response_data = self._answer(message_type, data, ws)
+        await self._send(ws, {
+            "apiName": "VTubeStudioPublicAPI",
+            "apiVersion": "1.0",
+            "requestID": message.get("requestID", ""),
+            "messageType": response_type,
+            "data": response_data,
+        })
+
+    def _answer(self, message_type, data, ws):
+        if message_type == "AuthenticationTokenRequest":
+            return "AuthenticationTokenResponse", {"authenticationToken": "mock-token"}
+        if message_type == "AuthenticationRequest":
+            return "AuthenticationResponse", {"authenticated": True, "reason": ""}
+        if message_type == "APIStateRequest":
+            return "APIStateResponse", {"active": True, "currentSessionAuthenticated": True}
+        if message_type == "CurrentModelRequest":
+            return "CurrentModelResponse", {
+                "modelLoaded": True, "modelName": self.model_name, "modelID": self.model_id
+            }
+        if message_type == "ArtMeshListRequest":
+            return "ArtMeshListResponse", {
+                "modelLoaded": True,
+                "numberOfArtMeshNames": len(self.names),
+                "artMeshNames": self.names,
+                "artMeshTags": [],
+            }
+        if message_type == "EventSubscriptionRequest":
+            if data.get("subscribe", True):
+                self._subscribers.add(ws)
+            else:
+                self._subscribers.discard(ws)
+            return "EventSubscriptionResponse", {
+                "subscribedEventCount": 1, "subscribedEvents": [data.get("eventName")]
+            }
+        if message_type == "ColorTintRequest":
+            if self.fail_rate and self._random.random() < self.fail_rate:
+                self.stats["failed"] += 1
+                return "APIError", {"errorID": 500, "message": "Injected failure"}
+            matcher = data.get("artMeshMatcher", {})
+            if matcher.get("tintAll"):
+                return "ColorTintResponse", {"matchedArtMeshes": len(self.names)}
+            matched = {name for name in matcher.get("nameExact", []) if name in self._name_set}
+            for part in matcher.get("nameContains", []):
+                matched.update(name for name in self.names if part in name)
+            return "ColorTintResponse", {"matchedArtMeshes": len(matched)}
+        return "APIError", {"errorID": 1, "message": f"Unsupported request: {message_type}"}
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="Run a mock VTube Studio API server.")
+    parser.add_argument("--meshes", type=int, default=500, help="number of artmeshes (default: 500)")
+    parser.add_argument("--latency", type=float, default=2.0, help="response latency in ms (default: 2)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="latency jitter in ms (default: 0)")
+    parser.add_argument("--fail-rate", type=float, default=0.0,
+                        help="share of tint requests answered with an error, 0-1 (default: 0)")
+    parser.add_argument("--drop-rate", type=float, default=0.0,
+                        help="share of tint requests never answered, 0-1 (default: 0)")
+    parser.add_argument("--port", type=int, default=8001, help="port to listen on (default: 8001)")
+    return parser
+
+
+async def serve(args):
+    server = MockVTubeStudio(
+        mesh_count=args.meshes,
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        fail_rate=args.fail_rate,
+        drop_rate=args.drop_rate,
+        port=args.port,
+    )
+    await server.start()
+    print(f"Mock VTube Studio listening on {server.uri} with {args.meshes} artmeshes")
+    try:
+        await asyncio.Future()
+    finally:
+        await server.stop()
+
+
+def main():
+    try:
+        asyncio.run(serve(build_arg_parser().parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
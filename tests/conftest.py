@@ -0,0 +1,36 @@
+import os
+import sys
+
+import pytest
+
+# The tool is a pair of top-level scripts rather than a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vtube_recolor_tool import VTubeStudioClient, tint_rgba  # noqa: E402
+
+
+class RecordingClient(VTubeStudioClient):
+    """Client that records ``tint_artmeshes`` calls instead of sending them"""
+
+    def __init__(self):
+        super().__init__()
+        self.sent = []  # (names, rgba) per tint_artmeshes call
+
+    async def tint_artmeshes(self, names, r, g, b, a, chunk_size=None, force=False):
+        names = list(dict.fromkeys(names))
+        rgba = tint_rgba(r, g, b, a)
+        self.sent.append((names, rgba))
+        self.tint_state.update(names, rgba)
+        return names, [], []
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    """Run every test in an empty directory, so tokens and caches stay out of the repo"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def recording_client():
+    return RecordingClient()
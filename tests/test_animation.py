@@ -0,0 +1,34 @@
+from vtube_recolor_tool import Fade, Gradient, Pulse
+
+
+NAMES = [f"ArtMesh{i}" for i in range(9)]
+BLACK, WHITE = (0, 0, 0), (255, 255, 255)
+
+
+def test_fade_and_pulse():
+    fade = Fade(NAMES, BLACK, WHITE, duration=2.0)
+    assert set(fade.frame(1.0).values()) == {(128, 128, 128)}
+    assert set(fade.frame(5.0).values()) == {WHITE}
+    assert fade.finished(2.0) and not fade.finished(1.9)
+
+    pulse = Pulse(NAMES, BLACK, WHITE, period=2.0)
+    assert set(pulse.frame(0.0).values()) == {BLACK}
+    assert set(pulse.frame(1.0).values()) == {WHITE}
+    assert not pulse.finished(100.0)
+
+
+def test_static_gradient_runs_start_to_end():
+    colors = Gradient(NAMES, BLACK, WHITE, steps=5).frame(0.0)
+    assert colors["ArtMesh0"] == BLACK
+    assert colors["ArtMesh8"] == WHITE
+    assert [colors[name] for name in NAMES] == sorted(colors.values())
+
+
+def test_moving_gradient_first_frame_matches_the_rest():
+    gradient = Gradient(NAMES, BLACK, WHITE, steps=5, period=10.0, duration=None)
+    first, second = gradient.frame(0.0), gradient.frame(0.01)
+    # Mirrored start -> end -> start, and nothing jumps between frames
+    assert first["ArtMesh0"] == first["ArtMesh8"] == BLACK
+    assert first["ArtMesh4"] == WHITE
+    assert first == second
+    assert gradient.frame(10.0) == first
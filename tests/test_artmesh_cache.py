@@ -0,0 +1,44 @@
+import json
+import os
+
+from vtube_recolor_tool import ArtMeshListCache, artmesh_content_hash
+
+
+NAMES = ["Hair_Front", "Eye_L", "Mouth"]
+
+
+def test_round_trip_and_last_model():
+    cache = ArtMeshListCache()
+    assert cache.last_model_id() is None
+    cache.store("model/a", "Model A", NAMES, artmesh_content_hash(NAMES))
+
+    reopened = ArtMeshListCache()
+    assert reopened.last_model_id() == "model/a"
+    entry = reopened.load("model/a")
+    assert (entry["names"], entry["modelName"], entry["hash"]) == (NAMES, "Model A", artmesh_content_hash(NAMES))
+    assert reopened.load("model-b") is None
+
+
+def test_unchanged_list_is_not_rewritten():
+    cache = ArtMeshListCache()
+    cache.store("model-a", "Model A", NAMES, artmesh_content_hash(NAMES))
+    path = os.path.join(cache.directory, "model-a.json")
+    os.utime(path, (0, 0))
+
+    cache.store("model-a", "Model A", NAMES, artmesh_content_hash(NAMES))
+    assert os.path.getmtime(path) == 0
+    cache.store("model-a", "Model A", NAMES[:2], artmesh_content_hash(NAMES[:2]))
+    assert os.path.getmtime(path) != 0
+
+
+def test_corrupt_or_foreign_entries_are_ignored():
+    cache = ArtMeshListCache()
+    cache.store("model-a", "Model A", NAMES, artmesh_content_hash(NAMES))
+    path = os.path.join(cache.directory, "model-a.json")
+
+    with open(path, "w") as f:
+        json.dump({"version": 1, "modelID": "model-b", "hash": "", "names": []}, f)
+    assert cache.load("model-a") is None
+    with open(path, "w") as f:
+        f.write("{")
+    assert cache.load("model-a") is None
@@ -0,0 +1,157 @@
+import asyncio
+
+import pytest
+
+import vtube_recolor_tool
+from mock_vts_server import MockVTubeStudio
+from vtube_recolor_tool import VTubeStudioClient, encoded_size
+
+
+async def start_mock(**kwargs):
+    server = MockVTubeStudio(**dict({"mesh_count": 20, "latency": 0, "port": 0}, **kwargs))
+    await server.start()
+    return server
+
+
+def make_client(server):
+    client = VTubeStudioClient()
+    client.uri = server.uri
+    return client
+
+
+async def connected_client(server):
+    client = make_client(server)
+    assert await client.connect()
+    await client.authenticate()
+    await client.get_artmeshes()
+    return client
+
+
+async def wait_until(predicate, timeout=5.0):
+    async def poll():
+        while not predicate():
+            await asyncio.sleep(0.01)
+    await asyncio.wait_for(poll(), timeout)
+
+
+def test_tint_falls_back_per_mesh_only_for_short_chunks():
+    async def scenario():
+        server = await start_mock()
+        client = await connected_client(server)
+        try:
+            names = [f"ArtMesh{i}" for i in range(6)] + ["Mesh19", "Missing"]
+            tinted, failed, unchanged = await client.tint_artmeshes(names, 1, 0, 0, 1, chunk_size=4)
+
+            assert sorted(tinted) == sorted(names[:-1])
+            assert failed == ["Missing"]
+            assert unchanged == []
+            # 2 chunks, then exact for the 4 names of the short chunk plus
+            # contains for the 2 that missed
+            assert server.stats["ColorTintRequest"] == 2 + 4 + 2
+
+            tinted, failed, unchanged = await client.tint_artmeshes(names, 1, 0, 0, 1, chunk_size=4)
+            assert (tinted, failed) == ([], ["Missing"])
+            assert sorted(unchanged) == sorted(names[:-1])
+        finally:
+            await client.close()
+            await server.stop()
+
+    asyncio.run(scenario())
+
+
+def test_model_switch_forgets_applied_tints():
+    async def scenario():
+        server = await start_mock()
+        client = await connected_client(server)
+        try:
+            await client.subscribe_events()
+            await client.tint_artmeshes(["ArtMesh0", "ArtMesh1"], 0, 1, 0, 1)
+            assert len(client.tint_state) == 2
+
+            server.set_model(10, "other-model")
+            await wait_until(lambda: client.tint_state.model_id == "other-model")
+            assert len(client.tint_state) == 0
+        finally:
+            await client.close()
+            await server.stop()
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("model_id, replayed", [("mock-model", 1), ("other-model", 0)])
+def test_reconnect_replays_tints_for_the_same_model(monkeypatch, model_id, replayed):
+    monkeypatch.setattr(vtube_recolor_tool, "KEEPALIVE_INTERVAL", 0.05)
+    monkeypatch.setattr(vtube_recolor_tool, "RECONNECT_MIN_DELAY", 0.05)
+
+    async def scenario():
+        server = await start_mock()
+        client = make_client(server)
+        states = []
+        client.add_state_handler(states.append)
+        client.start_supervisor()
+        try:
+            await wait_until(lambda: client.state == "connected")
+            tinted, _, _ = await client.tint_artmeshes(["ArtMesh0", "ArtMesh1", "ArtMesh2"], 0, 0, 1, 1)
+            assert len(tinted) == 3
+
+            await server.stop()
+            await wait_until(lambda: client.state == "reconnecting")
+            server = await start_mock(port=server.port, model_id=model_id)
+            await wait_until(lambda: client.state == "connected")
+
+            # One color, so the replay is a single batched request
+            assert server.stats["ColorTintRequest"] == replayed
+            assert states[:3] == ["connecting", "connected", "reconnecting"]
+        finally:
+            await client.shutdown()
+            await server.stop()
+
+    asyncio.run(scenario())
+
+
+def test_tint_waits_for_the_connection_to_return(monkeypatch):
+    monkeypatch.setattr(vtube_recolor_tool, "KEEPALIVE_INTERVAL", 0.05)
+    monkeypatch.setattr(vtube_recolor_tool, "RECONNECT_MIN_DELAY", 0.05)
+
+    async def scenario():
+        server = await start_mock()
+        client = make_client(server)
+        client.start_supervisor()
+        try:
+            await wait_until(lambda: client.state == "connected")
+            await server.stop()
+            await wait_until(lambda: client.state == "reconnecting")
+
+            tint = asyncio.ensure_future(client.tint_artmeshes(["ArtMesh3"], 1, 1, 0, 1))
+            await wait_until(lambda: client.held_tints == 1)
+            server = await start_mock(port=server.port)
+            tinted, failed, _ = await asyncio.wait_for(tint, 5)
+            assert (tinted, failed) == (["ArtMesh3"], [])
+        finally:
+            await client.shutdown()
+            await server.stop()
+
+    asyncio.run(scenario())
+
+
+def test_metrics_count_bytes_not_characters():
+    assert encoded_size("Hair") == 4
+    assert encoded_size("Härchen") == 8
+    assert encoded_size(b"\xc3\xa4") == 2
+
+    async def scenario():
+        server = await start_mock()
+        client = await connected_client(server)
+        try:
+            sizes = []
+            for note in ("a" * 10, "ä" * 10):
+                before = client.metrics.bytes_sent
+                await client.request("APIStateRequest", {"note": note})
+                sizes.append(client.metrics.bytes_sent - before)
+            return sizes
+        finally:
+            await client.close()
+            await server.stop()
+
+    ascii_size, utf8_size = asyncio.run(scenario())
+    assert utf8_size - ascii_size == 10
@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from vtube_recolor_tool import MessageCodec, orjson
+
+
+BACKENDS = ["json", pytest.param("orjson", marks=pytest.mark.skipif(orjson is None, reason="orjson not installed"))]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_encode_builds_the_api_envelope(backend):
+    codec = MessageCodec(backend)
+    payload = codec.encode("ColorTintRequest", "vrt-1", {"names": ["Haar_Vorne_ä"]})
+    assert json.loads(payload) == {
+        "apiName": "VTubeStudioPublicAPI",
+        "apiVersion": "1.0",
+        "messageType": "ColorTintRequest",
+        "requestID": "vrt-1",
+        "data": {"names": ["Haar_Vorne_ä"]},
+    }
+    # The cached envelope is reused for the next request of the same type
+    assert json.loads(codec.encode("ColorTintRequest", "vrt-2"))["requestID"] == "vrt-2"
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_preserialized_data_is_sent_as_is(backend):
+    codec = MessageCodec(backend)
+    payload = codec.encode("ArtMeshListRequest", "vrt-1", '{"raw":true}')
+    assert payload.endswith('"data":{"raw":true}}')
+    assert codec.decode(payload)["data"] == {"raw": True}
+
+
+def test_stats_count_messages():
+    codec = MessageCodec("json")
+    codec.encode("APIStateRequest", "vrt-1")
+    codec.decode('{"messageType":"APIStateResponse"}')
+    codec.decode('{"messageType":"APIStateResponse"}')
+    stats = codec.stats()
+    assert (stats["backend"], stats["encoded"], stats["decoded"]) == ("json", 1, 2)
+    codec.reset_stats()
+    assert codec.stats()["decoded"] == 0
+
+
+def test_json_is_the_default_without_orjson(monkeypatch):
+    import vtube_recolor_tool
+    monkeypatch.setattr(vtube_recolor_tool, "orjson", None)
+    assert MessageCodec().backend == "json"
+    with pytest.raises(ValueError):
+        MessageCodec("orjson")
@@ -0,0 +1,162 @@
+import asyncio
+import json
+
+import pytest
+
+from vtube_recolor_tool import ControlServer, parse_control_command
+
+
+@pytest.mark.parametrize("path, params, command", [
+    ("/scene", {}, {"action": "scene"}),
+    ("/apply", {"group": "hair"}, {"action": "apply", "group": "hair", "color": None}),
+    ("/apply", {"group": "hair", "color": "#ff8800"}, {"action": "apply", "group": "hair", "color": [255, 136, 0]}),
+    ("/apply", {"group": "hair", "color": "00aaff"}, {"action": "apply", "group": "hair", "color": [0, 170, 255]}),
+    ("/apply", {"group": "hair", "color": [1, 2, 3]}, {"action": "apply", "group": "hair", "color": [1, 2, 3]}),
+])
+def test_parse_control_command(path, params, command):
+    assert parse_control_command(path, params) == command
+
+
+@pytest.mark.parametrize("params", [
+    {},
+    {"group": ""},
+    {"group": 3},
+    {"group": "hair", "color": "red"},
+    {"group": "hair", "color": "#ff0000 #00ff00"},
+    {"group": "hair", "color": [255, 0]},
+    {"group": "hair", "color": [255, 0, 256]},
+    {"group": "hair", "color": [1.0, 0, 0]},
+])
+def test_parse_control_command_rejects(params):
+    with pytest.raises(ValueError):
+        parse_control_command("/apply", params)
+
+
+async def http(port, method, target, body=None):
+    """One request on its own connection; returns ``(status, payload)``"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    raw = json.dumps(body).encode() if body is not None else b""
+    writer.write(
+        f"{method} {target} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n"
+        f"Content-Length: {len(raw)}\r\n\r\n".encode() + raw
+    )
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(payload)
+
+
+class GatedHandler:
+    """Control handler that blocks until ``gate`` is set, recording commands"""
+
+    def __init__(self):
+        self.gate = asyncio.Event()
+        self.started = asyncio.Event()
+        self.commands = []
+
+    async def __call__(self, command):
+        self.commands.append(command)
+        self.started.set()
+        await self.gate.wait()
+
+
+def test_burst_for_one_target_coalesces_and_new_targets_are_shed():
+    async def scenario():
+        handler = GatedHandler()
+        server = ControlServer(handler, port=0, max_pending=2)
+        await server.start()
+        try:
+            assert server.submit({"action": "scene"}) == "queued"
+            await handler.started.wait()  # The worker is busy with the scene
+
+            red = {"action": "apply", "group": "hair", "color": [255, 0, 0]}
+            blue = dict(red, color=[0, 0, 255])
+            assert server.submit(red) == "queued"
+            assert server.submit({"action": "apply", "group": "eyes", "color": None}) == "queued"
+            assert server.submit(blue) == "coalesced"
+            assert server.submit({"action": "apply", "group": "face", "color": None}) == "shed"
+
+            handler.gate.set()
+            while server.stats()["executed"] < 3:
+                await asyncio.sleep(0.01)
+            # Latest color wins, but hair keeps its place ahead of eyes
+            assert handler.commands[1:] == [blue, {"action": "apply", "group": "eyes", "color": None}]
+            stats = server.stats()
+            assert {key: stats[key] for key in ("received", "queued", "coalesced", "shed", "pending")} == {
+                "received": 5, "queued": 3, "coalesced": 1, "shed": 1, "pending": 0,
+            }
+        finally:
+            await server.stop()
+
+    asyncio.run(scenario())
+
+
+def test_http_status_codes():
+    async def scenario():
+        handler = GatedHandler()
+
+        def validate(command):
+            if command.get("group") not in (None, "hair"):
+                raise ValueError(f"unknown group: {command['group']}")
+
+        server = ControlServer(handler, port=0, max_pending=1, validate=validate)
+        await server.start()
+        try:
+            assert await http(server.port, "POST", "/scene") == (202, {"status": "queued", "pending": 1})
+            await handler.started.wait()
+            assert (await http(server.port, "GET", "/apply?group=hair&color=ff0000"))[0] == 202
+            assert (await http(server.port, "POST", "/apply", {"group": "hair"}))[1]["status"] == "coalesced"
+            assert (await http(server.port, "POST", "/scene"))[0] == 503  # Shed
+            assert await http(server.port, "POST", "/apply", {"group": "tail"}) == (
+                400, {"error": "unknown group: tail"}
+            )
+            assert (await http(server.port, "POST", "/apply", ["hair"]))[0] == 400
+            assert (await http(server.port, "GET", "/nope"))[0] == 404
+            assert (await http(server.port, "DELETE", "/scene"))[0] == 405
+
+            status, stats = await http(server.port, "GET", "/status")
+            assert status == 200
+            assert (stats["received"], stats["rejected"], stats["shed"]) == (4, 2, 1)
+            handler.gate.set()
+        finally:
+            await server.stop()
+
+    asyncio.run(scenario())
+
+
+def test_commands_are_refused_until_ready():
+    async def scenario():
+        handler = GatedHandler()
+        ready = [False]
+        server = ControlServer(handler, port=0, ready=lambda: ready[0])
+        await server.start()
+        try:
+            assert (await http(server.port, "POST", "/scene"))[0] == 503
+            assert (await http(server.port, "GET", "/status"))[0] == 200
+            ready[0] = True
+            assert (await http(server.port, "POST", "/scene"))[0] == 202
+            await handler.started.wait()
+            assert server.stats()["unavailable"] == 1
+            handler.gate.set()
+        finally:
+            await server.stop()
+
+    asyncio.run(scenario())
+
+
+def test_unreadable_groups_answer_500():
+    async def scenario():
+        def validate(command):
+            raise PermissionError("groups file is locked")
+
+        server = ControlServer(GatedHandler(), port=0, validate=validate)
+        await server.start()
+        try:
+            assert await http(server.port, "POST", "/apply", {"group": "hair"}) == (
+                500, {"error": "groups file is locked"}
+            )
+            assert server.stats()["errors"] == 1
+        finally:
+            await server.stop()
+
+    asyncio.run(scenario())
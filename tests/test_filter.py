@@ -0,0 +1,40 @@
+from vtube_recolor_tool import IncrementalFilter
+
+
+NAMES = ["Hair_Front", "Hair_Back", "hair_tip", "Eye_L", "Eye_R", "Mouth"]
+
+
+def test_query_ignores_case():
+    rows = IncrementalFilter(NAMES)
+    assert rows.set_query("HAIR") == [0, 1, 2]
+    assert rows.accepts("Hairband")
+    assert not rows.accepts("Eye_L")
+
+
+def test_longer_query_narrows_shorter_one_widens():
+    rows = IncrementalFilter(NAMES)
+    assert rows.set_query("h") == [0, 1, 2, 5]
+    assert rows.set_query("ha") == [0, 1, 2]
+    assert rows.set_query("hair_b") == [1]
+    assert rows.set_query("_") == [0, 1, 2, 3, 4]
+    assert rows.set_query("") == list(range(len(NAMES)))
+
+
+def test_filter_remove_renumbers_matches():
+    rows = IncrementalFilter(NAMES)
+    assert rows.set_query("hair") == [0, 1, 2]
+
+    rows.remove(1, 3)
+    assert len(rows) == 3
+    assert rows.matches == [0]
+    # The query still applies to the rows that moved up
+    assert rows.set_query("r") == [0, 1]
+
+
+def test_filter_remove_then_append_keeps_query():
+    rows = IncrementalFilter(NAMES)
+    rows.set_query("eye")
+    rows.remove(0, 0)
+    assert rows.matches == [2, 3]
+    rows.append(["Eyebrow", "Nose"])
+    assert rows.matches == [2, 3, 5]
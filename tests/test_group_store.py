@@ -0,0 +1,52 @@
+import copy
+import json
+import os
+
+from vtube_recolor_tool import DEFAULT_GROUPS_MODEL, GroupStore
+
+
+HAIR = {"hair": {"color": [255, 0, 0], "layers": ["Hair_Front", "Hair_Back"]}}
+
+
+def test_round_trip():
+    store = GroupStore()
+    store.save("model-a", HAIR, "Model A")
+
+    reopened = GroupStore()
+    assert reopened.load("model-a") == HAIR
+    assert reopened.models() == {"model-a": {"name": "Model A", "groups": 1}}
+
+
+def test_unsafe_model_ids_stay_inside_the_directory():
+    store = GroupStore()
+    store.save("../escape", HAIR)
+    assert sorted(os.listdir(store.directory)) == ["___escape.json", "index.json"]
+    assert GroupStore().load("../escape") == HAIR
+
+
+def test_model_switch_starts_from_a_copy_of_the_defaults():
+    store = GroupStore()
+    store.save(DEFAULT_GROUPS_MODEL, HAIR)
+
+    groups = store.load("model-b")
+    assert groups == HAIR
+    groups["hair"]["layers"].append("Hair_Tip")
+    store.save("model-b")
+
+    assert store.load(DEFAULT_GROUPS_MODEL) == HAIR
+    reopened = GroupStore()
+    assert reopened.load("model-b")["hair"]["layers"] == ["Hair_Front", "Hair_Back", "Hair_Tip"]
+    assert reopened.load(DEFAULT_GROUPS_MODEL) == HAIR
+
+
+def test_legacy_file_becomes_the_defaults():
+    with open("artmesh_groups.json", "w") as f:
+        json.dump(HAIR, f)
+    assert GroupStore().load("model-c") == HAIR
+
+
+def test_reload_drops_unsaved_edits():
+    store = GroupStore()
+    store.save("model-a", copy.deepcopy(HAIR))
+    store.load("model-a")["eyes"] = {"color": [0, 0, 255], "layers": ["Eye_L"]}
+    assert store.reload("model-a") == HAIR
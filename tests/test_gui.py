@@ -0,0 +1,76 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+QtCore = pytest.importorskip("PyQt5.QtCore")
+QtWidgets = pytest.importorskip("PyQt5.QtWidgets")
+gui = pytest.importorskip("vtube_recolor_gui")
+
+from mock_vts_server import MockVTubeStudio  # noqa: E402
+from vtube_recolor_tool import VTubeStudioClient  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+@pytest.fixture
+def errors(qapp, monkeypatch):
+    """Collect message box titles instead of showing the boxes"""
+    shown = []
+    monkeypatch.setattr(QtWidgets.QMessageBox, "critical", lambda parent, title, text: shown.append(title))
+    return shown
+
+
+@pytest.mark.parametrize("path, content", [
+    ("artmesh_groups.json", "{"),
+    (os.path.join("artmesh_groups", "index.json"), json.dumps({"version": 99, "models": {}})),
+    (os.path.join("artmesh_groups", "index.json"), json.dumps({"version": 1, "models": {"": {}}})),
+])
+def test_unreadable_groups_open_an_empty_window(errors, path, content):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+    window = gui.MainWindow(VTubeStudioClient())
+    assert window.groups == {}
+    assert errors == ["Load Error"]
+    window.deleteLater()
+
+
+def test_color_dialogs_are_deleted_when_closed(qapp):
+    window = gui.MainWindow(VTubeStudioClient())
+    for close in ("reject", "accept"):
+        window.pick_color()
+        getattr(window._color_dialog, close)()
+        QtCore.QCoreApplication.sendPostedEvents(None, QtCore.QEvent.DeferredDelete)
+        assert window.findChildren(QtWidgets.QColorDialog) == []
+    window.deleteLater()
+
+
+def test_control_commands_wait_for_the_live_artmesh_list(qapp):
+    async def scenario():
+        server = MockVTubeStudio(mesh_count=5, latency=0, port=0)
+        await server.start()
+        client = VTubeStudioClient()
+        client.uri = server.uri
+        window = gui.MainWindow(client)
+        await window.start_control_server(0)
+        try:
+            assert window.control_server._dispatch("POST", "/scene", b"")[0] == 503
+
+            await client.connect()
+            await client.authenticate()
+            await window.sync_artmeshes("Connected")
+            assert window.control_server._dispatch("POST", "/scene", b"")[0] == 202
+        finally:
+            await window.control_server.stop()
+            await client.close()
+            await server.stop()
+            window.deleteLater()
+
+    asyncio.run(scenario())
@@ -0,0 +1,85 @@
+from vtube_recolor_tool import ArtMeshCatalog, ArtMeshListCache, HealthChecker, artmesh_content_hash
+
+
+LIVE_NAMES = ["Hair_Front", "Hair_Back", "Eye_L"]
+CACHED_NAMES = ["Tail", "Ear_L"]
+
+
+def make_checker():
+    cache = ArtMeshListCache()
+    cache.store("cached", "Cached Model", CACHED_NAMES, artmesh_content_hash(CACHED_NAMES))
+    return HealthChecker(cache)
+
+
+def test_report_checks_live_and_cached_models():
+    live = ArtMeshCatalog(LIVE_NAMES, model_id="live")
+    report = make_checker().report({
+        "live": ("Live Model", {"hair": {"color": [255, 0, 0], "layers": ["Hair_Front", "hair_back", "Hair_Frnt"]}}),
+        "cached": (None, {"tail": {"color": [0, 0, 255], "layers": ["Tail", "Ear_R"]}}),
+        "gone": ("Gone Model", {"eyes": {"color": [0, 255, 0], "layers": ["Eye_L"]}}),
+    }, live)
+
+    hair = report["models"]["live"]["groups"]["hair"]
+    assert report["models"]["live"]["artmeshes"] == "live"
+    assert (hair["exact"], hair["case_mismatches"], hair["coverage"]) == (1, [["hair_back", "Hair_Back"]], 0.6667)
+    assert hair["dead"][0][:2] == ["Hair_Frnt", "Hair_Front"]
+
+    cached = report["models"]["cached"]
+    assert (cached["name"], cached["artmeshes"]) == ("Cached Model", "cached")
+    assert cached["groups"]["tail"]["dead"][0][:2] == ["Ear_R", "Ear_L"]
+
+    assert report["models"]["gone"] == {"name": "Gone Model", "artmeshes": None, "groups": {}}
+    assert report["recomputed"] == 2
+
+
+def test_report_only_rechecks_changed_groups():
+    live = ArtMeshCatalog(LIVE_NAMES, model_id="live")
+    groups = {
+        "hair": {"color": [255, 0, 0], "layers": ["Hair_Front", "Hair_Back"]},
+        "eyes": {"color": [0, 255, 0], "layers": ["Eye_L"]},
+    }
+    models = {"live": ("Live Model", groups), "cached": (None, {"tail": {"color": [0, 0, 255], "layers": ["Tail"]}})}
+    checker = make_checker()
+    assert checker.report(models, live)["recomputed"] == 3
+    assert checker.report(models, live)["recomputed"] == 0
+
+    groups["eyes"]["layers"].append("Eye_R")
+    assert checker.report(models, live)["recomputed"] == 1
+
+    # A new artmesh list invalidates the loaded model's groups only
+    live = ArtMeshCatalog(LIVE_NAMES + ["Eye_R"], previous=live, model_id="live")
+    report = checker.report(models, live)
+    assert report["recomputed"] == 2
+    assert report["models"]["live"]["groups"]["eyes"]["coverage"] == 1.0
+
+
+def test_rule_group_matching_nothing_has_no_coverage():
+    live = ArtMeshCatalog(LIVE_NAMES, model_id="live")
+    report = make_checker().report({"live": ("Live Model", {
+        "hair": {"color": [255, 0, 0], "layers": [], "rules": {"prefix": ["Hair"]}},
+        "tail": {"color": [0, 0, 255], "layers": [], "rules": {"prefix": ["Tail"]}},
+        "eyes": {"color": [0, 255, 0], "layers": ["Eye_L"]},
+    })}, live)
+    groups = report["models"]["live"]["groups"]
+    assert (groups["hair"]["rule_matches"], groups["hair"]["coverage"]) == (2, 1.0)
+    assert (groups["tail"]["rule_matches"], groups["tail"]["coverage"]) == (0, 0.0)
+    assert groups["eyes"]["rule_matches"] is None
+
+
+def test_cached_lists_are_read_again_only_when_the_file_changes(monkeypatch):
+    checker = make_checker()
+    loads = []
+    load = checker.artmesh_cache.load
+    monkeypatch.setattr(checker.artmesh_cache, "load", lambda model_id: loads.append(model_id) or load(model_id))
+    models = {"cached": (None, {"tail": {"color": [0, 0, 255], "layers": ["Tail", "Ear_R"]}})}
+
+    assert checker.report(models)["recomputed"] == 1
+    assert checker.report(models)["recomputed"] == 0
+    assert loads == ["cached"]
+
+    names = CACHED_NAMES + ["Ear_R"]
+    ArtMeshListCache().store("cached", "Cached Model", names, artmesh_content_hash(names))
+    report = checker.report(models)
+    assert loads == ["cached", "cached"]
+    assert report["recomputed"] == 1
+    assert report["models"]["cached"]["groups"]["tail"]["dead"] == []
@@ -0,0 +1,55 @@
+import asyncio
+import types
+
+import pytest
+
+from vtube_recolor_tool import ArtMeshCatalog, transform_palette
+
+
+RED = (255, 0, 0, 255)
+BLUE = (0, 0, 255, 255)
+
+
+def test_hue_brightness_and_temperature():
+    colors = {"hair": [255, 0, 0], "eyes": [0, 0, 200]}
+    assert transform_palette(colors, hue=120) == {"hair": [0, 255, 0], "eyes": [200, 0, 0]}
+    assert transform_palette(colors, brightness=0.5) == {"hair": [128, 0, 0], "eyes": [0, 0, 100]}
+    assert transform_palette(colors, temperature=30) == {"hair": [255, 0, 0], "eyes": [30, 0, 170]}
+    assert transform_palette(colors, saturation=0) == {"hair": [255, 255, 255], "eyes": [200, 200, 200]}
+    assert colors == {"hair": [255, 0, 0], "eyes": [0, 0, 200]}
+
+
+def test_palette_snaps_to_the_nearest_color():
+    colors = {"hair": [250, 10, 10], "eyes": [10, 10, 240], "skin": [240, 200, 180]}
+    palette = [(255, 0, 0), (0, 0, 255), (255, 255, 255)]
+    assert transform_palette(colors, palette=palette) == {
+        "hair": [255, 0, 0], "eyes": [0, 0, 255], "skin": [255, 255, 255],
+    }
+
+
+def test_restore_tints_sends_one_batch_per_color(recording_client):
+    asyncio.run(recording_client.restore_tints({"Hair_Front": RED, "Hair_Back": RED, "Eye_L": BLUE}))
+    assert sorted(recording_client.sent) == [(["Eye_L"], BLUE), (["Hair_Front", "Hair_Back"], RED)]
+
+
+def test_restore_tints_leaves_unknown_tints_alone(recording_client):
+    asyncio.run(recording_client.restore_tints({"Hair_Front": None, "Eye_L": BLUE}))
+    assert recording_client.sent == [(["Eye_L"], BLUE)]
+
+
+def test_palette_preview_reverts_unknown_tints_to_stored_colors(recording_client):
+    gui = pytest.importorskip("vtube_recolor_gui")
+    recording_client.tint_state.update(["Eye_L"], BLUE)
+    window = types.SimpleNamespace(
+        groups={
+            "hair": {"color": [255, 0, 0], "layers": ["Hair_Front"]},
+            "eyes": {"color": [0, 255, 0], "layers": ["Eye_L"]},
+        },
+        catalog=ArtMeshCatalog(["Hair_Front", "Eye_L"]),
+        client=recording_client,
+        status_bar=types.SimpleNamespace(show_message=lambda message: None),
+    )
+    previous = {}
+    asyncio.run(gui.MainWindow.preview_palette(window, {"hair": [0, 0, 255], "eyes": [0, 0, 255]}, previous))
+    assert previous == {"Hair_Front": RED, "Eye_L": BLUE}
+    assert recording_client.tint_state.get("Hair_Front") == BLUE
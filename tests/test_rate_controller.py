@@ -0,0 +1,49 @@
+import asyncio
+import time
+
+from vtube_recolor_tool import RateController
+
+
+def test_rate_grows_while_latency_stays_at_baseline():
+    controller = RateController(initial_rate=50.0, max_rate=60.0)
+    controller.record(0.01)
+    assert controller.rate == 50.0 * 1.05
+    for _ in range(20):
+        controller.record(0.01)
+    assert controller.rate == 60.0
+
+
+def test_failure_backs_off_once_per_round_trip():
+    controller = RateController(initial_rate=100.0, min_rate=40.0, decrease_factor=0.5)
+    controller.record(0.01, ok=False)
+    assert controller.rate == 50.0
+    # Responses already in flight report the same congestion
+    controller.record(0.01, ok=False)
+    assert controller.rate == 50.0
+
+    controller._last_decrease = 0.0
+    controller.record(0.01, ok=False)
+    assert controller.rate == 40.0
+
+
+def test_latency_spike_backs_off_and_ends_slow_start():
+    controller = RateController(initial_rate=100.0, increase_step=1.0)
+    controller.record(0.01)
+    controller.record(0.5)
+    assert controller.rate < 100.0
+
+    rate = controller.rate
+    controller.latency = controller.baseline_latency = 0.01
+    controller.record(0.01)
+    assert controller.rate == rate + 1.0
+
+
+def test_acquire_paces_requests_beyond_the_burst():
+    async def scenario():
+        controller = RateController(initial_rate=100.0)
+        started = time.monotonic()
+        await asyncio.gather(*(controller.acquire() for _ in range(14)))
+        return time.monotonic() - started
+
+    # A burst of 4 goes out at once, the other 10 at 100 per second
+    assert asyncio.run(scenario()) >= 0.09
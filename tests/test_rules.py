@@ -0,0 +1,117 @@
+import json
+import logging
+
+import pytest
+
+from vtube_recolor_tool import (
+    ArtMeshCatalog, GroupStore, group_members, load_groups_file, normalize_rules, resolve_scene,
+)
+
+
+NAMES = ["Hair_Front", "Hair_Back", "hair_tip", "Eye_L", "Eye_R", "Mouth"]
+
+
+def test_normalize_rules_canonical_form():
+    rules = normalize_rules({
+        "prefix": ["Hair", "Hair", ""],
+        "exclude": ["hair_tip"],
+        "ignore_case": False,
+    })
+    assert rules == {"prefix": ["Hair"], "exclude": ["hair_tip"]}
+
+
+def test_normalize_rules_selecting_nothing_is_none():
+    assert normalize_rules({}) is None
+    assert normalize_rules({"exclude": ["Mouth"]}) is None
+
+
+@pytest.mark.parametrize("rules", [
+    [],
+    {"prefixes": ["Hair"]},
+    {"regex": "Hair"},
+    {"suffix": [1]},
+    {"regex": ["("]},
+])
+def test_normalize_rules_rejects_malformed(rules):
+    with pytest.raises(ValueError):
+        normalize_rules(rules)
+
+
+def test_compile_rules_combines_lists():
+    catalog = ArtMeshCatalog(NAMES)
+    names, excluded = catalog.compile_rules({
+        "prefix": ["Hair"], "suffix": ["_R"], "include": ["mouth"], "exclude": ["hair_back"],
+    })
+    assert names == ("Hair_Front", "Eye_R", "Mouth")
+    assert excluded == {"Hair_Back"}
+
+
+def test_compile_rules_ignore_case():
+    catalog = ArtMeshCatalog(NAMES)
+    assert catalog.compile_rules({"prefix": ["hair"]})[0] == ("hair_tip",)
+    assert catalog.compile_rules({"prefix": ["hair"], "ignore_case": True})[0] == (
+        "Hair_Front", "Hair_Back", "hair_tip",
+    )
+
+
+def test_compile_rules_keeps_valid_regexes_when_one_is_bad():
+    catalog = ArtMeshCatalog(NAMES)
+    names, _ = catalog.compile_rules({"regex": ["^Eye", "(", "(?P<x>_L)$"]})
+    assert names == ("Eye_L", "Eye_R")
+
+
+def test_match_rules_is_cached_per_catalog():
+    catalog = ArtMeshCatalog(NAMES)
+    rules = {"prefix": ["Eye"]}
+    assert catalog.match_rules(rules) is catalog.match_rules(dict(rules))
+    assert ArtMeshCatalog(NAMES, previous=catalog).match_rules(rules) is not catalog.match_rules(rules)
+
+
+def test_group_members_merges_layers_and_rules():
+    catalog = ArtMeshCatalog(NAMES)
+    group = {"color": [255, 0, 0], "layers": ["mouth", "Gone", "Eye_L"],
+             "rules": {"prefix": ["Eye"], "exclude": ["Eye_L"]}}
+    assert group_members(group, catalog) == (["Mouth", "Eye_R"], ["Gone"])
+
+
+def write_groups(groups, path="groups.json"):
+    with open(path, "w") as f:
+        json.dump(groups, f)
+    return path
+
+
+@pytest.mark.parametrize("rules", [{"prefix": "Hair"}, {"regex": "Eye"}])
+def test_load_drops_malformed_rules(rules, caplog):
+    path = write_groups({
+        "bad": {"color": [255, 0, 0], "layers": ["Mouth"], "rules": rules},
+        "eyes": {"color": [0, 0, 255], "layers": ["Eye_L"]},
+    })
+    with caplog.at_level(logging.WARNING, logger="vtube_recolor"):
+        groups = load_groups_file(path)
+
+    assert "rules" not in groups["bad"]
+    assert "bad" in caplog.text
+    # A string pattern must not turn into one-letter patterns matching everything
+    mesh_colors, _ = resolve_scene(groups, ArtMeshCatalog(NAMES))
+    assert mesh_colors == {"Mouth": [255, 0, 0], "Eye_L": [0, 0, 255]}
+
+
+def test_load_normalizes_rules_and_defaults_layers():
+    path = write_groups({"hair": {"color": [255, 0, 0], "rules": {"prefix": ["Hair", "Hair"], "ignore_case": False}}})
+    groups = load_groups_file(path)
+    assert groups["hair"] == {"color": [255, 0, 0], "layers": [], "rules": {"prefix": ["Hair"]}}
+
+
+def test_group_store_normalizes_rules():
+    store = GroupStore()
+    store.save("model-a", {"hair": {"color": [255, 0, 0], "rules": {"prefix": "Hair"}}})
+    assert GroupStore().load("model-a") == {"hair": {"color": [255, 0, 0], "layers": []}}
+
+
+def test_rule_group_without_layers_resolves():
+    catalog = ArtMeshCatalog(NAMES)
+    group = {"color": [255, 0, 0], "rules": {"prefix": ["Eye"]}}
+    assert group_members(group, catalog) == (["Eye_L", "Eye_R"], [])
+    mesh_colors, invalid = resolve_scene({"eyes": group, "empty": {"color": [0, 0, 0]}}, catalog)
+    assert mesh_colors == {"Eye_L": [255, 0, 0], "Eye_R": [255, 0, 0]}
+    assert invalid == []
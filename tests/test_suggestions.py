@@ -0,0 +1,32 @@
+from vtube_recolor_tool import SuggestionIndex
+
+
+NAMES = ["Hair_Front", "Hair_Back", "Eye_L", "Eye_R", "Mouth"]
+
+
+def test_suggest_ranks_closest_names_first():
+    index = SuggestionIndex(NAMES)
+    suggestions = index.suggest("hair_fornt")
+    assert suggestions[0][0] == "Hair_Front"
+    assert [score for _, score in suggestions] == sorted((score for _, score in suggestions), reverse=True)
+    assert index.suggest("Eye_L", limit=1) == [("Eye_L", 1.0)]
+
+
+def test_suggest_drops_unrelated_names():
+    index = SuggestionIndex(NAMES)
+    assert index.suggest("Tail_Tip") == []
+    assert all(score >= 0.5 for _, score in index.suggest("Eye", min_score=0.5))
+
+
+def test_common_prefix_does_not_drown_the_match():
+    index = SuggestionIndex([f"ArtMesh{i}" for i in range(2000)] + ["ArtMesh_Hair_Front"])
+    assert index.suggest("ArtMesh_Hair_Frnt", limit=1)[0][0] == "ArtMesh_Hair_Front"
+    assert index.suggest("artmesh1234", limit=1)[0][0] == "ArtMesh1234"
+
+
+def test_suggest_many():
+    index = SuggestionIndex(NAMES)
+    assert index.suggest_many(["mouht", "Eye_R"], limit=1) == {
+        "mouht": index.suggest("mouht", limit=1),
+        "Eye_R": [("Eye_R", 1.0)],
+    }
@@ -0,0 +1,75 @@
+import asyncio
+import time
+
+from vtube_recolor_tool import TintStream
+
+
+RED = (255, 0, 0, 255)
+BLUE = (0, 0, 255, 255)
+
+
+def test_stream_sends_only_the_newest_color(recording_client):
+    async def scenario():
+        stream = TintStream(recording_client, ["Hair_Front", "Hair_Back", "Hair_Front"])
+        for step in range(10):
+            stream.push(step / 10, 0, 0)
+        await stream.drain()
+        return stream
+
+    stream = asyncio.run(scenario())
+    assert (stream.frames_sent, stream.frames_coalesced) == (1, 9)
+    assert recording_client.sent == [(["Hair_Front", "Hair_Back"], (230, 0, 0, 255))]
+
+
+def test_stream_keeps_to_max_fps(recording_client):
+    async def scenario():
+        stream = TintStream(recording_client, ["Eye_L"], max_fps=20)
+        stream.push(1, 0, 0)
+        await stream.drain()
+        started = time.monotonic()
+        stream.push(0, 1, 0)
+        await stream.drain()
+        return time.monotonic() - started
+
+    assert asyncio.run(scenario()) >= 0.04
+    assert len(recording_client.sent) == 2
+
+
+def test_revert_restores_the_tints_shown_before(recording_client):
+    recording_client.tint_state.update(["Hair_Front"], RED)
+    recording_client.tint_state.update(["Hair_Back"], BLUE)
+
+    async def scenario():
+        stream = TintStream(recording_client, ["Hair_Front", "Hair_Back"])
+        stream.push(0, 1, 0)
+        stream.push(0, 1, 1)
+        await stream.revert()
+
+    asyncio.run(scenario())
+    assert recording_client.tint_state.get("Hair_Front") == RED
+    assert recording_client.tint_state.get("Hair_Back") == BLUE
+    assert sorted(recording_client.sent[-2:]) == [(["Hair_Back"], BLUE), (["Hair_Front"], RED)]
+
+
+def test_revert_uses_the_fallback_where_the_tint_is_unknown(recording_client):
+    recording_client.tint_state.update(["Hair_Front"], BLUE)
+
+    async def scenario():
+        stream = TintStream(recording_client, ["Hair_Front", "Hair_Back"], fallback=RED)
+        stream.push(0, 1, 0)
+        await stream.revert()
+
+    asyncio.run(scenario())
+    assert recording_client.tint_state.get("Hair_Front") == BLUE
+    assert recording_client.tint_state.get("Hair_Back") == RED
+
+
+def test_revert_without_fallback_leaves_unknown_tints_alone(recording_client):
+    async def scenario():
+        stream = TintStream(recording_client, ["Hair_Front"])
+        stream.push(0, 1, 0)
+        await stream.drain()
+        await stream.revert()
+
+    asyncio.run(scenario())
+    assert recording_client.sent == [(["Hair_Front"], (0, 255, 0, 255))]
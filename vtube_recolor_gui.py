@@ -0,0 +1,1819 @@
+import asyncio
+import copy
+import time
+import sys
+import qasync
+from PyQt5 import QtWidgets, QtGui, QtCore
+
+from vtube_recolor_tool import (
+    DEFAULT_GROUPS_MODEL,
+    Animator,
+    ArtMeshCatalog,
+    ControlServer,
+    Fade,
+    fix_groups_from_report,
+    Gradient,
+    group_members,
+    GroupStore,
+    HealthChecker,
+    IncrementalFilter,
+    log,
+    normalize_rules,
+    parse_palette,
+    Pulse,
+    remap_layers,
+    resolve_scene,
+    run_control_command,
+    TintStream,
+    transform_palette,
+    write_json_atomic,
+    VTubeStudioClient
+)
+
+FILTER_DEBOUNCE_MS = 150  # Pause in typing before a search box filters
+
+
+class ColorPreviewWidget(QtWidgets.QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.color = QtGui.QColor(255, 255, 255)
+        self.setFixedSize(40, 40)
+        self.setStyleSheet("border: 2px solid black; border-radius: 5px;")
+
+    def set_color(self, color):
+        self.color = color
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self)
+        painter.fillRect(self.rect(), self.color)
+
+
+class ArtMeshListModel(QtCore.QAbstractListModel):
+    """List model over the loaded artmesh names"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.names = []
+
+    def set_names(self, names):
+        self.beginResetModel()
+        self.names = list(names)
+        self.endResetModel()
+
+    def apply_diff(self, added, removed):
+        """Insert and remove rows in place so views keep selection and scroll"""
+        if removed:
+            gone = set(removed)
+            rows = [row for row, name in enumerate(self.names) if name in gone]
+            # Remove contiguous runs from the bottom up so rows stay valid
+            while rows:
+                last = rows.pop()
+                first = last
+                while rows and rows[-1] == first - 1:
+                    first = rows.pop()
+                self.beginRemoveRows(QtCore.QModelIndex(), first, last)
+                del self.names[first:last + 1]
+                self.endRemoveRows()
+
+        if added:
+            first = len(self.names)
+            self.beginInsertRows(QtCore.QModelIndex(), first, first + len(added) - 1)
+            self.names.extend(added)
+            self.endInsertRows()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.names)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == QtCore.Qt.DisplayRole:
+            return self.names[index.row()]
+        return None
+
+
+class GroupDetailModel(QtCore.QAbstractListModel):
+    """List model over a group's stored layer names, flagged valid/invalid"""
+
+    NameRole = QtCore.Qt.UserRole  # The stored name without the ✓/✗ prefix
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.names = []
+        self.catalog = ArtMeshCatalog()
+        self.valid_color = QtGui.QColor(0, 150, 0)  # Green for valid
+        self.invalid_color = QtGui.QColor(200, 0, 0)  # Red for invalid
+
+    def set_layers(self, layers, catalog):
+        self.beginResetModel()
+        self.names = list(layers)
+        self.catalog = catalog
+        self.endResetModel()
+
+    def set_catalog(self, catalog):
+        """Re-check validity against a new catalog without resetting the view"""
+        self.catalog = catalog
+        if self.names:
+            self.dataChanged.emit(
+                self.index(0), self.index(len(self.names) - 1),
+                [QtCore.Qt.DisplayRole, QtCore.Qt.ForegroundRole]
+            )
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.names)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        name = self.names[index.row()]
+        if role == QtCore.Qt.DisplayRole:
+            return f"✓ {name}" if name in self.catalog else f"✗ {name}"
+        if role == QtCore.Qt.ForegroundRole:
+            return self.valid_color if name in self.catalog else self.invalid_color
+        if role == self.NameRole:
+            return name
+        return None
+
+
+class NameFilterProxyModel(QtCore.QSortFilterProxyModel):
+    """Filters a model exposing ``names`` with an IncrementalFilter"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._filter = IncrementalFilter()
+        self._accepted = None  # Source rows to show, None for all
+
+    def setSourceModel(self, model):
+        super().setSourceModel(model)
+        model.modelReset.connect(self._reload_names)
+        model.rowsInserted.connect(self._rows_inserted)
+        model.rowsRemoved.connect(self._rows_removed)
+        self._reload_names()
+
+    def _reload_names(self):
+        query = self._filter.query
+        self._filter.set_names(self.sourceModel().names)
+        self.set_query(query)
+
+    def _rows_inserted(self, parent, first, last):
+        self._filter.append(self.sourceModel().names[first:last + 1])
+        self._update_accepted()
+
+    def _rows_removed(self, parent, first, last):
+        self._filter.remove(first, last)
+        self._update_accepted()
+
+    def _update_accepted(self):
+        self._accepted = set(self._filter.matches) if self._filter.query else None
+
+    def set_query(self, text):
+        self._filter.set_query(text)
+        self._update_accepted()
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self._accepted is None:
+            return True
+        if source_row < len(self._filter):
+            return source_row in self._accepted
+        # Rows inserted since the filter last saw the model
+        return self._filter.accepts(self.sourceModel().names[source_row])
+
+
+class RemapDialog(QtWidgets.QDialog):
+    """Lets the user review and accept suggested replacements for invalid names"""
+
+    AUTO_SELECT_SCORE = 0.6  # Pre-check suggestions at least this similar
+
+    def __init__(self, suggestions, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Suggested Replacements")
+        self.resize(700, 400)
+
+        layout = QtWidgets.QVBoxLayout()
+        layout.addWidget(QtWidgets.QLabel(
+            "Checked names will be replaced with the selected suggestion."
+        ))
+
+        self.table = QtWidgets.QTableWidget(len(suggestions), 3)
+        self.table.setHorizontalHeaderLabels(["Stored name", "Replace with", "Similarity"])
+        self.table.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Stretch)
+        self.table.verticalHeader().setVisible(False)
+
+        for row, (name, ranked) in enumerate(suggestions.items()):
+            name_item = QtWidgets.QTableWidgetItem(name)
+            name_item.setFlags(QtCore.Qt.ItemIsUserCheckable | QtCore.Qt.ItemIsEnabled)
+            best_score = ranked[0][1]
+            name_item.setCheckState(
+                QtCore.Qt.Checked if best_score >= self.AUTO_SELECT_SCORE else QtCore.Qt.Unchecked
+            )
+            self.table.setItem(row, 0, name_item)
+
+            combo = QtWidgets.QComboBox()
+            for candidate, score in ranked:
+                combo.addItem(candidate, score)
+            self.table.setCellWidget(row, 1, combo)
+
+            score_item = QtWidgets.QTableWidgetItem(f"{best_score:.0%}")
+            score_item.setFlags(QtCore.Qt.ItemIsEnabled)
+            self.table.setItem(row, 2, score_item)
+            combo.currentIndexChanged.connect(
+                lambda _, c=combo, item=score_item: item.setText(f"{c.currentData():.0%}")
+            )
+        layout.addWidget(self.table)
+
+        select_layout = QtWidgets.QHBoxLayout()
+        select_all_btn = QtWidgets.QPushButton("Check All")
+        select_all_btn.clicked.connect(lambda: self.set_all_checked(True))
+        select_none_btn = QtWidgets.QPushButton("Check None")
+        select_none_btn.clicked.connect(lambda: self.set_all_checked(False))
+        select_layout.addWidget(select_all_btn)
+        select_layout.addWidget(select_none_btn)
+        select_layout.addStretch()
+        layout.addLayout(select_layout)
+
+        buttons = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Ok | QtWidgets.QDialogButtonBox.Cancel)
+        buttons.button(QtWidgets.QDialogButtonBox.Ok).setText("Apply Replacements")
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+        self.setLayout(layout)
+
+    def set_all_checked(self, checked):
+        state = QtCore.Qt.Checked if checked else QtCore.Qt.Unchecked
+        for row in range(self.table.rowCount()):
+            self.table.item(row, 0).setCheckState(state)
+
+    def selected_remappings(self):
+        """Map of stored name -> chosen replacement for every checked row"""
+        remappings = {}
+        for row in range(self.table.rowCount()):
+            item = self.table.item(row, 0)
+            if item.checkState() == QtCore.Qt.Checked:
+                remappings[item.text()] = self.table.cellWidget(row, 1).currentText()
+        return remappings
+
+
+class RulesDialog(QtWidgets.QDialog):
+    """Edits the rules of a group, with a live count of what they match"""
+
+    FIELDS = [
+        ("prefix", "Name starts with:"),
+        ("suffix", "Name ends with:"),
+        ("regex", "Name matches regex:"),
+        ("include", "Always include:"),
+        ("exclude", "Always exclude:"),
+    ]
+
+    def __init__(self, group_name, rules, catalog, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"Rules for {group_name}")
+        self.resize(500, 550)
+        self.catalog = catalog
+        self.rules = rules
+
+        layout = QtWidgets.QVBoxLayout()
+        layout.addWidget(QtWidgets.QLabel(
+            "One entry per line. The group gets every artmesh matching any prefix, suffix or regex, "
+            "plus the included names and its own layers, minus the excluded names."
+        ))
+        form = QtWidgets.QFormLayout()
+        self.edits = {}
+        for key, label in self.FIELDS:
+            edit = QtWidgets.QPlainTextEdit("\n".join((rules or {}).get(key, [])))
+            edit.textChanged.connect(self.update_preview)
+            form.addRow(label, edit)
+            self.edits[key] = edit
+        self.ignore_case = QtWidgets.QCheckBox("Ignore case in prefixes, suffixes and regexes")
+        self.ignore_case.setChecked(bool((rules or {}).get("ignore_case")))
+        self.ignore_case.toggled.connect(self.update_preview)
+        form.addRow("", self.ignore_case)
+        layout.addLayout(form)
+
+        self.preview_label = QtWidgets.QLabel()
+        self.preview_label.setWordWrap(True)
+        layout.addWidget(self.preview_label)
+
+        buttons = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Ok | QtWidgets.QDialogButtonBox.Cancel)
+        self.ok_btn = buttons.button(QtWidgets.QDialogButtonBox.Ok)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+        self.setLayout(layout)
+        self.update_preview()
+
+    def read_rules(self):
+        rules = {key: [line.strip() for line in edit.toPlainText().splitlines()] for key, edit in self.edits.items()}
+        rules["ignore_case"] = self.ignore_case.isChecked()
+        return normalize_rules(rules)
+
+    def update_preview(self):
+        try:
+            rules = self.read_rules()
+        except ValueError as e:
+            self.preview_label.setStyleSheet("color: #f44336;")
+            self.preview_label.setText(str(e))
+            self.ok_btn.setEnabled(False)
+            return
+        self.preview_label.setStyleSheet("")
+        self.ok_btn.setEnabled(True)
+
+        if rules is None:
+            self.preview_label.setText("No rules: the group only has its own layers.")
+            return
+        names, excluded = self.catalog.compile_rules(rules)
+        sample = ", ".join(names[:5]) + (f", ... ({len(names) - 5} more)" if len(names) > 5 else "")
+        text = f"Matches {len(names)} of {len(self.catalog)} artmeshes"
+        if excluded:
+            text += f" after excluding {len(excluded)}"
+        self.preview_label.setText(text + (f": {sample}" if names else "."))
+
+    def accept(self):
+        self.rules = self.read_rules()
+        super().accept()
+
+
+class PaletteDialog(QtWidgets.QDialog):
+    """Transforms every group color at once, with a preview on the model"""
+
+    def __init__(self, groups, on_preview, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Palette")
+        self.resize(500, 450)
+        self.colors = {name: group["color"] for name, group in groups.items()}
+        self.result_colors = dict(self.colors)
+        self.on_preview = on_preview
+
+        layout = QtWidgets.QVBoxLayout()
+        form = QtWidgets.QFormLayout()
+        self.hue = QtWidgets.QSpinBox()
+        self.hue.setRange(-180, 180)
+        self.hue.setSuffix("°")
+        self.saturation = QtWidgets.QDoubleSpinBox()
+        self.brightness = QtWidgets.QDoubleSpinBox()
+        for spin in (self.saturation, self.brightness):
+            spin.setRange(0.0, 3.0)
+            spin.setSingleStep(0.05)
+            spin.setValue(1.0)
+            spin.setSuffix("×")
+        self.temperature = QtWidgets.QSpinBox()
+        self.temperature.setRange(-100, 100)
+        self.temperature.setToolTip("Positive values warm (more red), negative values cool (more blue)")
+        self.palette_input = QtWidgets.QLineEdit()
+        self.palette_input.setPlaceholderText("Optional: snap to #rrggbb, #rrggbb, ...")
+        form.addRow("Hue shift:", self.hue)
+        form.addRow("Saturation:", self.saturation)
+        form.addRow("Brightness:", self.brightness)
+        form.addRow("Temperature:", self.temperature)
+        form.addRow("Target palette:", self.palette_input)
+        layout.addLayout(form)
+
+        self.table = QtWidgets.QTableWidget(len(self.colors), 3)
+        self.table.setHorizontalHeaderLabels(["Group", "Current", "New"])
+        self.table.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        for row, (name, color) in enumerate(self.colors.items()):
+            self.table.setItem(row, 0, QtWidgets.QTableWidgetItem(name))
+            swatch = QtWidgets.QTableWidgetItem()
+            swatch.setBackground(QtGui.QColor(*color))
+            self.table.setItem(row, 1, swatch)
+            self.table.setItem(row, 2, QtWidgets.QTableWidgetItem())
+        layout.addWidget(self.table)
+
+        self.error_label = QtWidgets.QLabel()
+        self.error_label.setStyleSheet("color: #f44336;")
+        layout.addWidget(self.error_label)
+
+        buttons = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Ok | QtWidgets.QDialogButtonBox.Cancel)
+        self.ok_btn = buttons.button(QtWidgets.QDialogButtonBox.Ok)
+        self.ok_btn.setText("Apply to All Groups")
+        preview_btn = buttons.addButton("Preview on Model", QtWidgets.QDialogButtonBox.ActionRole)
+        preview_btn.clicked.connect(lambda: self.on_preview(self.result_colors))
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+        self.setLayout(layout)
+
+        for spin in (self.hue, self.saturation, self.brightness, self.temperature):
+            spin.valueChanged.connect(self.update_result)
+        self.palette_input.textChanged.connect(self.update_result)
+        self.update_result()
+
+    def update_result(self):
+        try:
+            palette = parse_palette(self.palette_input.text())
+        except ValueError as e:
+            self.error_label.setText(str(e))
+            self.ok_btn.setEnabled(False)
+            return
+        self.error_label.clear()
+        self.ok_btn.setEnabled(True)
+
+        self.result_colors = transform_palette(
+            self.colors,
+            hue=self.hue.value(),
+            saturation=self.saturation.value(),
+            brightness=self.brightness.value(),
+            temperature=self.temperature.value(),
+            palette=palette,
+        )
+        for row, color in enumerate(self.result_colors.values()):
+            self.table.item(row, 2).setBackground(QtGui.QColor(*color))
+
+
+class HealthReportDialog(QtWidgets.QDialog):
+    """Name health of every group of every model, with bulk fixes"""
+
+    COLUMNS = ["Group", "Layers", "Exact", "Case", "Dead", "Rule matches", "Coverage"]
+
+    def __init__(self, on_fix, on_refresh, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Group Health Report")
+        self.resize(750, 500)
+        self.report = None
+        self.on_fix = on_fix
+        self.on_refresh = on_refresh
+
+        layout = QtWidgets.QVBoxLayout()
+        self.summary_label = QtWidgets.QLabel("Checking groups...")
+        layout.addWidget(self.summary_label)
+
+        self.tree = QtWidgets.QTreeWidget()
+        self.tree.setHeaderLabels(self.COLUMNS)
+        self.tree.header().setSectionResizeMode(0, QtWidgets.QHeaderView.Stretch)
+        layout.addWidget(self.tree)
+
+        button_layout = QtWidgets.QHBoxLayout()
+        self.fix_case_btn = QtWidgets.QPushButton("Fix All Case Mismatches")
+        self.fix_case_btn.clicked.connect(lambda: self.on_fix(True, None))
+        self.fix_dead_btn = QtWidgets.QPushButton("Replace Dead Names With Suggestions")
+        self.fix_dead_btn.setToolTip(
+            f"Replace dead names whose best suggestion is at least {RemapDialog.AUTO_SELECT_SCORE:.0%} similar"
+        )
+        self.fix_dead_btn.clicked.connect(lambda: self.on_fix(False, RemapDialog.AUTO_SELECT_SCORE))
+        export_btn = QtWidgets.QPushButton("Export JSON...")
+        export_btn.clicked.connect(self.export_json)
+        refresh_btn = QtWidgets.QPushButton("Refresh")
+        refresh_btn.clicked.connect(self.on_refresh)
+        button_layout.addWidget(self.fix_case_btn)
+        button_layout.addWidget(self.fix_dead_btn)
+        button_layout.addStretch()
+        button_layout.addWidget(export_btn)
+        button_layout.addWidget(refresh_btn)
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+
+    def set_report(self, report):
+        self.report = report
+        self.tree.clear()
+        totals = {"groups": 0, "case": 0, "dead": 0, "stale": 0, "unmatched": 0}
+        for model_id, model in report["models"].items():
+            model_item = QtWidgets.QTreeWidgetItem([model["name"] or model_id or "Default groups"])
+            self.tree.addTopLevelItem(model_item)
+            if model["artmeshes"] is None:
+                model_item.setText(1, "no artmesh list cached")
+                continue
+
+            for group_name, result in model["groups"].items():
+                case_count, dead_count = len(result["case_mismatches"]), len(result["dead"])
+                rule_matches = result.get("rule_matches")
+                group_item = QtWidgets.QTreeWidgetItem([
+                    group_name, str(result["layers"]), str(result["exact"]),
+                    str(case_count), str(dead_count), "" if rule_matches is None else str(rule_matches),
+                    f"{result['coverage']:.0%}",
+                ])
+                if dead_count:
+                    group_item.setForeground(4, QtGui.QColor("#f44336"))
+                    totals["stale"] += 1
+                if rule_matches == 0:
+                    group_item.setForeground(5, QtGui.QColor("#f44336"))
+                    totals["unmatched"] += 1
+                for stored, actual in result["case_mismatches"]:
+                    group_item.addChild(QtWidgets.QTreeWidgetItem([f"{stored} → {actual} (case)"]))
+                for stored, suggestion, score in result["dead"]:
+                    label = f"✗ {stored}" + (f" → {suggestion} ({score:.0%})" if suggestion else "")
+                    group_item.addChild(QtWidgets.QTreeWidgetItem([label]))
+                model_item.addChild(group_item)
+                totals["groups"] += 1
+                totals["case"] += case_count
+                totals["dead"] += dead_count
+            model_item.setExpanded(True)
+
+        self.summary_label.setText(
+            f"{totals['groups']} groups in {len(report['models'])} models: "
+            f"{totals['stale']} with dead names, {totals['unmatched']} with rules matching nothing, "
+            f"{totals['case']} case mismatches, {totals['dead']} dead names "
+            f"({report['recomputed']} groups rechecked, the rest from cache)"
+        )
+        self.fix_case_btn.setEnabled(totals["case"] > 0)
+        self.fix_dead_btn.setEnabled(totals["dead"] > 0)
+
+    def export_json(self):
+        if self.report is None:
+            return
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self, "Export Health Report", "group_health.json", "JSON files (*.json)"
+        )
+        if not path:
+            return
+        try:
+            write_json_atomic(path, self.report)
+        except OSError as e:
+            QtWidgets.QMessageBox.critical(self, "Export Error", f"Failed to export report: {str(e)}")
+
+
+class DiagnosticsDialog(QtWidgets.QDialog):
+    """Live request latency, error and traffic counters of the client"""
+
+    COLUMNS = ["Request", "Count", "Errors", "Timeouts", "Mean ms", "p50 ms", "p95 ms", "Max ms"]
+
+    def __init__(self, client, control_server=None, parent=None):
+        super().__init__(parent)
+        self.client = client
+        self.control_server = control_server
+        self.setWindowTitle("Diagnostics")
+        self.resize(700, 350)
+
+        layout = QtWidgets.QVBoxLayout()
+        self.summary_label = QtWidgets.QLabel()
+        layout.addWidget(self.summary_label)
+
+        self.table = QtWidgets.QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        button_layout = QtWidgets.QHBoxLayout()
+        export_btn = QtWidgets.QPushButton("Export JSON...")
+        export_btn.clicked.connect(self.export_json)
+        reset_btn = QtWidgets.QPushButton("Reset")
+        reset_btn.clicked.connect(self.reset)
+        button_layout.addWidget(export_btn)
+        button_layout.addWidget(reset_btn)
+        button_layout.addStretch()
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(1000)
+        self.refresh()
+
+    def refresh(self):
+        snapshot = self.client.metrics.snapshot()
+        codec = snapshot["codec"]
+        self.summary_label.setText(
+            f"Sent: {snapshot['bytes_sent'] / 1024:.1f} KiB | "
+            f"Received: {snapshot['bytes_received'] / 1024:.1f} KiB in {snapshot['messages_received']} messages | "
+            f"Meshes matched: {snapshot['meshes_matched']}, unmatched: {snapshot['meshes_unmatched']} | "
+            f"Tint rate: {self.client.rate_controller.rate:.0f} req/s\n"
+            f"JSON ({codec['backend']}): encode {codec['encode_us_per_message']} µs, "
+            f"decode {codec['decode_us_per_message']} µs per message"
+        )
+        if self.control_server is not None:
+            control = self.control_server.stats()
+            self.summary_label.setText(
+                self.summary_label.text() +
+                f"\nControl endpoint (port {self.control_server.port}): {control['received']} commands, "
+                f"{control['coalesced']} coalesced, {control['shed']} shed, {control['failed']} failed | "
+                f"trigger to tint p50 {control['latency']['p50_ms']} ms, p95 {control['latency']['p95_ms']} ms"
+            )
+        requests = snapshot["requests"]
+        self.table.setRowCount(len(requests))
+        for row, (message_type, stats) in enumerate(requests.items()):
+            values = [
+                message_type, stats["count"], stats["errors"], stats["timeouts"],
+                stats["mean_ms"], stats["p50_ms"], stats["p95_ms"], stats["max_ms"],
+            ]
+            for column, value in enumerate(values):
+                self.table.setItem(row, column, QtWidgets.QTableWidgetItem(str(value)))
+
+    def reset(self):
+        self.client.metrics.reset()
+        self.refresh()
+
+    def export_json(self):
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self, "Export Diagnostics", "vtube_recolor_metrics.json", "JSON files (*.json)"
+        )
+        if not path:
+            return
+        try:
+            self.client.metrics.export_json(path, {
+                "tint_rate": self.client.rate_controller.rate,
+                "connection_state": self.client.state,
+                "control": self.control_server.stats() if self.control_server is not None else None,
+            })
+        except OSError as e:
+            QtWidgets.QMessageBox.critical(self, "Export Error", f"Failed to export diagnostics: {str(e)}")
+
+    def closeEvent(self, event):
+        self.timer.stop()
+        super().closeEvent(event)
+
+
+class StatusBar(QtWidgets.QLabel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setText("Ready")
+        self.setStyleSheet("QLabel { background-color: #f0f0f0; padding: 5px; border-top: 1px solid #ccc; }")
+
+    def show_message(self, message, timeout=3000):
+        self.setText(message)
+        if timeout > 0:
+            QtCore.QTimer.singleShot(timeout, lambda: self.setText("Ready"))
+
+
+class ConnectionIndicator(QtWidgets.QLabel):
+    """Colored dot and label showing the client's connection state"""
+
+    STATES = {
+        "disconnected": ("#9E9E9E", "Not connected"),
+        "connecting": ("#FF9800", "Connecting to VTube Studio..."),
+        "connected": ("#4CAF50", "Connected"),
+        "reconnecting": ("#f44336", "Reconnecting..."),
+    }
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.set_state("disconnected")
+
+    def set_state(self, state, detail=None):
+        color, text = self.STATES.get(state, self.STATES["disconnected"])
+        self.setText(f"<span style='color: {color};'>●</span> {text}")
+        self.setToolTip(detail or "")
+
+
+class MainWindow(QtWidgets.QWidget):
+    def __init__(self, client):
+        super().__init__()
+        self.client = client
+        self.setWindowTitle("VTS Artmesh Color Tool with Groups")
+        self.setGeometry(100, 100, 900, 600)
+
+        self.groups = {}  # group_name: { "color": [r,g,b], "layers": [names...] }
+        self.group_store = GroupStore()
+        self.group_store.save_error_handler = self.on_autosave_error
+        self.active_model_id = DEFAULT_GROUPS_MODEL  # Model whose groups are being edited
+        self.selected_color = QtGui.QColor(255, 255, 255)
+        self.catalog = ArtMeshCatalog()  # Current artmesh names for validation
+        self.artmeshes_synced = False  # A live artmesh list has been loaded, not just the disk cache
+
+        self._model_load_task = None
+        self._color_dialog = None
+        self._diagnostics_dialog = None
+        self._health_dialog = None
+        self.control_server = None  # Local endpoint for bots, see start_control_server()
+        self.health_checker = HealthChecker(client.artmesh_cache)
+        self.animator = Animator(client)
+        self.connection_state = client.state
+
+        self.init_ui()
+        try:
+            groups = self.group_store.load(self.active_model_id)  # Auto-load groups on startup
+        except (OSError, ValueError) as e:
+            QtWidgets.QMessageBox.critical(self, "Load Error", f"Failed to load groups: {str(e)}")
+            groups = {}
+        self.show_groups(groups)
+        self.load_cached_artmeshes()
+        self.client.add_event_handler("ModelLoadedEvent", self.on_model_loaded)
+        self.client.add_state_handler(self.on_connection_state)
+
+    def init_ui(self):
+        main_layout = QtWidgets.QVBoxLayout()
+
+        # Add refresh button at the top
+        refresh_layout = QtWidgets.QHBoxLayout()
+        self.connection_indicator = ConnectionIndicator()
+        self.connection_indicator.set_state(self.client.state)
+        refresh_layout.addWidget(self.connection_indicator)
+        self.refresh_btn = QtWidgets.QPushButton("🔄 Refresh Artmeshes")
+        self.refresh_btn.clicked.connect(self.refresh_artmeshes_clicked)
+        self.refresh_btn.setStyleSheet("QPushButton { background-color: #9C27B0; color: white; font-weight: bold; }")
+        refresh_layout.addWidget(self.refresh_btn)
+        self.reapply_on_load_check = QtWidgets.QCheckBox("Re-apply all groups on model load")
+        refresh_layout.addWidget(self.reapply_on_load_check)
+        refresh_layout.addStretch()
+
+        # Live view of the client's tint pacing
+        self.rate_label = QtWidgets.QLabel()
+        self.rate_label.setStyleSheet("QLabel { font-size: 10px; color: #666; }")
+        refresh_layout.addWidget(self.rate_label)
+        self.diagnostics_btn = QtWidgets.QPushButton("Diagnostics")
+        self.diagnostics_btn.clicked.connect(self.show_diagnostics)
+        refresh_layout.addWidget(self.diagnostics_btn)
+        self.rate_timer = QtCore.QTimer(self)
+        self.rate_timer.timeout.connect(self.update_rate_label)
+        self.rate_timer.start(500)
+        self.update_rate_label()
+
+        main_layout.addLayout(refresh_layout)
+
+        # Create horizontal layout for main content
+        content_layout = QtWidgets.QHBoxLayout()
+
+        # Left panel - Layers
+        left_panel = QtWidgets.QVBoxLayout()
+        left_panel.addWidget(QtWidgets.QLabel("<b>Available Layers</b>"))
+        
+        # Search box for layers
+        self.layer_search = QtWidgets.QLineEdit()
+        self.layer_search.setPlaceholderText("Search layers...")
+        left_panel.addWidget(self.layer_search)
+        
+        # Filter only once typing pauses
+        self.layer_filter_timer = QtCore.QTimer(self)
+        self.layer_filter_timer.setSingleShot(True)
+        self.layer_filter_timer.setInterval(FILTER_DEBOUNCE_MS)
+        self.layer_filter_timer.timeout.connect(self.filter_layers)
+        self.layer_search.textChanged.connect(self.layer_filter_timer.start)
+        
+        self.layer_model = ArtMeshListModel(self)
+        self.layer_proxy = NameFilterProxyModel(self)
+        self.layer_proxy.setSourceModel(self.layer_model)
+        self.layer_proxy.sort(0)
+        
+        self.layer_list = QtWidgets.QListView()
+        self.layer_list.setModel(self.layer_proxy)
+        self.layer_list.setUniformItemSizes(True)
+        self.layer_list.setSelectionMode(QtWidgets.QAbstractItemView.MultiSelection)
+        left_panel.addWidget(self.layer_list)
+        
+        # Layer count label
+        self.layer_count_label = QtWidgets.QLabel("Layers: 0")
+        self.layer_count_label.setStyleSheet("QLabel { font-size: 10px; color: #666; }")
+        left_panel.addWidget(self.layer_count_label)
+        
+        content_layout.addLayout(left_panel, 1)
+
+        # Middle panel - Assignment buttons
+        middle_panel = QtWidgets.QVBoxLayout()
+        middle_panel.addStretch()
+        
+        self.assign_btn = QtWidgets.QPushButton("Add to Group →")
+        self.assign_btn.setFixedSize(120, 35)
+        self.assign_btn.clicked.connect(self.assign_selected_layers)
+        self.assign_btn.setStyleSheet("QPushButton { background-color: #4CAF50; color: white; font-weight: bold; }")
+        
+        self.remove_btn = QtWidgets.QPushButton("← Remove")
+        self.remove_btn.setFixedSize(120, 35)
+        self.remove_btn.clicked.connect(self.remove_selected_layers)
+        self.remove_btn.setStyleSheet("QPushButton { background-color: #f44336; color: white; font-weight: bold; }")
+        
+        middle_panel.addWidget(self.assign_btn)
+        middle_panel.addWidget(self.remove_btn)
+        middle_panel.addStretch()
+        
+        content_layout.addLayout(middle_panel, 0)
+
+        # Right panel - Groups
+        right_panel = QtWidgets.QVBoxLayout()
+        right_panel.addWidget(QtWidgets.QLabel("<b>Groups</b>"))
+        
+        # Group creation controls
+        group_create_layout = QtWidgets.QHBoxLayout()
+        self.group_input = QtWidgets.QLineEdit()
+        self.group_input.setPlaceholderText("New group name")
+        self.group_input.returnPressed.connect(self.create_group)
+        self.add_group_btn = QtWidgets.QPushButton("Create")
+        self.add_group_btn.clicked.connect(self.create_group)
+        self.add_group_btn.setStyleSheet("QPushButton { background-color: #2196F3; color: white; }")
+        group_create_layout.addWidget(self.group_input)
+        group_create_layout.addWidget(self.add_group_btn)
+        right_panel.addLayout(group_create_layout)
+
+        self.group_list = QtWidgets.QListWidget()
+        self.group_list.itemSelectionChanged.connect(self.update_group_details)
+        self.group_list.itemDoubleClicked.connect(self.rename_group)
+        right_panel.addWidget(self.group_list)
+
+        # Group details
+        group_detail_layout = QtWidgets.QVBoxLayout()
+        group_detail_layout.addWidget(QtWidgets.QLabel("<b>Group Contents</b>"))
+        self.group_search = QtWidgets.QLineEdit()
+        self.group_search.setPlaceholderText("Search group...")
+        group_detail_layout.addWidget(self.group_search)
+        
+        self.group_filter_timer = QtCore.QTimer(self)
+        self.group_filter_timer.setSingleShot(True)
+        self.group_filter_timer.setInterval(FILTER_DEBOUNCE_MS)
+        self.group_filter_timer.timeout.connect(self.filter_group_detail)
+        self.group_search.textChanged.connect(self.group_filter_timer.start)
+        
+        self.group_detail_model = GroupDetailModel(self)
+        self.group_detail_proxy = NameFilterProxyModel(self)
+        self.group_detail_proxy.setSourceModel(self.group_detail_model)
+        
+        self.group_detail = QtWidgets.QListView()
+        self.group_detail.setModel(self.group_detail_proxy)
+        self.group_detail.setUniformItemSizes(True)
+        self.group_detail.setSelectionMode(QtWidgets.QAbstractItemView.MultiSelection)
+        group_detail_layout.addWidget(self.group_detail)
+        self.rules_label = QtWidgets.QLabel()
+        self.rules_label.setWordWrap(True)
+        self.rules_label.hide()
+        group_detail_layout.addWidget(self.rules_label)
+        right_panel.addLayout(group_detail_layout)
+
+        # Color controls
+        color_layout = QtWidgets.QHBoxLayout()
+        self.color_preview = ColorPreviewWidget()
+        self.color_picker = QtWidgets.QPushButton("Pick Color")
+        self.color_picker.clicked.connect(self.pick_color)
+        self.live_preview_check = QtWidgets.QCheckBox("Live preview")
+        self.live_preview_check.setToolTip("Show colors on the selected group while picking")
+        self.live_preview_check.setChecked(True)
+        self.apply_color_btn = QtWidgets.QPushButton("Apply Color")
+        self.apply_color_btn.clicked.connect(self.apply_color_clicked)
+        self.apply_color_btn.setStyleSheet("QPushButton { background-color: #FF9800; color: white; font-weight: bold; }")
+        
+        color_layout.addWidget(QtWidgets.QLabel("Color:"))
+        color_layout.addWidget(self.color_preview)
+        color_layout.addWidget(self.color_picker)
+        color_layout.addWidget(self.live_preview_check)
+        color_layout.addWidget(self.apply_color_btn)
+        right_panel.addLayout(color_layout)
+
+        # Animation controls: from the group's stored color to the picked color
+        animation_layout = QtWidgets.QHBoxLayout()
+        self.animation_combo = QtWidgets.QComboBox()
+        self.animation_combo.addItems(["Fade", "Pulse", "Gradient", "Moving Gradient"])
+        self.animation_seconds = QtWidgets.QDoubleSpinBox()
+        self.animation_seconds.setRange(0.1, 60.0)
+        self.animation_seconds.setValue(2.0)
+        self.animation_seconds.setSuffix(" s")
+        self.animation_seconds.setToolTip("Fade duration, or pulse / scroll period")
+        self.animate_btn = QtWidgets.QPushButton("Animate")
+        self.animate_btn.clicked.connect(self.animate_selected_group)
+        self.stop_animation_btn = QtWidgets.QPushButton("Stop")
+        self.stop_animation_btn.clicked.connect(self.animator.stop)
+
+        animation_layout.addWidget(QtWidgets.QLabel("Animate:"))
+        animation_layout.addWidget(self.animation_combo)
+        animation_layout.addWidget(self.animation_seconds)
+        animation_layout.addWidget(self.animate_btn)
+        animation_layout.addWidget(self.stop_animation_btn)
+        right_panel.addLayout(animation_layout)
+
+        self.apply_all_btn = QtWidgets.QPushButton("Apply All Groups")
+        self.apply_all_btn.clicked.connect(self.apply_all_clicked)
+        self.apply_all_btn.setStyleSheet("QPushButton { background-color: #E65100; color: white; font-weight: bold; }")
+        right_panel.addWidget(self.apply_all_btn)
+
+        self.palette_btn = QtWidgets.QPushButton("Palette...")
+        self.palette_btn.setToolTip("Shift hue, saturation, brightness or temperature of every group at once")
+        self.palette_btn.clicked.connect(self.edit_palette)
+        right_panel.addWidget(self.palette_btn)
+
+        # Group management buttons
+        group_mgmt_layout = QtWidgets.QHBoxLayout()
+        self.delete_group_btn = QtWidgets.QPushButton("Delete Group")
+        self.delete_group_btn.clicked.connect(self.delete_group)
+        self.delete_group_btn.setStyleSheet("QPushButton { background-color: #f44336; color: white; }")
+        
+        self.clear_group_btn = QtWidgets.QPushButton("Clear Group")
+        self.clear_group_btn.clicked.connect(self.clear_group)
+        
+        self.validate_btn = QtWidgets.QPushButton("Validate Names")
+        self.validate_btn.clicked.connect(self.validate_group_names)
+        self.validate_btn.setStyleSheet("QPushButton { background-color: #FF5722; color: white; }")
+        
+        group_mgmt_layout.addWidget(self.delete_group_btn)
+        group_mgmt_layout.addWidget(self.clear_group_btn)
+        group_mgmt_layout.addWidget(self.validate_btn)
+        self.rules_btn = QtWidgets.QPushButton("Edit Rules...")
+        self.rules_btn.setToolTip("Add artmeshes to the group by prefix, suffix or regex instead of by name")
+        self.rules_btn.clicked.connect(self.edit_group_rules)
+        group_mgmt_layout.addWidget(self.rules_btn)
+        self.health_btn = QtWidgets.QPushButton("Health Report")
+        self.health_btn.setToolTip("Check every group of every model for case mismatches and dead names")
+        self.health_btn.clicked.connect(self.show_health_report)
+        group_mgmt_layout.addWidget(self.health_btn)
+        right_panel.addLayout(group_mgmt_layout)
+
+        # File controls
+        file_layout = QtWidgets.QHBoxLayout()
+        self.save_btn = QtWidgets.QPushButton("Save Groups")
+        self.load_btn = QtWidgets.QPushButton("Load Groups")
+        self.save_btn.clicked.connect(self.save_groups)
+        self.load_btn.clicked.connect(self.load_groups)
+        file_layout.addWidget(self.save_btn)
+        file_layout.addWidget(self.load_btn)
+        right_panel.addLayout(file_layout)
+
+        content_layout.addLayout(right_panel, 2)
+        main_layout.addLayout(content_layout)
+
+        # Status bar
+        self.status_bar = StatusBar()
+        main_layout.addWidget(self.status_bar)
+
+        self.setLayout(main_layout)
+
+    def update_rate_label(self):
+        rate = self.client.rate_controller
+        self.rate_label.setText(
+            f"Tint rate: {rate.rate:.0f} req/s | Queued: {rate.waiting + self.client.held_tints} | "
+            f"In flight: {self.client.in_flight}"
+            + (f" | Animation: {self.animator.achieved_fps:.0f} fps, "
+               f"{self.animator.frames_dropped} frames dropped" if self.animator.running else "")
+        )
+
+    def show_diagnostics(self):
+        if self._diagnostics_dialog is None:
+            self._diagnostics_dialog = DiagnosticsDialog(self.client, self.control_server, self)
+        self._diagnostics_dialog.show()
+        self._diagnostics_dialog.raise_()
+
+    def filter_layers(self):
+        self.layer_proxy.set_query(self.layer_search.text())
+
+    def filter_group_detail(self):
+        self.group_detail_proxy.set_query(self.group_search.text())
+
+    def load_artmeshes(self, catalog):
+        """Show a new catalog, updating the views in place.
+
+        Returns a summary of added/removed artmeshes and of group members
+        whose validity changed.
+        """
+        previous = self.catalog
+        self.catalog = catalog
+        switched = self.activate_model(catalog)
+
+        if not len(previous):
+            self.layer_model.set_names(catalog.names)
+            added, removed = list(catalog.names), []
+        else:
+            added, removed = catalog.diff(previous)
+            self.layer_model.apply_diff(added, removed)
+        self.group_detail_model.set_catalog(catalog)
+        self.update_rules_label()
+
+        now_valid = {}
+        now_invalid = {}
+        rules_unmatched = []  # Rule groups whose rules stopped matching anything
+        if len(previous) and not switched and (added or removed):
+            for group_name, group in self.groups.items():
+                rules = group.get("rules")
+                if rules and previous.match_rules(rules)[0] and not catalog.match_rules(rules)[0]:
+                    rules_unmatched.append(group_name)
+                for layer in group["layers"]:
+                    was_valid = layer in previous
+                    is_valid = layer in catalog
+                    if is_valid and not was_valid:
+                        now_valid.setdefault(group_name, []).append(layer)
+                    elif was_valid and not is_valid:
+                        now_invalid.setdefault(group_name, []).append(layer)
+
+        self.layer_count_label.setText(f"Layers: {len(catalog)}")
+        self.status_bar.show_message(f"Loaded {len(catalog)} artmeshes")
+        return {"added": added, "removed": removed, "now_valid": now_valid, "now_invalid": now_invalid,
+                "rules_unmatched": rules_unmatched}
+
+    def activate_model(self, catalog):
+        """Switch to the saved groups of the catalog's model; returns True if switched"""
+        model_id = catalog.model_id
+        if model_id is None or model_id == self.active_model_id:
+            return False
+
+        try:
+            self.group_store.flush()
+            groups = self.group_store.load(model_id)
+        except (OSError, ValueError) as e:
+            self.status_bar.show_message(f"Failed to load groups for {catalog.model_name}: {e}", 8000)
+            return False
+
+        self.active_model_id = model_id
+        self.show_groups(groups)
+        return True
+
+    def show_groups(self, groups):
+        # Clear first: dropping the selection calls update_group_details,
+        # which must still see the groups the selected name belongs to
+        self.group_list.clear()
+        self.groups = groups
+        for name in self.groups.keys():
+            self.group_list.addItem(name)
+        self.group_detail_model.set_layers([], self.catalog)
+        self.update_rules_label()
+
+    def groups_changed(self):
+        """Autosave the active model's groups shortly after the last edit"""
+        self.group_store.schedule_save(self.active_model_id, self.groups, self.catalog.model_name)
+
+    def on_autosave_error(self, model_id, error):
+        self.status_bar.show_message(f"Autosave failed: {error}", 8000)
+
+    async def start_control_server(self, port):
+        """Let external triggers apply groups and the scene, see ControlServer"""
+        # Until the live list is in, groups and the catalog may belong to another model
+        server = ControlServer(self.execute_control_command, port, validate=self.validate_control_command,
+                               ready=lambda: self.artmeshes_synced)
+        try:
+            await server.start()
+        except OSError as e:
+            QtWidgets.QMessageBox.warning(
+                self, "Control Endpoint", f"Could not listen on port {port}: {str(e)}"
+            )
+            return
+        self.control_server = server
+        self.status_bar.show_message(f"Control endpoint on http://{server.host}:{server.port}")
+
+    def validate_control_command(self, command):
+        if command["action"] == "apply" and command["group"] not in self.groups:
+            raise ValueError(f"unknown group: {command['group']}")
+
+    async def execute_control_command(self, command):
+        tinted, failed, unchanged = await run_control_command(self.client, self.groups, command)
+        target = command.get("group") or "scene"
+        message = f"Remote: applied {target} to {len(tinted) + len(unchanged)} layers"
+        if failed:
+            message += f", {len(failed)} failed"
+        self.status_bar.show_message(message)
+
+    def closeEvent(self, event):
+        if self.control_server is not None:
+            asyncio.ensure_future(self.control_server.stop())
+            self.control_server = None
+        try:
+            self.group_store.flush()
+        except (OSError, ValueError) as e:
+            QtWidgets.QMessageBox.critical(self, "Save Error", f"Failed to save groups: {str(e)}")
+        super().closeEvent(event)
+
+    def refresh_artmeshes_clicked(self):
+        """Wrapper to call async refresh from button click"""
+        loop = asyncio.get_event_loop()
+        # Use ensure_future to properly schedule the coroutine
+        asyncio.ensure_future(self.refresh_artmeshes())
+
+    async def refresh_artmeshes(self):
+        """Refresh the artmesh list from VTube Studio"""
+        try:
+            self.status_bar.show_message("Refreshing artmeshes...")
+            # The model may have been reloaded, which clears its tints
+            self.client.tint_state.invalidate()
+            meshes = await self.client.get_artmeshes()
+            changes = self.load_artmeshes(meshes)
+            self.artmeshes_synced = True
+            self.status_bar.show_message(self.describe_refresh(changes), 8000)
+        except Exception as e:
+            QtWidgets.QMessageBox.critical(self, "Refresh Error", f"Failed to refresh artmeshes: {str(e)}")
+            self.status_bar.show_message("Refresh failed")
+
+    def load_cached_artmeshes(self, model_id=None):
+        """Show the cached artmesh list until VTube Studio sends a fresh one"""
+        catalog = self.client.cached_catalog(model_id)
+        if catalog is None or catalog is self.catalog:
+            return False
+        self.load_artmeshes(catalog)
+        self.status_bar.show_message(
+            f"Showing {len(catalog)} cached artmeshes for {catalog.model_name or 'the last model'}"
+        )
+        return True
+
+    def on_connection_state(self, state):
+        previous, self.connection_state = self.connection_state, state
+        self.connection_indicator.set_state(state, self.client.last_error)
+        if state == "reconnecting":
+            self.status_bar.show_message("Connection to VTube Studio lost, reconnecting...", 0)
+        elif state == "connected":
+            # Artmeshes stream in once connected; after a reconnect the
+            # model may also have changed while we were away
+            context = "Reconnected to VTube Studio" if previous == "reconnecting" else "Connected to VTube Studio"
+            asyncio.ensure_future(self.sync_artmeshes(context))
+
+    def on_model_loaded(self, data):
+        """Refresh (and optionally recolor) when VTube Studio switches models"""
+        # Only the newest model matters if several load in quick succession
+        if self._model_load_task and not self._model_load_task.done():
+            self._model_load_task.cancel()
+        self._model_load_task = asyncio.ensure_future(self._handle_model_loaded(data))
+
+    async def _handle_model_loaded(self, data):
+        if not data.get("modelLoaded"):
+            self.status_bar.show_message("Model unloaded")
+            return
+
+        self.animator.stop()
+        model_name = data.get("modelName", "model")
+        self.load_cached_artmeshes(data.get("modelID"))
+        changes = await self.sync_artmeshes(f"Loaded {model_name}")
+        if changes is None:
+            return
+
+        if self.reapply_on_load_check.isChecked() and self.groups:
+            await self.apply_all_groups(quiet=True)
+
+    async def sync_artmeshes(self, context):
+        """Fetch the artmesh list without prompts; returns the changes or None"""
+        try:
+            meshes = await self.client.get_artmeshes()
+        except Exception as e:
+            self.status_bar.show_message(f"{context}, but refreshing artmeshes failed: {e}", 8000)
+            return None
+
+        changes = self.load_artmeshes(meshes)
+        self.artmeshes_synced = True
+        self.status_bar.show_message(f"{context}. {self.describe_refresh(changes)}", 8000)
+        return changes
+
+    def describe_refresh(self, changes):
+        """One-line summary of what a refresh changed"""
+        if not changes["added"] and not changes["removed"]:
+            return "Artmeshes refreshed: no changes"
+
+        message = f"Artmeshes refreshed: +{len(changes['added'])} / -{len(changes['removed'])}"
+        for key, label in (("now_invalid", "became invalid"), ("now_valid", "became valid")):
+            groups = changes[key]
+            if groups:
+                count = sum(len(layers) for layers in groups.values())
+                message += f"; {count} group layers {label} ({', '.join(groups)})"
+        if changes["rules_unmatched"]:
+            message += f"; rules match nothing now in {', '.join(changes['rules_unmatched'])}"
+        return message
+
+    def validate_group_names(self):
+        """Check which artmesh names in groups are valid"""
+        group_item = self.group_list.currentItem()
+        if not group_item:
+            QtWidgets.QMessageBox.warning(self, "No Group Selected", "Please select a group first.")
+            return
+        
+        group_name = group_item.text()
+        layers = self.groups[group_name]["layers"]
+        
+        if not layers:
+            QtWidgets.QMessageBox.information(self, "Empty Group", "The selected group has no layers.")
+            return
+        
+        valid_names = []
+        invalid_names = []
+        case_mismatch_names = []
+        
+        for layer in layers:
+            actual_name = self.catalog.resolve(layer)
+            if actual_name == layer:
+                # Exact match
+                valid_names.append(layer)
+            elif actual_name is not None:
+                # Case mismatch - store both the stored name and actual name
+                case_mismatch_names.append((layer, actual_name))
+            else:
+                # No match at all
+                invalid_names.append(layer)
+        
+        # Show results
+        message = f"Group: {group_name}\n\n"
+        message += f"Exact matches ({len(valid_names)}):\n"
+        for name in valid_names[:10]:
+            message += f"  ✓ {name}\n"
+        if len(valid_names) > 10:
+            message += f"  ... and {len(valid_names) - 10} more\n"
+        
+        if case_mismatch_names:
+            message += f"\nCase mismatches ({len(case_mismatch_names)}):\n"
+            for stored_name, actual_name in case_mismatch_names[:10]:
+                message += f"  ⚠ '{stored_name}' → '{actual_name}'\n"
+            if len(case_mismatch_names) > 10:
+                message += f"  ... and {len(case_mismatch_names) - 10} more\n"
+        
+        message += f"\nNo matches ({len(invalid_names)}):\n"
+        for name in invalid_names[:10]:
+            message += f"  ✗ {name}\n"
+        if len(invalid_names) > 10:
+            message += f"  ... and {len(invalid_names) - 10} more\n"
+        
+        # Suggest fixing case mismatches
+        if case_mismatch_names:
+            reply = QtWidgets.QMessageBox.question(
+                self, "Fix Case Mismatches?",
+                message + f"\n\nWould you like to automatically fix the {len(case_mismatch_names)} case mismatches?",
+                QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No
+            )
+            
+            if reply == QtWidgets.QMessageBox.Yes:
+                # Fix case mismatches
+                for stored_name, actual_name in case_mismatch_names:
+                    idx = self.groups[group_name]["layers"].index(stored_name)
+                    self.groups[group_name]["layers"][idx] = actual_name
+                
+                self.groups_changed()
+                self.update_group_details()
+                self.status_bar.show_message(f"Fixed {len(case_mismatch_names)} case mismatches")
+                if not invalid_names:
+                    return
+        
+        # Offer ranked replacements for completely invalid names
+        suggestions = {}
+        if invalid_names:
+            ranked = self.catalog.suggestions.suggest_many(invalid_names)
+            suggestions = {name: found for name, found in ranked.items() if found}
+            message += f"\nSuggested replacements found for {len(suggestions)} of {len(invalid_names)} invalid names.\n"
+        
+        if not case_mismatch_names:
+            QtWidgets.QMessageBox.information(self, "Name Validation Results", message)
+        
+        if suggestions:
+            dialog = RemapDialog(suggestions, self)
+            if dialog.exec_() == QtWidgets.QDialog.Accepted:
+                remapped = self.remap_group_layers(group_name, dialog.selected_remappings())
+                self.groups_changed()
+                self.update_group_details()
+                self.status_bar.show_message(f"Remapped {remapped} invalid names")
+
+    def remap_group_layers(self, group_name, remappings):
+        """Replace stored layer names in a group; returns how many were changed"""
+        return remap_layers(self.groups[group_name]["layers"], remappings)
+
+    def show_health_report(self):
+        if self._health_dialog is None:
+            self._health_dialog = HealthReportDialog(
+                self.fix_from_health_report,
+                lambda: asyncio.ensure_future(self.refresh_health_report()),
+                self
+            )
+        self._health_dialog.show()
+        self._health_dialog.raise_()
+        asyncio.ensure_future(self.refresh_health_report())
+
+    async def refresh_health_report(self):
+        """Check all groups of all models in a worker thread and show the result"""
+        models = {}
+        known = self.group_store.models()
+        for model_id in dict.fromkeys([self.active_model_id, *known]):
+            name = known.get(model_id, {}).get("name")
+            if model_id == self.active_model_id:
+                groups = self.groups
+                name = name or self.catalog.model_name
+            else:
+                try:
+                    groups = self.group_store.load(model_id)
+                except (OSError, ValueError) as e:
+                    log.warning("Failed to load groups of %s: %s", model_id, e)
+                    continue
+            # The worker gets its own copy so edits can't race with it
+            models[model_id] = (name, copy.deepcopy(groups))
+
+        loop = asyncio.get_event_loop()
+        report = await loop.run_in_executor(None, self.health_checker.report, models, self.catalog)
+        if self._health_dialog is not None:
+            self._health_dialog.set_report(report)
+
+    def fix_from_health_report(self, fix_case, min_score):
+        dialog = self._health_dialog
+        if dialog is None or dialog.report is None:
+            return
+
+        changed = 0
+        for model_id, model_report in dialog.report["models"].items():
+            if model_report["artmeshes"] is None:
+                continue
+            groups = self.groups if model_id == self.active_model_id else self.group_store.load(model_id)
+            fixed = fix_groups_from_report(groups, model_report, fix_case, min_score)
+            if fixed:
+                self.group_store.schedule_save(model_id, groups, model_report["name"])
+                changed += fixed
+
+        self.update_group_details()
+        self.status_bar.show_message(f"Fixed {changed} names across all models")
+        asyncio.ensure_future(self.refresh_health_report())
+
+    def find_similar_names(self, target_name, max_suggestions=3):
+        """Find similar artmesh names ranked by trigram similarity"""
+        return [name for name, _ in self.catalog.suggestions.suggest(target_name, max_suggestions)]
+
+    def create_group(self):
+        name = self.group_input.text().strip()
+        if not name:
+            QtWidgets.QMessageBox.warning(self, "Invalid Input", "Group name cannot be empty.")
+            return
+        if name in self.groups:
+            QtWidgets.QMessageBox.warning(self, "Duplicate Name", "Group name already exists.")
+            return
+        self.groups[name] = {"color": [255, 255, 255], "layers": []}
+        self.groups_changed()
+        self.group_list.addItem(name)
+        self.group_input.clear()
+        self.status_bar.show_message(f"Created group: {name}")
+
+    def delete_group(self):
+        group_item = self.group_list.currentItem()
+        if not group_item:
+            QtWidgets.QMessageBox.warning(self, "No Selection", "Please select a group to delete.")
+            return
+        
+        group_name = group_item.text()
+        reply = QtWidgets.QMessageBox.question(
+            self, "Confirm Delete", 
+            f"Are you sure you want to delete group '{group_name}'?",
+            QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No
+        )
+        
+        if reply == QtWidgets.QMessageBox.Yes:
+            del self.groups[group_name]
+            self.groups_changed()
+            self.group_list.takeItem(self.group_list.row(group_item))
+            self.group_detail_model.set_layers([], self.catalog)
+            self.status_bar.show_message(f"Deleted group: {group_name}")
+
+    def clear_group(self):
+        group_item = self.group_list.currentItem()
+        if not group_item:
+            QtWidgets.QMessageBox.warning(self, "No Selection", "Please select a group to clear.")
+            return
+        
+        group_name = group_item.text()
+        self.groups[group_name]["layers"] = []
+        self.groups[group_name].pop("rules", None)
+        self.groups_changed()
+        self.update_group_details()
+        self.status_bar.show_message(f"Cleared group: {group_name}")
+
+    def rename_group(self, item):
+        old_name = item.text()
+        new_name, ok = QtWidgets.QInputDialog.getText(
+            self, "Rename Group", "Enter new group name:", text=old_name
+        )
+        
+        if ok and new_name.strip() and new_name != old_name:
+            new_name = new_name.strip()
+            if new_name in self.groups:
+                QtWidgets.QMessageBox.warning(self, "Duplicate Name", "Group name already exists.")
+                return
+            
+            self.groups[new_name] = self.groups.pop(old_name)
+            self.groups_changed()
+            item.setText(new_name)
+            self.status_bar.show_message(f"Renamed group: {old_name} → {new_name}")
+
+    def update_group_details(self):
+        group_item = self.group_list.currentItem()
+        if not group_item or group_item.text() not in self.groups:
+            self.group_detail_model.set_layers([], self.catalog)
+            self.update_rules_label()
+            return
+        
+        group_name = group_item.text()
+        layers = self.groups[group_name]["layers"]
+        
+        # The model flags valid/invalid names as rows are drawn
+        self.group_detail_model.set_layers(layers, self.catalog)
+        self.update_rules_label()
+        
+        # Update color preview
+        color_rgb = self.groups[group_name]["color"]
+        color = QtGui.QColor(color_rgb[0], color_rgb[1], color_rgb[2])
+        self.color_preview.set_color(color)
+        self.selected_color = color
+
+    def update_rules_label(self):
+        group_item = self.group_list.currentItem()
+        group = self.groups.get(group_item.text()) if group_item else None
+        rules = group.get("rules") if group else None
+        if not rules:
+            self.rules_label.hide()
+            return
+        names, excluded = self.catalog.match_rules(rules)
+        parts = [f"{key}: {', '.join(rules[key])}" for key in ("prefix", "suffix", "regex") if key in rules]
+        parts += [f"{len(rules[key])} {key}d" for key in ("include", "exclude") if key in rules]
+        self.rules_label.setText(f"<b>Rules</b> ({'; '.join(parts)}) match {len(names)} artmeshes")
+        self.rules_label.show()
+
+    def edit_group_rules(self):
+        group_item = self.group_list.currentItem()
+        if not group_item:
+            QtWidgets.QMessageBox.warning(self, "No Group Selected", "Please select a group first.")
+            return
+
+        group_name = group_item.text()
+        group = self.groups[group_name]
+        dialog = RulesDialog(group_name, group.get("rules"), self.catalog, self)
+        if dialog.exec_() != QtWidgets.QDialog.Accepted or dialog.rules == group.get("rules"):
+            return
+        if dialog.rules is None:
+            group.pop("rules", None)
+        else:
+            group["rules"] = dialog.rules
+        self.groups_changed()
+        self.update_group_details()
+
+    def assign_selected_layers(self):
+        group_item = self.group_list.currentItem()
+        if not group_item:
+            QtWidgets.QMessageBox.warning(self, "No Group Selected", "Please select a group first.")
+            return
+        
+        group_name = group_item.text()
+        selected_layers = [index.data() for index in self.layer_list.selectionModel().selectedIndexes()]
+        
+        if not selected_layers:
+            QtWidgets.QMessageBox.warning(self, "No Layers Selected", "Please select layers to assign.")
+            return
+        
+        added_count = 0
+        existing = set(self.groups[group_name]["layers"])
+        for layer in selected_layers:
+            if layer not in existing:
+                self.groups[group_name]["layers"].append(layer)
+                existing.add(layer)
+                added_count += 1
+        
+        if added_count:
+            self.groups_changed()
+        self.update_group_details()
+        self.status_bar.show_message(f"Added {added_count} layers to {group_name}")
+
+    def remove_selected_layers(self):
+        group_item = self.group_list.currentItem()
+        if not group_item:
+            QtWidgets.QMessageBox.warning(self, "No Group Selected", "Please select a group first.")
+            return
+        
+        group_name = group_item.text()
+        selected_layers = [
+            index.data(GroupDetailModel.NameRole)
+            for index in self.group_detail.selectionModel().selectedIndexes()
+        ]
+        
+        if not selected_layers:
+            QtWidgets.QMessageBox.warning(self, "No Layers Selected", "Please select layers to remove.")
+            return
+        
+        removed = set(selected_layers)
+        self.groups[group_name]["layers"] = [
+            layer for layer in self.groups[group_name]["layers"] if layer not in removed
+        ]
+        self.groups_changed()
+        
+        self.update_group_details()
+        self.status_bar.show_message(f"Removed {len(selected_layers)} layers from {group_name}")
+
+    def pick_color(self):
+        """Open the color dialog; with live preview on, the selected group follows it"""
+        if self._color_dialog is not None:
+            self._color_dialog.raise_()
+            return
+
+        dialog = QtWidgets.QColorDialog(self.selected_color, self)
+        dialog.currentColorChanged.connect(self.color_preview.set_color)
+
+        group_item = self.group_list.currentItem()
+        group_name = group_item.text() if group_item else None
+        stream = None
+        if group_name and self.live_preview_check.isChecked():
+            names = self.group_artmeshes(group_name)
+            if names:
+                # Unknown tints (e.g. after a refresh) revert to the stored color
+                stream = TintStream(self.client, names, fallback=(*self.groups[group_name]["color"], 255))
+                dialog.currentColorChanged.connect(
+                    lambda color: stream.push(color.redF(), color.greenF(), color.blueF())
+                )
+                self.status_bar.show_message(f"Previewing colors on {group_name} ({len(names)} layers)", 0)
+
+        dialog.finished.connect(
+            lambda result: self.color_dialog_finished(dialog, result, group_name, stream)
+        )
+        self._color_dialog = dialog
+        dialog.show()
+
+    def group_artmeshes(self, group_name):
+        """Actual artmesh names of a group's valid layers and rule matches"""
+        return group_members(self.groups[group_name], self.catalog)[0]
+
+    def animate_selected_group(self):
+        """Animate the selected group from its stored color to the picked color"""
+        group_item = self.group_list.currentItem()
+        if not group_item:
+            QtWidgets.QMessageBox.warning(self, "No Group Selected", "Please select a group first.")
+            return
+
+        group_name = group_item.text()
+        names = self.group_artmeshes(group_name)
+        if not names:
+            QtWidgets.QMessageBox.warning(self, "Empty Group", "The selected group has no valid layers.")
+            return
+
+        start = tuple(self.groups[group_name]["color"])
+        end = (self.selected_color.red(), self.selected_color.green(), self.selected_color.blue())
+        seconds = self.animation_seconds.value()
+        kind = self.animation_combo.currentText()
+        if kind == "Fade":
+            animation = Fade(names, start, end, seconds)
+        elif kind == "Pulse":
+            animation = Pulse(names, start, end, period=seconds)
+        elif kind == "Gradient":
+            animation = Gradient(names, start, end)
+        else:
+            animation = Gradient(names, start, end, period=seconds, duration=None)
+
+        self.animator.start(animation)
+        self.status_bar.show_message(f"{kind} on {group_name} ({len(names)} layers)")
+
+    def color_dialog_finished(self, dialog, result, group_name, stream):
+        self._color_dialog = None
+        # Parented to the window, so it would otherwise live (with its preview
+        # connection) as long as the window does
+        dialog.deleteLater()
+        if result != QtWidgets.QDialog.Accepted:
+            self.color_preview.set_color(self.selected_color)
+            if stream:
+                asyncio.ensure_future(self.finish_preview(stream, group_name, revert=True))
+            return
+
+        color = dialog.currentColor()
+        self.selected_color = color
+        self.color_preview.set_color(color)
+        if stream:
+            # The group already shows the color, so keep it as the group's color
+            stream.push(color.redF(), color.greenF(), color.blueF())
+            if group_name in self.groups:
+                self.groups[group_name]["color"] = [color.red(), color.green(), color.blue()]
+                self.groups_changed()
+            asyncio.ensure_future(self.finish_preview(stream, group_name, revert=False))
+
+    async def finish_preview(self, stream, group_name, revert):
+        if revert:
+            await stream.revert()
+            self.status_bar.show_message(f"Preview cancelled, restored {group_name}")
+        else:
+            await stream.drain()
+            self.status_bar.show_message(
+                f"Applied color to {group_name} ({stream.frames_sent} preview frames, "
+                f"{stream.frames_coalesced} skipped)"
+            )
+
+    def apply_color_clicked(self):
+        """Wrapper to call async apply_color from button click"""
+        loop = asyncio.get_event_loop()
+        # Use ensure_future to properly schedule the coroutine
+        asyncio.ensure_future(self.apply_color_to_selected_group())
+
+    async def apply_color_to_selected_group(self):
+        group_item = self.group_list.currentItem()
+        if not group_item:
+            QtWidgets.QMessageBox.warning(self, "No Group Selected", "Please select a group first.")
+            return
+        
+        group_name = group_item.text()
+        layers = self.groups[group_name]["layers"]
+        rules = self.groups[group_name].get("rules")
+        
+        if not layers and not rules:
+            QtWidgets.QMessageBox.warning(self, "Empty Group", "The selected group has no layers.")
+            return
+        
+        # Same members as a scene apply: case-fixed layers plus rule matches
+        valid_layers, invalid_layers = group_members(self.groups[group_name], self.catalog)
+        resolved = ((layer, self.catalog.resolve(layer)) for layer in layers)
+        case_fixed_layers = [(layer, actual) for layer, actual in resolved if actual not in (None, layer)]
+        
+        if not valid_layers:
+            QtWidgets.QMessageBox.warning(
+                self, "No Valid Names", 
+                f"None of the {len(layers)} artmesh names in this group are currently valid.\n\n"
+                f"Use 'Validate Names' to see suggestions or 'Refresh Artmeshes' to update the list."
+            )
+            return
+        
+        # Show case fixes if any
+        if case_fixed_layers:
+            QtWidgets.QMessageBox.information(
+                self, "Case Mismatches Fixed",
+                f"Fixed {len(case_fixed_layers)} case mismatches automatically:\n" +
+                '\n'.join([f"'{old}' → '{new}'" for old, new in case_fixed_layers[:5]]) +
+                (f"\n... and {len(case_fixed_layers) - 5} more" if len(case_fixed_layers) > 5 else "")
+            )
+        
+        if invalid_layers:
+            reply = QtWidgets.QMessageBox.question(
+                self, "Invalid Names Found",
+                f"Group contains {len(invalid_layers)} invalid artmesh names.\n\n"
+                f"Continue with {len(valid_layers)} valid names only?",
+                QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No
+            )
+            if reply != QtWidgets.QMessageBox.Yes:
+                return
+
+        color = self.selected_color
+        self.groups[group_name]["color"] = [color.red(), color.green(), color.blue()]
+        self.groups_changed()
+
+        # Convert to float values (0.0 to 1.0)
+        r, g, b, a = color.redF(), color.greenF(), color.blueF(), 1.0
+        
+        log.info("Applying color (%.3f, %.3f, %.3f, %.3f) to group '%s' with %d valid layers",
+                 r, g, b, a, group_name, len(valid_layers))
+        self.status_bar.show_message(f"Applying colors to {len(valid_layers)} layers...")
+        
+        try:
+            tinted_layers, failed_layers, unchanged_layers = await self.client.tint_artmeshes(
+                valid_layers, r, g, b, a
+            )
+            success_count = len(tinted_layers) + len(unchanged_layers)
+            
+            # Show results
+            if success_count > 0:
+                message = f"Applied color to {success_count}/{len(valid_layers)} layers"
+                if unchanged_layers:
+                    message += f" ({len(unchanged_layers)} already up to date)"
+                self.status_bar.show_message(message)
+                if failed_layers:
+                    QtWidgets.QMessageBox.information(
+                        self, "Partial Success",
+                        f"Successfully colored {success_count} layers.\n"
+                        f"Failed to color {len(failed_layers)} layers:\n" +
+                        '\n'.join(failed_layers[:10]) +
+                        (f"\n... and {len(failed_layers) - 10} more" if len(failed_layers) > 10 else "")
+                    )
+            else:
+                self.status_bar.show_message("No artmeshes were colored")
+                QtWidgets.QMessageBox.warning(
+                    self, "No Success", 
+                    f"None of the {len(valid_layers)} layers were successfully colored.\n\n"
+                    f"Debug info for troubleshooting:\n" +
+                    f"First few layer names: {', '.join(valid_layers[:3])}\n\n"
+                    f"Try refreshing the artmesh list or check if the correct model is loaded."
+                )
+                
+        except Exception as e:
+            error_msg = f"Failed to apply colors: {str(e)}"
+            QtWidgets.QMessageBox.critical(self, "Error", error_msg)
+            self.status_bar.show_message("Color application failed")
+            log.exception("Exception in apply_color_to_selected_group: %s", e)
+
+    def apply_all_clicked(self):
+        """Wrapper to call async apply_all_groups from button click"""
+        asyncio.ensure_future(self.apply_all_groups())
+
+    async def apply_all_groups(self, quiet=False):
+        """Recolor the whole model from every group's stored color.
+
+        With ``quiet`` results only go to the status bar.
+        """
+        if not self.groups:
+            if not quiet:
+                QtWidgets.QMessageBox.warning(self, "No Groups", "There are no groups to apply.")
+            return
+
+        started = time.perf_counter()
+        mesh_colors, invalid = resolve_scene(self.groups, self.catalog)
+        resolved = time.perf_counter()
+
+        if not mesh_colors:
+            if quiet:
+                self.status_bar.show_message("No group layers match the loaded model")
+                return
+            QtWidgets.QMessageBox.warning(
+                self, "No Valid Names",
+                "None of the artmesh names in any group are currently valid.\n\n"
+                "Use 'Refresh Artmeshes' to update the list."
+            )
+            return
+
+        color_count = len({tuple(color) for color in mesh_colors.values()})
+        self.status_bar.show_message(
+            f"Applying {len(self.groups)} groups ({len(mesh_colors)} layers, {color_count} colors)...", 0
+        )
+
+        try:
+            requests_before = self.client.requests_sent
+            tinted, failed, unchanged = await self.client.tint_scene(mesh_colors)
+            finished = time.perf_counter()
+        except Exception as e:
+            if not quiet:
+                QtWidgets.QMessageBox.critical(self, "Error", f"Failed to apply groups: {str(e)}")
+            self.status_bar.show_message("Scene application failed")
+            return
+
+        self.status_bar.show_message(
+            f"Applied {len(self.groups)} groups in {(finished - started) * 1000:.0f} ms"
+        )
+        if quiet:
+            return
+
+        report = (
+            f"Groups: {len(self.groups)}\n"
+            f"Layers: {len(mesh_colors)} in {color_count} colors\n"
+            f"Tinted: {len(tinted)}, already up to date: {len(unchanged)}, failed: {len(failed)}\n"
+            f"Invalid names skipped: {len(invalid)}\n"
+            f"Requests sent: {self.client.requests_sent - requests_before}\n\n"
+            f"Resolve: {(resolved - started) * 1000:.1f} ms\n"
+            f"Apply: {(finished - resolved) * 1000:.1f} ms\n"
+            f"Total: {(finished - started) * 1000:.1f} ms"
+        )
+        if failed:
+            report += "\n\nFailed layers:\n" + '\n'.join(failed[:10])
+            if len(failed) > 10:
+                report += f"\n... and {len(failed) - 10} more"
+        QtWidgets.QMessageBox.information(self, "Scene Applied", report)
+
+    def edit_palette(self):
+        """Transform all group colors at once, previewing on the model first"""
+        if not self.groups:
+            QtWidgets.QMessageBox.warning(self, "No Groups", "There are no groups to recolor.")
+            return
+
+        previous = {}  # Tints to restore if a previewed palette is cancelled
+        previews = []
+        dialog = PaletteDialog(
+            self.groups,
+            lambda colors: previews.append(asyncio.ensure_future(self.preview_palette(colors, previous))),
+            self
+        )
+        if dialog.exec_() == QtWidgets.QDialog.Accepted:
+            for name, color in dialog.result_colors.items():
+                if name in self.groups:
+                    self.groups[name]["color"] = color
+            self.groups_changed()
+            self.update_group_details()
+            asyncio.ensure_future(self.apply_all_groups(quiet=True))
+        elif previews:
+            asyncio.ensure_future(self.revert_palette_preview(previews, previous))
+
+    async def revert_palette_preview(self, previews, previous):
+        await asyncio.gather(*previews, return_exceptions=True)
+        await self.client.restore_tints(previous)
+        self.status_bar.show_message("Palette preview reverted")
+
+    async def preview_palette(self, colors, previous):
+        groups = {
+            name: dict(group, color=colors.get(name, group["color"]))
+            for name, group in self.groups.items()
+        }
+        mesh_colors, _ = resolve_scene(groups, self.catalog)
+        # Where the tint is unknown (e.g. after a refresh), revert to the stored colors
+        stored_colors, _ = resolve_scene(self.groups, self.catalog)
+        for name in mesh_colors:
+            if name not in previous:
+                previous[name] = self.client.tint_state.get(name) or (*stored_colors[name], 255)
+
+        requests_before = self.client.requests_sent
+        try:
+            tinted, failed, unchanged = await self.client.tint_scene(mesh_colors)
+        except Exception as e:
+            self.status_bar.show_message(f"Palette preview failed: {e}")
+            return
+        self.status_bar.show_message(
+            f"Previewing palette: {len(tinted)} layers changed in "
+            f"{self.client.requests_sent - requests_before} requests"
+        )
+
+    def save_groups(self):
+        try:
+            self.group_store.save(self.active_model_id, self.groups, self.catalog.model_name)
+            self.status_bar.show_message("Groups saved successfully")
+        except Exception as e:
+            QtWidgets.QMessageBox.critical(self, "Save Error", f"Failed to save groups: {str(e)}")
+
+    def load_groups(self):
+        """Reload the active model's groups from disk, dropping unsaved edits"""
+        try:
+            self.show_groups(self.group_store.reload(self.active_model_id))
+            self.status_bar.show_message("Groups loaded successfully")
+        except Exception as e:
+            QtWidgets.QMessageBox.critical(self, "Load Error", f"Failed to load groups: {str(e)}")
+
+
+class AppInitializer(QtCore.QObject):
+    def __init__(self, app, control_port=None):
+        super().__init__()
+        self.app = app
+        self.control_port = control_port
+        self.client = None
+        self.window = None
+
+    async def initialize(self):
+        self.client = VTubeStudioClient()
+        
+        # Show the window with the saved groups right away; connecting,
+        # authenticating and loading artmeshes happen in the background
+        self.window = MainWindow(self.client)
+        self.window.show()
+        
+        self.client.start_supervisor()
+        if self.control_port is not None:
+            await self.window.start_control_server(self.control_port)
+
+def run_gui(control_port=None):
+    app = QtWidgets.QApplication(sys.argv)
+    
+    # Set up the event loop
+    loop = qasync.QEventLoop(app)
+    asyncio.set_event_loop(loop)
+    
+    # Initialize the application
+    initializer = AppInitializer(app, control_port)
+    
+    # Start initialization
+    loop.create_task(initializer.initialize())
+    
+    # Run the event loop
+    with loop:
+        loop.run_forever()
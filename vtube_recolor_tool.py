@@ -1,852 +1,2470 @@
 import json
 import asyncio
-import qasync
+import bisect
+import colorsys
+import itertools
+import logging
+import hashlib
+import math
+import re
+import tempfile
+import threading
+import time
+from collections import Counter, deque
+from http import HTTPStatus
+from urllib.parse import parse_qsl, urlsplit
+import argparse
+import copy
 import websockets
-from PyQt5 import QtWidgets, QtGui, QtCore
 import sys
 import os
 
+try:
+    import orjson  # Optional, faster JSON
+except ImportError:
+    orjson = None
+
 GROUPS_FILE = "artmesh_groups.json"
+DEFAULT_URI = "ws://localhost:8001"  # VTube Studio's default API endpoint
+TOKEN_FILE = "auth_token.txt"  # Auth token for the default endpoint
+ARTMESH_CACHE_DIR = "artmesh_cache"  # Last known artmesh list per model
+GROUPS_DIR = "artmesh_groups"  # One groups file per model plus an index
+DEFAULT_GROUPS_MODEL = ""  # Groups used before any model is known
+AUTOSAVE_DELAY = 1.0  # Seconds without edits before groups are written
+TINT_CHUNK_SIZE = 64  # Max names per batched ColorTintRequest
+REQUEST_TIMEOUT = 10.0  # Seconds to wait for a response to one request
+MAX_IN_FLIGHT = 16  # Max concurrent requests sharing the socket
+KEEPALIVE_INTERVAL = 5.0  # Seconds between connection health checks
+KEEPALIVE_TIMEOUT = 5.0  # Seconds a health check may take before reconnecting
+RECONNECT_MIN_DELAY = 0.5  # First reconnect backoff (s), doubled per failure
+RECONNECT_MAX_DELAY = 30.0
+PREVIEW_MAX_FPS = 30  # Max colors per second streamed by a live preview
+ANIMATION_FPS = 30  # Target frame rate of the animator
+GRADIENT_STEPS = 16  # Color bands in a gradient; fewer bands means fewer requests
+CONTROL_HOST = "127.0.0.1"  # The control endpoint only listens locally
+CONTROL_PORT = 8765
+CONTROL_MAX_PENDING = 32  # Distinct targets waiting to run before commands are shed
+CONTROL_MAX_BODY = 65536  # Max request body in bytes
+CONTROL_IDLE_TIMEOUT = 30.0  # Seconds a kept-alive connection may sit idle
+
+log = logging.getLogger("vtube_recolor")
+
+
+class RateController:
+    """Token bucket whose refill rate is tuned with AIMD on response latency.
+
+    The rate grows while response latency stays close to the best latency
+    seen so far (exponentially until the first back-off, additively after
+    that) and is cut multiplicatively when latency climbs or a request
+    fails.
+    """
+
+    def __init__(self, initial_rate=50.0, min_rate=2.0, max_rate=500.0,
+                 increase_step=1.0, decrease_factor=0.7, latency_tolerance=1.5):
+        self.rate = initial_rate  # Requests per second
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+
+        self.waiting = 0  # Requests queued for a token
+        self.latency = None  # Smoothed response latency (s)
+        self.baseline_latency = None  # Best recent latency (s)
+
+        self._tokens = 4.0
+        self._last_refill = time.monotonic()
+        self._last_decrease = 0.0
+        self._slow_start = True
+        self._lock = asyncio.Lock()
+
+    @property
+    def burst(self):
+        # Allow roughly 100 ms worth of requests to go out back to back
+        return max(4.0, self.rate * 0.1)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    async def acquire(self):
+        """Wait until the bucket allows one more request"""
+        self.waiting += 1
+        try:
+            # Only the head of the queue sleeps; the rest wait on the lock
+            async with self._lock:
+                self._refill()
+                while self._tokens < 1.0:
+                    await asyncio.sleep((1.0 - self._tokens) / self.rate)
+                    self._refill()
+                self._tokens -= 1.0
+        finally:
+            self.waiting -= 1
+
+    def record(self, latency, ok=True):
+        """Feed back the outcome of one request"""
+        if not ok:
+            self._decrease()
+            return
+
+        if self.latency is None:
+            self.latency = latency
+            self.baseline_latency = latency
+        else:
+            self.latency += 0.2 * (latency - self.latency)
+            # Let the baseline drift up slowly so a permanently slower VTS
+            # doesn't keep the rate pinned down forever
+            self.baseline_latency = min(
+                latency, self.baseline_latency + 0.01 * (latency - self.baseline_latency)
+            )
+
+        if self.latency > self.baseline_latency * self.latency_tolerance + 0.005:
+            self._decrease()
+        elif self._slow_start:
+            self.rate = min(self.max_rate, self.rate * 1.05)
+        else:
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def _decrease(self):
+        # Responses already in flight report the same congestion, so only
+        # back off once per smoothed round trip
+        now = time.monotonic()
+        if now - self._last_decrease < max(self.latency or 0.0, 0.05):
+            return
+        self._last_decrease = now
+        self._slow_start = False
+        self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+
+
+class TintStateCache:
+    """Remembers the RGBA last applied to each artmesh of the loaded model.
+
+    Colors are stored as the 0-255 integers actually sent to VTube Studio,
+    so two float colors that encode to the same request compare equal.
+    """
+
+    def __init__(self):
+        self.model_id = None
+        self._applied = {}  # artmesh name -> (r, g, b, a)
+
+    def set_model(self, model_id):
+        """Switch to ``model_id``, dropping state that belonged to another model"""
+        if model_id != self.model_id:
+            self.model_id = model_id
+            self._applied = {}
+
+    def invalidate(self):
+        self._applied = {}
+
+    def get(self, name):
+        return self._applied.get(name)
+
+    def diff(self, names, rgba):
+        """Return the names whose applied color differs from ``rgba``"""
+        applied = self._applied
+        return [name for name in names if applied.get(name) != rgba]
+
+    def update(self, names, rgba):
+        for name in names:
+            self._applied[name] = rgba
+
+    def snapshot(self):
+        """Return ``(model_id, {name: rgba})`` for replaying after a reconnect"""
+        return self.model_id, dict(self._applied)
+
+    def __len__(self):
+        return len(self._applied)
+
+
+def _trigrams(name):
+    """Set of character trigrams of a casefolded, padded name"""
+    padded = f"  {name.casefold()} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SuggestionIndex:
+    """Trigram index ranking artmesh names by similarity to a query.
+
+    Candidates are gathered from the query's rarest trigrams through an
+    inverted index, then ranked by the Dice coefficient of the full
+    trigram sets.
+    """
+
+    # Trigrams shared by most names (e.g. a common "ArtMesh" prefix) say
+    # little about which name is meant, so candidates come from the rarest
+    # ones only, and probing stops once their postings add up to
+    # PROBE_BUDGET entries
+    PROBE_TRIGRAMS = 6
+    PROBE_BUDGET = 512
+    MAX_CANDIDATES = 32
+
+    def __init__(self, names):
+        self.names = list(names)
+        self._grams = [_trigrams(name) for name in self.names]
+        self._postings = {}
+        for idx, grams in enumerate(self._grams):
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(idx)
+        self._cache = {}
+
+    def suggest(self, name, limit=3, min_score=0.3):
+        """Return up to ``limit`` ``(artmesh_name, score)`` pairs, best first"""
+        key = (name, limit, min_score)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        query = _trigrams(name)
+        postings = sorted(
+            (self._postings[gram] for gram in query if gram in self._postings), key=len
+        )
+
+        counts = Counter()
+        probed = 0
+        for posting in postings[:self.PROBE_TRIGRAMS]:
+            if probed and probed + len(posting) > self.PROBE_BUDGET:
+                break
+            counts.update(posting)
+            probed += len(posting)
+
+        candidates = counts.most_common(self.MAX_CANDIDATES) if len(counts) > self.MAX_CANDIDATES else counts.items()
+        scored = []
+        for idx, _ in candidates:
+            grams = self._grams[idx]
+            score = 2 * len(query & grams) / (len(query) + len(grams))
+            if score >= min_score:
+                scored.append((score, self.names[idx]))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+
+        result = [(candidate, score) for score, candidate in scored[:limit]]
+        self._cache[key] = result
+        return result
+
+    def suggest_many(self, names, limit=3, min_score=0.3):
+        """Map each name to its ranked suggestions"""
+        return {name: self.suggest(name, limit, min_score) for name in names}
+
+
+def artmesh_content_hash(names):
+    """Hash identifying an artmesh name list"""
+    return hashlib.sha1("\0".join(names).encode("utf-8")).hexdigest()
+
+
+def write_json_atomic(path, data):
+    """Write JSON to a temp file beside ``path`` and rename it into place"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class ArtMeshListCache:
+    """On-disk cache of each model's artmesh names.
+
+    One file per model ID holds the names and their content hash, and an
+    index remembers the last model seen so the next launch can show its
+    list before VTube Studio answers.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, directory=ARTMESH_CACHE_DIR):
+        self.directory = directory
+        self._stored_hashes = {}  # model_id -> hash already on disk
+        self._last_model_id = None
+
+    def _model_path(self, model_id):
+        safe_id = re.sub(r"[^A-Za-z0-9_-]", "_", model_id)
+        return os.path.join(self.directory, f"{safe_id}.json")
+
+    def _index_path(self):
+        return os.path.join(self.directory, "index.json")
+
+    def last_model_id(self):
+        try:
+            with open(self._index_path(), "r", encoding="utf-8") as f:
+                return json.load(f).get("lastModel")
+        except (OSError, ValueError):
+            return None
+
+    def stamp(self, model_id):
+        """``(mtime, size)`` of the cached file for ``model_id``, or None.
+
+        Changes whenever the file is rewritten, so callers can keep what
+        they built from ``load`` until then.
+        """
+        try:
+            stat = os.stat(self._model_path(model_id))
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self, model_id):
+        """Return the cached entry for ``model_id`` or None"""
+        try:
+            with open(self._model_path(model_id), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("version") != self.FORMAT_VERSION or entry.get("modelID") != model_id:
+            return None
+        self._stored_hashes[model_id] = entry["hash"]
+        return entry
+
+    def store(self, model_id, model_name, names, content_hash):
+        """Save a model's names; a no-op when the same list is already stored"""
+        if not model_id:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        if self._stored_hashes.get(model_id) != content_hash:
+            write_json_atomic(self._model_path(model_id), {
+                "version": self.FORMAT_VERSION,
+                "modelID": model_id,
+                "modelName": model_name,
+                "hash": content_hash,
+                "names": list(names),
+            })
+            self._stored_hashes[model_id] = content_hash
+        if self._last_model_id != model_id:
+            write_json_atomic(self._index_path(), {"version": self.FORMAT_VERSION, "lastModel": model_id})
+            self._last_model_id = model_id
+
+
+class ArtMeshCatalog:
+    """Indexed snapshot of the loaded model's artmesh names.
+
+    Built once per ``ArtMeshListRequest`` that actually changed the list.
+    Holds an exact-name set, a casefolded lookup and integer IDs that stay
+    stable for names carried over from the ``previous`` catalog. Every
+    catalog gets a new ``version`` so derived caches know when to rebuild.
+    """
+
+    _versions = itertools.count(1)
+
+    def __init__(self, names=(), previous=None, model_id=None, model_name=None):
+        self.names = list(dict.fromkeys(names))
+        self.exact = frozenset(self.names)
+        self.version = next(ArtMeshCatalog._versions)
+        self.content_hash = artmesh_content_hash(self.names)
+        self.model_id = model_id
+        self.model_name = model_name
+
+        self.casefold = {}
+        for name in self.names:
+            self.casefold.setdefault(name.casefold(), name)
+
+        old_ids = previous.ids if previous is not None else {}
+        next_id = previous._next_id if previous is not None else 0
+        self.ids = {}
+        for name in self.names:
+            mesh_id = old_ids.get(name)
+            if mesh_id is None:
+                mesh_id = next_id
+                next_id += 1
+            self.ids[name] = mesh_id
+        self._next_id = next_id
+        self._names_by_id = {mesh_id: name for name, mesh_id in self.ids.items()}
+        self._suggestions = None
+        self._rule_matches = {}  # canonical rules JSON -> compile_rules() result
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __contains__(self, name):
+        return name in self.exact
+
+    def resolve(self, name):
+        """Return the artmesh ``name`` refers to, ignoring case, or None"""
+        if name in self.exact:
+            return name
+        return self.casefold.get(name.casefold())
+
+    @property
+    def suggestions(self):
+        """SuggestionIndex over this catalog, built on first use"""
+        if self._suggestions is None:
+            self._suggestions = SuggestionIndex(self.names)
+        return self._suggestions
+
+    def compile_rules(self, rules):
+        """Resolve a group's ``rules`` against this catalog without caching.
+
+        Returns ``(names, excluded)``: the matched names in catalog order
+        and the excluded names.
+        """
+        flags = re.IGNORECASE if rules.get("ignore_case") else 0
+        # Prefixes and suffixes are escaped, so they share one pattern each;
+        # user regexes are compiled on their own since inline flags or group
+        # names can clash when joined
+        patterns = [f"^(?:{'|'.join(map(re.escape, rules['prefix']))})"] if rules.get("prefix") else []
+        if rules.get("suffix"):
+            patterns.append(f"(?:{'|'.join(map(re.escape, rules['suffix']))})$")
+        patterns.extend(rules.get("regex", ()))
+        searches = []
+        for pattern in patterns:
+            try:
+                searches.append(re.compile(pattern, flags).search)
+            except re.error as e:
+                log.warning("Ignoring bad group rule regex %r: %s", pattern, e)
+
+        included = {self.resolve(name) for name in rules.get("include", ())}
+        excluded = frozenset(filter(None, (self.resolve(name) for name in rules.get("exclude", ()))))
+        names = tuple(
+            name for name in self.names
+            if (name in included or any(search(name) for search in searches)) and name not in excluded
+        )
+        return names, excluded
+
+    def match_rules(self, rules):
+        """``compile_rules`` cached for the life of this catalog, i.e. until
+        the artmesh list changes, so applying a rule group costs the same
+        as applying a static one.
+        """
+        key = json.dumps(rules, sort_keys=True)
+        match = self._rule_matches.get(key)
+        if match is None:
+            match = self._rule_matches[key] = self.compile_rules(rules)
+        return match
+
+    def diff(self, previous):
+        """Return ``(added, removed)`` name lists relative to ``previous``"""
+        added = [name for name in self.names if name not in previous.exact]
+        removed = [name for name in previous.names if name not in self.exact]
+        return added, removed
+
+    def id_of(self, name):
+        return self.ids.get(name)
+
+    def name_of(self, mesh_id):
+        return self._names_by_id.get(mesh_id)
+
+
+class IncrementalFilter:
+    """Case-insensitive substring filter over a list of names.
+
+    Names are casefolded once up front. When a query extends the previous
+    one, only the rows that currently match are rechecked.
+    """
+
+    def __init__(self, names=()):
+        self.set_names(names)
+
+    def set_names(self, names):
+        self._lowered = [name.casefold() for name in names]
+        self.query = ""
+        self.matches = list(range(len(self._lowered)))
+
+    def __len__(self):
+        return len(self._lowered)
+
+    def accepts(self, name):
+        return self.query in name.casefold()
+
+    def append(self, names):
+        """Add rows at the end, keeping the current query"""
+        first = len(self._lowered)
+        lowered = [name.casefold() for name in names]
+        self._lowered.extend(lowered)
+        self.matches.extend(first + i for i, name in enumerate(lowered) if self.query in name)
+
+    def remove(self, first, last):
+        """Drop rows ``first``..``last`` (inclusive), renumbering the rest"""
+        count = last - first + 1
+        del self._lowered[first:last + 1]
+        self.matches = [
+            row if row < first else row - count
+            for row in self.matches if row < first or row > last
+        ]
+
+    def set_query(self, text):
+        """Filter by ``text`` and return the matching row indices in order"""
+        query = text.casefold()
+        if query == self.query:
+            return self.matches
+
+        if not query:
+            matches = list(range(len(self._lowered)))
+        else:
+            # Anything matching the longer query also matched the shorter one
+            if self.query and self.query in query:
+                candidates = self.matches
+            else:
+                candidates = range(len(self._lowered))
+            lowered = self._lowered
+            matches = [row for row in candidates if query in lowered[row]]
+
+        self.query = query
+        self.matches = matches
+        return matches
+
+
+def tint_rgba(r, g, b, a):
+    """Convert a 0.0-1.0 float color to the integers sent in a ColorTintRequest"""
+    # Rounded so 0-255 colors survive the float round trip unchanged
+    return (round(r * 255), round(g * 255), round(b * 255), round(a * 255))
+
+
+def load_groups_file(path=GROUPS_FILE):
+    """Read a groups file: ``{group_name: {"color": [r, g, b], "layers": [...]}}``"""
+    with open(path, "r") as f:
+        return normalize_groups(json.load(f))
+
+
+class GroupStore:
+    """Groups stored as one file per model plus a small index.
+
+    A model's groups are read the first time that model becomes active.
+    Saves are atomic, and ``schedule_save`` folds a burst of edits into one
+    write. Groups from the old single ``artmesh_groups.json`` become the
+    default set, and a model without its own file starts from a copy of it.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, directory=GROUPS_DIR, legacy_file=GROUPS_FILE):
+        self.directory = directory
+        self.legacy_file = legacy_file
+        self.save_error_handler = None  # Called with (model_id, error) when an autosave fails
+        self._index = None
+        self._groups = {}  # model_id -> groups loaded this session
+        self._model_names = {}
+        self._pending = {}  # model_id -> scheduled autosave handle
+
+    def _index_path(self):
+        return os.path.join(self.directory, "index.json")
+
+    def _model_path(self, model_id):
+        if model_id == DEFAULT_GROUPS_MODEL:
+            return os.path.join(self.directory, "_default.json")
+        safe_id = re.sub(r"[^A-Za-z0-9_-]", "_", model_id)
+        return os.path.join(self.directory, f"{safe_id}.json")
+
+    def models(self):
+        """Index entries (``{"name": ..., "groups": count}``) by model ID"""
+        if self._index is None:
+            try:
+                with open(self._index_path(), "r", encoding="utf-8") as f:
+                    index = json.load(f)
+                if index.get("version") != self.FORMAT_VERSION:
+                    raise ValueError(f"unsupported groups index version {index.get('version')}")
+                self._index = index["models"]
+            except FileNotFoundError:
+                self._index = {}
+        return self._index
+
+    def load(self, model_id):
+        """Return the groups for ``model_id``, reading them on first use"""
+        if model_id in self._groups:
+            return self._groups[model_id]
+
+        groups = None
+        if model_id in self.models():
+            with open(self._model_path(model_id), "r", encoding="utf-8") as f:
+                shard = json.load(f)
+            if shard.get("version") != self.FORMAT_VERSION:
+                raise ValueError(f"unsupported groups file version {shard.get('version')}")
+            groups = normalize_groups(shard["groups"])
+        elif model_id != DEFAULT_GROUPS_MODEL:
+            groups = copy.deepcopy(self.load(DEFAULT_GROUPS_MODEL))
+        elif os.path.exists(self.legacy_file):
+            groups = load_groups_file(self.legacy_file)
+
+        self._groups[model_id] = groups if groups is not None else {}
+        return self._groups[model_id]
+
+    def reload(self, model_id):
+        """Drop unsaved edits for ``model_id`` and read it from disk again"""
+        self._cancel_pending(model_id)
+        self._groups.pop(model_id, None)
+        self._index = None
+        return self.load(model_id)
+
+    def save(self, model_id, groups=None, model_name=None):
+        """Write one model's groups right away"""
+        self._cancel_pending(model_id)
+        if groups is not None:
+            self._groups[model_id] = groups
+        groups = self._groups.get(model_id, {})
+        if model_name:
+            self._model_names[model_id] = model_name
+        model_name = self._model_names.get(model_id)
+
+        os.makedirs(self.directory, exist_ok=True)
+        write_json_atomic(self._model_path(model_id), {
+            "version": self.FORMAT_VERSION,
+            "modelID": model_id,
+            "modelName": model_name,
+            "groups": groups,
+        })
+
+        entry = {"name": model_name, "groups": len(groups)}
+        models = self.models()
+        if models.get(model_id) != entry:
+            models[model_id] = entry
+            write_json_atomic(self._index_path(), {"version": self.FORMAT_VERSION, "models": models})
+
+    def schedule_save(self, model_id, groups, model_name=None, delay=AUTOSAVE_DELAY):
+        """Save ``groups`` once no further edits arrive for ``delay`` seconds"""
+        self._groups[model_id] = groups
+        if model_name:
+            self._model_names[model_id] = model_name
+        self._cancel_pending(model_id)
+        self._pending[model_id] = asyncio.get_event_loop().call_later(
+            delay, self._autosave, model_id
+        )
+
+    def _autosave(self, model_id):
+        self._pending.pop(model_id, None)
+        try:
+            self.save(model_id)
+        except (OSError, ValueError) as e:
+            log.error("Autosave failed: %s", e)
+            if self.save_error_handler:
+                self.save_error_handler(model_id, e)
+
+    def _cancel_pending(self, model_id):
+        handle = self._pending.pop(model_id, None)
+        if handle:
+            handle.cancel()
+
+    def flush(self):
+        """Write every model that has an autosave pending"""
+        for model_id in list(self._pending):
+            self.save(model_id)
+
+
+def remap_layers(layers, remappings):
+    """Replace stored names in a layer list in place; returns how many changed"""
+    changed = 0
+    for old_name, new_name in remappings.items():
+        if old_name not in layers:
+            continue
+        if new_name in layers:
+            # Already in the group, just drop the dead name
+            layers.remove(old_name)
+        else:
+            layers[layers.index(old_name)] = new_name
+        changed += 1
+    return changed
+
+
+class HealthChecker:
+    """Name health of every group of every model, cached per group.
+
+    A group's result is keyed by a hash of its layer list and the version
+    of the catalog it was checked against, so a new report only recomputes
+    groups that were edited or whose model's artmesh list changed. Models
+    other than the loaded one are checked against their cached artmesh
+    list, which is only read again once its file changes. ``report`` is
+    safe to run in a worker thread.
+    """
+
+    SUGGESTION_SCORE = 0.3  # Dead names get a suggested replacement at least this similar
+
+    def __init__(self, artmesh_cache):
+        self.artmesh_cache = artmesh_cache
+        self._results = {}  # (group hash, catalog version) -> result
+        self._catalogs = {}  # model_id -> (file stamp, catalog built from the disk cache)
+        self._lock = threading.Lock()
+        self.recomputed = 0  # Groups checked (not cached) by the last report
+
+    def catalog_for(self, model_id, live_catalog=None):
+        """The live catalog if it belongs to ``model_id``, else the cached list, or None"""
+        if live_catalog is not None and live_catalog.model_id == model_id and len(live_catalog):
+            return live_catalog
+        if not model_id:
+            return None
+        stamp = self.artmesh_cache.stamp(model_id)
+        if stamp is None:
+            return None
+        stamped, catalog = self._catalogs.get(model_id, (None, None))
+        if stamp == stamped:
+            return catalog
+
+        entry = self.artmesh_cache.load(model_id)
+        if entry is None:
+            return None
+        # A rewrite with the same names keeps the catalog and its results
+        if catalog is None or catalog.content_hash != entry["hash"]:
+            catalog = ArtMeshCatalog(entry["names"], model_id=model_id, model_name=entry.get("modelName"))
+        self._catalogs[model_id] = (stamp, catalog)
+        return catalog
+
+    def check_group(self, group, catalog):
+        layers = group.get("layers", [])
+        rules = group.get("rules")
+        key = (artmesh_content_hash(layers), json.dumps(rules, sort_keys=True), catalog.version)
+        result = self._results.get(key)
+        if result is not None:
+            return result
+
+        exact = 0
+        case_mismatches = []
+        dead = []
+        for layer in layers:
+            actual_name = catalog.resolve(layer)
+            if actual_name == layer:
+                exact += 1
+            elif actual_name is not None:
+                case_mismatches.append([layer, actual_name])
+            else:
+                found = catalog.suggestions.suggest(layer, 1, self.SUGGESTION_SCORE)
+                dead.append([layer, found[0][0], round(found[0][1], 3)] if found else [layer, None, 0.0])
+
+        # A rule group whose rules match nothing is as broken as a dead name
+        rule_matches = len(catalog.match_rules(rules)[0]) if rules else None
+        if layers:
+            coverage = round((exact + len(case_mismatches)) / len(layers), 4)
+        else:
+            coverage = 0.0 if rule_matches == 0 else 1.0
+        result = {
+            "layers": len(layers),
+            "exact": exact,
+            "case_mismatches": case_mismatches,  # [stored, actual]
+            "dead": dead,  # [stored, suggestion or None, score]
+            "rule_matches": rule_matches,  # None without rules
+            "coverage": coverage,
+        }
+        self._results[key] = result
+        self.recomputed += 1
+        return result
+
+    def report(self, models, live_catalog=None):
+        """Check ``{model_id: (model_name, groups)}``; returns a JSON-ready report"""
+        with self._lock:
+            self.recomputed = 0
+            report = {"generated": time.strftime("%Y-%m-%dT%H:%M:%S"), "models": {}}
+            for model_id, (model_name, groups) in models.items():
+                catalog = self.catalog_for(model_id, live_catalog)
+                entry = {
+                    "name": model_name or (catalog.model_name if catalog else None),
+                    "artmeshes": None if catalog is None else ("live" if catalog is live_catalog else "cached"),
+                    "groups": {},
+                }
+                if catalog is not None:
+                    for group_name, group in groups.items():
+                        entry["groups"][group_name] = self.check_group(group, catalog)
+                report["models"][model_id] = entry
+            report["recomputed"] = self.recomputed
+            return report
+
+
+def fix_groups_from_report(groups, model_report, fix_case=True, min_score=None):
+    """Apply case fixes and (with ``min_score``) suggested replacements for
+    dead names from one model's report; returns how many names changed.
+    """
+    changed = 0
+    for group_name, result in model_report["groups"].items():
+        group = groups.get(group_name)
+        if group is None:
+            continue
+        remappings = {}
+        if fix_case:
+            remappings.update(result["case_mismatches"])
+        if min_score is not None:
+            remappings.update(
+                (stored, suggestion) for stored, suggestion, score in result["dead"]
+                if suggestion is not None and score >= min_score
+            )
+        changed += remap_layers(group["layers"], remappings)
+    return changed
+
+
+def parse_palette(text):
+    """Parse ``"#ff8800, 00aaff ..."`` into a list of ``(r, g, b)`` tuples"""
+    palette = []
+    for token in re.split(r"[\s,;]+", text.strip()):
+        if not token:
+            continue
+        hex_color = token.lstrip("#")
+        if not re.fullmatch(r"[0-9A-Fa-f]{6}", hex_color):
+            raise ValueError(f"not a #rrggbb color: {token}")
+        palette.append(tuple(int(hex_color[i:i + 2], 16) for i in (0, 2, 4)))
+    return palette
+
+
+def _transform_color(color, hue, saturation, brightness, temperature, palette):
+    h, s, v = colorsys.rgb_to_hsv(*(c / 255 for c in color))
+    h = (h + hue / 360.0) % 1.0
+    s = min(1.0, s * saturation)
+    v = min(1.0, v * brightness)
+    r, g, b = (c * 255 for c in colorsys.hsv_to_rgb(h, s, v))
+    r, b = r + temperature, b - temperature
+    color = tuple(max(0, min(255, round(c))) for c in (r, g, b))
+    if palette:
+        color = min(palette, key=lambda p: sum((a - b) ** 2 for a, b in zip(color, p)))
+    return color
+
+
+def transform_palette(colors, hue=0.0, saturation=1.0, brightness=1.0, temperature=0.0, palette=None):
+    """Transform a ``{key: [r, g, b]}`` map of 0-255 colors in one pass.
+
+    The hue is rotated by ``hue`` degrees, saturation and brightness (HSV
+    value) are scaled, ``temperature`` adds to red and takes from blue
+    (negative values cool), and with a ``palette`` every result snaps to
+    the nearest palette color. Each distinct input color is transformed
+    once. Returns a new ``{key: [r, g, b]}``.
+    """
+    transformed = {}
+    result = {}
+    for key, color in colors.items():
+        color = tuple(color)
+        if color not in transformed:
+            transformed[color] = _transform_color(color, hue, saturation, brightness, temperature, palette)
+        result[key] = list(transformed[color])
+    return result
+
+
+RULE_LISTS = ("prefix", "suffix", "regex", "include", "exclude")
+
+
+def normalize_rules(rules):
+    """Check a group's ``rules`` and return them in canonical form, or None
+    when they select nothing. Raises ValueError for malformed rules.
+
+    Rules are lists of strings under ``prefix``, ``suffix``, ``regex``
+    (searched anywhere in the name), ``include`` and ``exclude`` (artmesh
+    names, matched ignoring case), plus an optional ``ignore_case`` flag
+    for the patterns.
+    """
+    if not isinstance(rules, dict):
+        raise ValueError("rules must be an object")
+    unknown = set(rules) - set(RULE_LISTS) - {"ignore_case"}
+    if unknown:
+        raise ValueError(f"unknown rule keys: {', '.join(sorted(unknown))}")
+
+    normalized = {}
+    for key in RULE_LISTS:
+        values = rules.get(key) or []
+        if not isinstance(values, list) or not all(isinstance(value, str) for value in values):
+            raise ValueError(f"{key} must be a list of strings")
+        values = list(dict.fromkeys(value for value in values if value))
+        if values:
+            normalized[key] = values
+    flags = re.IGNORECASE if rules.get("ignore_case") else 0
+    for regex in normalized.get("regex", ()):
+        try:
+            re.compile(regex, flags)
+        except re.error as e:
+            raise ValueError(f"bad regex {regex!r}: {e}")
+    if not any(key in normalized for key in ("prefix", "suffix", "regex", "include")):
+        return None
+    if rules.get("ignore_case"):
+        normalized["ignore_case"] = True
+    return normalized
+
+
+def normalize_groups(groups):
+    """Tidy groups read from disk in place and return them.
+
+    ``layers`` is optional for rule groups and defaults to an empty list.
+    ``rules`` go through ``normalize_rules``; malformed ones are logged and
+    dropped so a string ``prefix`` can't match every artmesh.
+    """
+    if not isinstance(groups, dict) or not all(isinstance(group, dict) for group in groups.values()):
+        raise ValueError("groups must be an object of group objects")
+    for group_name, group in groups.items():
+        group.setdefault("layers", [])
+        if "rules" not in group:
+            continue
+        try:
+            rules = normalize_rules(group["rules"])
+        except ValueError as e:
+            log.warning("Dropping malformed rules of group %s: %s", group_name, e)
+            rules = None
+        if rules:
+            group["rules"] = rules
+        else:
+            del group["rules"]
+    return groups
+
+
+def group_members(group, catalog):
+    """Actual artmesh names of a group, in group order, and its invalid layers.
+
+    Members are the stored ``layers`` plus whatever the optional ``rules``
+    match, minus the rules' ``exclude`` names.
+    """
+    rules = group.get("rules")
+    matched, excluded = catalog.match_rules(rules) if rules else ((), ())
+    names = []
+    invalid = []
+    for layer in group.get("layers", ()):
+        actual_name = catalog.resolve(layer)
+        if actual_name is None:
+            invalid.append(layer)
+        elif actual_name not in excluded:
+            names.append(actual_name)
+    names.extend(matched)
+    return list(dict.fromkeys(names)), invalid
+
+
+def resolve_scene(groups, catalog):
+    """Resolve every group into one artmesh -> color map.
+
+    Groups with a higher optional ``priority`` win overlaps; between equal
+    priorities the group listed later wins. Stored names are matched
+    exactly first, then case-insensitively. Returns ``(mesh_colors,
+    invalid)`` where ``mesh_colors`` maps artmesh names to ``[r, g, b]``
+    (0-255) and ``invalid`` lists ``(group_name, layer)`` pairs that matched
+    nothing. Rule groups add their cached rule matches, see ``group_members``.
+    """
+    ordered = sorted(
+        enumerate(groups.items()), key=lambda item: (item[1][1].get("priority", 0), item[0])
+    )
+
+    mesh_colors = {}
+    invalid = []
+    for _, (group_name, group) in ordered:
+        color = group["color"]
+        if group.get("rules"):
+            names, group_invalid = group_members(group, catalog)
+            mesh_colors.update(dict.fromkeys(names, color))
+            invalid.extend((group_name, layer) for layer in group_invalid)
+            continue
+        for layer in group.get("layers", ()):
+            actual_name = catalog.resolve(layer)
+            if actual_name is not None:
+                mesh_colors[actual_name] = color
+            else:
+                invalid.append((group_name, layer))
+    return mesh_colors, invalid
+
+
+class JsonLogFormatter(logging.Formatter):
+    """One JSON object per line; fields passed as ``extra={"fields": {...}}`` are merged in"""
+
+    def format(self, record):
+        entry = {
+            "time": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def configure_logging(level="info", json_format=False):
+    """Send the tool's log to stderr at ``level``.
+
+    Per-request messages are logged at debug level and are only formatted
+    when that level is enabled.
+    """
+    handler = logging.StreamHandler()
+    handler.setFormatter(
+        JsonLogFormatter() if json_format
+        else logging.Formatter("%(asctime)s %(levelname)s %(message)s", "%H:%M:%S")
+    )
+    log.handlers[:] = [handler]
+    log.setLevel(level.upper())
+    log.propagate = False
+
+
+class LatencyHistogram:
+    """Latencies counted into fixed, roughly logarithmic buckets"""
+
+    BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
 
-class VTubeStudioClient:
     def __init__(self):
-        self.uri = "ws://localhost:8001"
+        self.buckets = [0] * (len(self.BOUNDS_MS) + 1)  # Last bucket is everything slower
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, ms):
+        self.buckets[bisect.bisect_left(self.BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the ``p``th percentile"""
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for bound, count in zip(self.BOUNDS_MS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return round(float(min(bound, self.max_ms)), 3)
+        return round(self.max_ms, 3)
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": round(self.max_ms, 3),
+            "buckets": {
+                f"<={bound}ms": count for bound, count in zip(self.BOUNDS_MS, self.buckets)
+            } | {f">{self.BOUNDS_MS[-1]}ms": self.buckets[-1]},
+        }
+
+
+def encoded_size(message):
+    """Size in bytes of a message as sent over the socket (UTF-8 for text)"""
+    if isinstance(message, str) and not message.isascii():
+        return len(message.encode("utf-8"))
+    return len(message)
+
+
+class ClientMetrics:
+    """Counters and latency histograms for one VTubeStudioClient"""
+
+    def __init__(self, codec=None):
+        self.codec = codec  # MessageCodec whose encode/decode cost is reported
+        self.reset()
+
+    def reset(self):
+        if self.codec is not None:
+            self.codec.reset_stats()
+        self.started = time.time()
+        self.latency = {}  # messageType -> LatencyHistogram
+        self.errors = Counter()  # messageType -> APIError responses
+        self.timeouts = Counter()  # messageType -> requests that never got an answer
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.messages_received = 0
+        self.meshes_matched = 0
+        self.meshes_unmatched = 0
+
+    def record_request(self, message_type, seconds, error=False):
+        histogram = self.latency.get(message_type)
+        if histogram is None:
+            histogram = self.latency[message_type] = LatencyHistogram()
+        histogram.record(seconds * 1000)
+        if error:
+            self.errors[message_type] += 1
+
+    def record_match(self, requested, matched):
+        matched = min(requested, matched)
+        self.meshes_matched += matched
+        self.meshes_unmatched += requested - matched
+
+    def snapshot(self):
+        """Everything as plain JSON-ready data"""
+        return {
+            "codec": self.codec.stats() if self.codec is not None else None,
+            "since": self.started,
+            "uptime_s": round(time.time() - self.started, 3),
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "messages_received": self.messages_received,
+            "meshes_matched": self.meshes_matched,
+            "meshes_unmatched": self.meshes_unmatched,
+            "requests": {
+                message_type: dict(
+                    histogram.to_dict(),
+                    errors=self.errors[message_type],
+                    timeouts=self.timeouts[message_type],
+                )
+                for message_type, histogram in sorted(self.latency.items())
+            },
+        }
+
+    def export_json(self, path, extra=None):
+        """Write a snapshot (plus ``extra`` fields) to ``path``"""
+        data = self.snapshot()
+        if extra:
+            data.update(extra)
+        write_json_atomic(path, data)
+
+
+class MessageCodec:
+    """Encodes requests and decodes responses for the VTube Studio API.
+
+    The envelope of each message type (apiName, apiVersion, messageType)
+    is serialized once and reused, and ``data`` may be handed in already
+    serialized. orjson is used when installed, the json module otherwise.
+    Every incoming message is decoded exactly once, by the reader task.
+    Time spent encoding and decoding is accumulated for the metrics.
+    """
+
+    def __init__(self, backend=None):
+        if backend is None:
+            backend = "orjson" if orjson is not None else "json"
+        if backend == "orjson":
+            if orjson is None:
+                raise ValueError("orjson is not installed")
+            self._dumps = lambda obj: orjson.dumps(obj).decode()
+            self._loads = orjson.loads
+        else:
+            self._dumps = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+            self._loads = json.loads
+        self.backend = backend
+        self._envelopes = {}  # messageType -> serialized start of the message
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.encoded = 0
+        self.encode_seconds = 0.0
+        self.decoded = 0
+        self.decode_seconds = 0.0
+
+    def dumps(self, obj):
+        return self._dumps(obj)
+
+    def encode(self, message_type, request_id, data=None):
+        """Serialize one request; ``data`` may be a dict or a JSON string"""
+        started = time.perf_counter()
+        envelope = self._envelopes.get(message_type)
+        if envelope is None:
+            envelope = self._envelopes[message_type] = (
+                '{"apiName":"VTubeStudioPublicAPI","apiVersion":"1.0","messageType":'
+                + self._dumps(message_type) + ',"requestID":"'
+            )
+        if not isinstance(data, str):
+            data = self._dumps(data or {})
+        # Request IDs are generated by the client and never need escaping
+        payload = envelope + request_id + '","data":' + data + "}"
+        self.encoded += 1
+        self.encode_seconds += time.perf_counter() - started
+        return payload
+
+    def decode(self, raw):
+        started = time.perf_counter()
+        message = self._loads(raw)
+        self.decoded += 1
+        self.decode_seconds += time.perf_counter() - started
+        return message
+
+    def stats(self):
+        return {
+            "backend": self.backend,
+            "encoded": self.encoded,
+            "encode_us_per_message": round(self.encode_seconds / self.encoded * 1e6, 2) if self.encoded else 0.0,
+            "decoded": self.decoded,
+            "decode_us_per_message": round(self.decode_seconds / self.decoded * 1e6, 2) if self.decoded else 0.0,
+        }
+
+
+class VTubeStudioClient:
+    def __init__(self, uri=DEFAULT_URI, token_file=TOKEN_FILE):
+        self.uri = uri
+        self.token_file = token_file  # Each VTube Studio instance issues its own token
         self.ws = None
-        self.artmeshes = []
+        self.catalog = ArtMeshCatalog()
+        self.tint_chunk_size = TINT_CHUNK_SIZE
+        self.request_timeout = REQUEST_TIMEOUT
+        self.max_in_flight = MAX_IN_FLIGHT
+        self.requests_sent = 0
+        self.rate_controller = RateController()
+        self.codec = MessageCodec()
+        self.metrics = ClientMetrics(self.codec)
+        self._tint_colors = {}  # rgba -> serialized start of ColorTintRequest data
+        self.tint_state = TintStateCache()
+        self.artmesh_cache = ArtMeshListCache()
+
+        # requestID -> future resolved by the reader task
+        self._pending = {}
+        # event messageType -> callbacks, run as background tasks
+        self._event_handlers = {}
+        self.add_event_handler("ModelLoadedEvent", self._on_model_loaded)
+        self._request_ids = itertools.count(1)
+        self._in_flight = None
+        self._reader_task = None
+
+        # Connection supervision, see start_supervisor()
+        self.state = "disconnected"
+        self.last_error = None  # Why the last connection attempt failed
+        self.held_tints = 0  # Tint calls waiting for the connection to return
+        self._state_handlers = []
+        self._online = None
+        self._supervisor_task = None
 
     async def connect(self):
         try:
             self.ws = await websockets.connect(self.uri)
-            return True
         except Exception as e:
-            print(f"Connection failed: {e}")
+            log.warning("Connection failed: %s", e)
+            self.last_error = f"Connection failed: {e}"
             return False
 
+        self.last_error = None
+        self._in_flight = asyncio.Semaphore(self.max_in_flight)
+        self._reader_task = asyncio.ensure_future(self._read_loop())
+        # A new session can't vouch for tints sent over the old one
+        self.tint_state.invalidate()
+        return True
+
+    @property
+    def in_flight(self):
+        """Number of requests still waiting for a response"""
+        return len(self._pending)
+
+    def add_state_handler(self, handler):
+        """Call ``handler(state)`` whenever the connection state changes.
+
+        States are "connecting", "connected", "reconnecting" and
+        "disconnected".
+        """
+        self._state_handlers.append(handler)
+
+    def _set_state(self, state, force=False):
+        if state == self.state and not force:
+            return
+        self.state = state
+        for handler in self._state_handlers:
+            try:
+                handler(state)
+            except Exception as e:
+                log.exception("Error in connection state handler: %s", e)
+
+    def start_supervisor(self):
+        """Keep the connection alive in the background.
+
+        The supervisor health-checks the socket. When the socket drops it
+        reconnects with exponential backoff, re-authenticates and
+        re-subscribes to events, then replays the last known tint state.
+        Tint calls made while the connection is down wait until it is back.
+        """
+        if self._supervisor_task is None:
+            self._online = asyncio.Event()
+            self._supervisor_task = asyncio.ensure_future(self._supervise())
+
+    async def _supervise(self):
+        delay = RECONNECT_MIN_DELAY
+        snapshot = (None, {})
+        first_attempt = self.ws is None
+        while True:
+            if self.ws is None:
+                self._set_state("connecting" if first_attempt else "reconnecting")
+                if not await self._establish(snapshot):
+                    # Let listeners show why we are still not connected
+                    self._set_state(self.state, force=True)
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, RECONNECT_MAX_DELAY)
+                    continue
+                first_attempt = False
+                delay = RECONNECT_MIN_DELAY
+
+            self._online.set()
+            self._set_state("connected")
+            await self._keepalive()
+
+            self._online.clear()
+            snapshot = self.tint_state.snapshot()
+            log.warning("Connection to VTube Studio lost, reconnecting")
+            await self.close()
+
+    async def _establish(self, snapshot):
+        """Connect, authenticate, resubscribe and replay ``snapshot``"""
+        if not await self.connect():
+            return False
+        try:
+            await self.authenticate()
+            await self.subscribe_events()
+            model = await self.get_current_model()
+            self.tint_state.set_model(model.get("modelID"))
+            model_id, applied = snapshot
+            if applied and model_id == model.get("modelID"):
+                await self._replay_tints(applied)
+        except Exception as e:
+            log.warning("Reconnect failed: %s", e)
+            self.last_error = f"Setup failed: {e}"
+            await self.close()
+            return False
+        return True
+
+    async def _replay_tints(self, applied):
+        """Re-send a ``{name: rgba}`` tint state, one batch per color"""
+        by_color = {}
+        for name, rgba in applied.items():
+            by_color.setdefault(rgba, []).append(name)
+
+        log.info("Replaying tints for %d artmeshes in %d colors", len(applied), len(by_color))
+        await asyncio.gather(*(
+            self._tint_artmeshes(names, r / 255, g / 255, b / 255, a / 255, force=True)
+            for (r, g, b, a), names in by_color.items()
+        ))
+
+    async def _keepalive(self):
+        """Return once the connection stops answering"""
+        while True:
+            done, _ = await asyncio.wait([self._reader_task], timeout=KEEPALIVE_INTERVAL)
+            if done:
+                return  # Socket closed
+            try:
+                await self.request("APIStateRequest", timeout=KEEPALIVE_TIMEOUT)
+            except Exception as e:
+                log.warning("Keepalive failed: %s", e)
+                return
+
+    async def _wait_online(self):
+        """Hold a tint call while the supervisor is reconnecting"""
+        if self._online is None or self._online.is_set():
+            return
+        self.held_tints += 1
+        try:
+            await self._online.wait()
+        finally:
+            self.held_tints -= 1
+
+    async def close(self):
+        """Stop the reader task and close the socket"""
+        if self._reader_task:
+            self._reader_task.cancel()
+            try:
+                await self._reader_task
+            except asyncio.CancelledError:
+                pass
+            self._reader_task = None
+        if self.ws:
+            ws, self.ws = self.ws, None
+            try:
+                await ws.close()
+            except Exception:
+                pass
+
+    async def shutdown(self):
+        """Stop supervising and close the connection"""
+        if self._supervisor_task:
+            self._supervisor_task.cancel()
+            self._supervisor_task = None
+        await self.close()
+        self._set_state("disconnected")
+
+    async def _read_loop(self):
+        """Route every incoming message to the request waiting for it"""
+        error = ConnectionError("Connection to VTube Studio closed")
+        try:
+            async for raw in self.ws:
+                self.metrics.messages_received += 1
+                self.metrics.bytes_received += encoded_size(raw)
+                try:
+                    message = self.codec.decode(raw)
+                except ValueError as e:
+                    log.warning("Ignoring malformed message: %s", e)
+                    continue
+
+                future = self._pending.pop(message.get("requestID"), None)
+                if future is not None:
+                    if not future.done():
+                        future.set_result(message)
+                else:
+                    self._handle_unsolicited(message)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = ConnectionError(f"Connection to VTube Studio lost: {e}")
+        finally:
+            # Nothing else will answer the requests still waiting
+            pending, self._pending = self._pending, {}
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(error)
+
+    def _handle_unsolicited(self, message):
+        """Dispatch events to their handlers without blocking the reader"""
+        message_type = message.get("messageType")
+        handlers = self._event_handlers.get(message_type)
+        if not handlers:
+            log.debug("Unhandled message from VTube Studio: %s", message_type)
+            return
+
+        data = message.get("data", {})
+        for handler in handlers:
+            try:
+                result = handler(data)
+                if asyncio.iscoroutine(result):
+                    asyncio.ensure_future(result)
+            except Exception as e:
+                log.exception("Error in %s handler: %s", message_type, e)
+
+    def add_event_handler(self, event_name, handler):
+        """Call ``handler(data)`` for every ``event_name`` event.
+
+        Coroutine handlers are scheduled as tasks. Call
+        ``subscribe_events`` after authenticating to start receiving them.
+        """
+        self._event_handlers.setdefault(event_name, []).append(handler)
+
+    async def subscribe_events(self):
+        """Subscribe to every event that has a handler"""
+        for event_name in self._event_handlers:
+            await self.request("EventSubscriptionRequest", {
+                "eventName": event_name,
+                "subscribe": True,
+                "config": {}
+            })
+
+    def _on_model_loaded(self, data):
+        # VTube Studio resets tints when a model (re)loads
+        self.tint_state.set_model(data.get("modelID") if data.get("modelLoaded") else None)
+        self.tint_state.invalidate()
+
+    async def request(self, message_type, data=None, timeout=None, throttle=False):
+        """Send one API request and wait for the response with the same requestID.
+
+        ``data`` is a dict or an already serialized JSON object.
+
+        Up to ``self.max_in_flight`` requests may be outstanding at once.
+        Raises ``asyncio.TimeoutError`` if no response arrives within
+        ``timeout`` seconds (defaults to ``self.request_timeout``). With
+        ``throttle`` the request is paced by ``self.rate_controller``.
+        """
+        if self.ws is None:
+            raise ConnectionError("Not connected to VTube Studio")
+
+        request_id = f"vrt-{next(self._request_ids)}"
+
+        if throttle:
+            await self.rate_controller.acquire()
+
+        async with self._in_flight:
+            future = asyncio.get_event_loop().create_future()
+            self._pending[request_id] = future
+            sent_at = time.monotonic()
+            try:
+                payload = self.codec.encode(message_type, request_id, data)
+                await self.ws.send(payload)
+                self.requests_sent += 1
+                self.metrics.bytes_sent += encoded_size(payload)
+                response = await asyncio.wait_for(future, timeout or self.request_timeout)
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    self.metrics.timeouts[message_type] += 1
+                if throttle:
+                    self.rate_controller.record(time.monotonic() - sent_at, ok=False)
+                raise
+            finally:
+                self._pending.pop(request_id, None)
+
+        latency = time.monotonic() - sent_at
+        ok = response.get("messageType") != "APIError"
+        self.metrics.record_request(message_type, latency, error=not ok)
+        if throttle:
+            self.rate_controller.record(latency, ok=ok)
+        return response
+
     async def authenticate(self):
         # Try reading token from file, else request one
         try:
-            with open("auth_token.txt", "r") as f:
+            with open(self.token_file, "r") as f:
                 token = f.read().strip()
         except FileNotFoundError:
             token = await self.request_auth_token()
 
-        await self.ws.send(json.dumps({
-            "apiName": "VTubeStudioPublicAPI",
-            "apiVersion": "1.0",
-            "messageType": "AuthenticationRequest",
-            "data": {
-                "pluginName": "Vtube Recolor Tool",
-                "pluginDeveloper": "Leizest",
-                "authenticationToken": token
-            }
-        }))
-        response = await self.ws.recv()
-        data = json.loads(response)
+        data = await self.request("AuthenticationRequest", {
+            "pluginName": "Vtube Recolor Tool",
+            "pluginDeveloper": "Leizest",
+            "authenticationToken": token
+        })
 
         if not data["data"].get("authenticated", False):
             raise RuntimeError("Authentication failed. Invalid token?")
 
     async def request_auth_token(self):
-        await self.ws.send(json.dumps({
-            "apiName": "VTubeStudioPublicAPI",
-            "apiVersion": "1.0",
-            "messageType": "AuthenticationTokenRequest",
-            "data": {
-                "pluginName": "Vtube Recolor Tool",
-                "pluginDeveloper": "Leizest"
-            }
-        }))
-        response = await self.ws.recv()
-        data = json.loads(response)
+        # The user has to click "Allow" in VTube Studio, so wait longer
+        data = await self.request("AuthenticationTokenRequest", {
+            "pluginName": "Vtube Recolor Tool",
+            "pluginDeveloper": "Leizest"
+        }, timeout=300)
         token = data["data"]["authenticationToken"]
-        with open("auth_token.txt", "w") as f:
+        with open(self.token_file, "w") as f:
             f.write(token)
         return token
 
+    async def get_current_model(self):
+        data = await self.request("CurrentModelRequest")
+        return data["data"]
+
     async def get_artmeshes(self):
-        await self.ws.send(json.dumps({
-            "apiName": "VTubeStudioPublicAPI",
-            "apiVersion": "1.0",
-            "messageType": "ArtMeshListRequest",
-            "data": {}
-        }))
-        response = await self.ws.recv()
-        data = json.loads(response)
-        names = data["data"].get("artMeshNames", [])
-        self.artmeshes = [{"name": n} for n in names]
-        return self.artmeshes
+        """Fetch the artmesh list and return the updated catalog.
+
+        The catalog (and its version) is kept as is when the list did not
+        change. The list is also written to the on-disk cache.
+        """
+        data, model = await asyncio.gather(
+            self.request("ArtMeshListRequest"), self.get_current_model()
+        )
+        model_id = model.get("modelID")
+        self.tint_state.set_model(model_id)
+        names = list(dict.fromkeys(data["data"].get("artMeshNames", [])))
+        if artmesh_content_hash(names) != self.catalog.content_hash or model_id != self.catalog.model_id:
+            self.catalog = ArtMeshCatalog(
+                names, previous=self.catalog, model_id=model_id, model_name=model.get("modelName")
+            )
 
-    async def tint_artmesh(self, name_exact, r, g, b, a):
-        msg = {
-            "apiName": "VTubeStudioPublicAPI",
-            "apiVersion": "1.0",
-            "messageType": "ColorTintRequest",
-            "data": {
-                "colorTint": {
-                    "colorR": r,
-                    "colorG": g,
-                    "colorB": b,
-                    "colorA": a
-                },
-                "artMeshMatcher": {
-                    "tintAll": False,
-                    "nameExact": name_exact
-                }
-            }
-        }
-        print(f"Sending tint request for: {name_exact} with color ({r:.3f}, {g:.3f}, {b:.3f}, {a:.3f})")
-        await self.ws.send(json.dumps(msg))
-        
         try:
-            # Wait for response to ensure the command was processed
-            response = await self.ws.recv()
-            result = json.loads(response)
-            print(f"Response for {name_exact}: {result}")
-            return result
+            self.artmesh_cache.store(model_id, self.catalog.model_name, self.catalog.names,
+                                     self.catalog.content_hash)
+        except OSError as e:
+            log.warning("Failed to cache artmesh list: %s", e)
+        return self.catalog
+
+    def cached_catalog(self, model_id=None):
+        """Catalog from the on-disk cache for ``model_id`` (default: the last
+        model seen), or None when nothing is cached.
+        """
+        model_id = model_id or self.artmesh_cache.last_model_id()
+        if not model_id:
+            return None
+        if model_id == self.catalog.model_id:
+            return self.catalog
+        entry = self.artmesh_cache.load(model_id)
+        if entry is None:
+            return None
+        self.catalog = ArtMeshCatalog(
+            entry["names"], previous=self.catalog, model_id=model_id, model_name=entry.get("modelName")
+        )
+        return self.catalog
+
+    async def _send_tint(self, rgba, matcher, names):
+        """Send one ColorTintRequest; returns how many artmeshes it matched.
+
+        The color part of the request is serialized once per color, so
+        only the names are encoded per call.
+        """
+        prefix = self._tint_colors.get(rgba)
+        if prefix is None:
+            if len(self._tint_colors) >= 4096:
+                self._tint_colors.clear()
+            r, g, b, a = rgba
+            prefix = self._tint_colors[rgba] = (
+                f'{{"colorTint":{{"colorR":{r},"colorG":{g},"colorB":{b},"colorA":{a}}},'
+                f'"artMeshMatcher":{{"tintAll":false,'
+            )
+        data = prefix + '"' + matcher + '":' + self.codec.dumps(names) + "}}"
+        log.debug("Sending %s tint request for %d artmeshes", matcher, len(names))
+
+        try:
+            result = await self.request("ColorTintRequest", data, throttle=True)
+            matched = result["data"].get("matchedArtMeshes", 0) if isinstance(result.get("data"), dict) else 0
         except Exception as e:
-            print(f"Error receiving response for {name_exact}: {e}")
-            return {"data": {"matchedArtMeshes": 0}}
-        
+            log.warning("Error receiving response for %s: %s", ", ".join(names[:3]), e)
+            matched = 0
+        self.metrics.record_match(len(names), matched)
+        return matched
+
+    async def tint_artmesh(self, name_exact, r, g, b, a):
+        """Tint one artmesh by exact name; returns True if it matched"""
+        return await self.tint_artmesh_exact(name_exact, r, g, b, a) > 0
+
     async def tint_artmesh_exact(self, name_exact, r, g, b, a):
-        """Tint using exact name matching"""
-        msg = {
-            "apiName": "VTubeStudioPublicAPI",
-            "apiVersion": "1.0",
-            "messageType": "ColorTintRequest",
-            "data": {
-                "colorTint": {
-                    "colorR": int(r * 255),
-                    "colorG": int(g * 255),
-                    "colorB": int(b * 255),
-                    "colorA": int(a * 255)
-                },
-                "artMeshMatcher": {
-                    "tintAll": False,
-                    "nameExact": [name_exact]
-                }
-            }
-        }
-        print(f"Sending exact tint request for: {name_exact}")
-        await self.ws.send(json.dumps(msg))
-        
+        """Tint using exact name matching; returns the number matched"""
+        return await self.tint_artmesh_exact_batch([name_exact], r, g, b, a)
+
+    async def tint_artmesh_contains(self, name_contains, r, g, b, a):
+        """Tint using contains matching as fallback; returns the number matched"""
+        return await self._send_tint(tint_rgba(r, g, b, a), "nameContains", [name_contains])
+
+    async def tint_artmesh_exact_batch(self, names, r, g, b, a):
+        """Tint several artmeshes with a single nameExact request; returns the number matched"""
+        return await self._send_tint(tint_rgba(r, g, b, a), "nameExact", list(names))
+
+    async def tint_artmeshes(self, names, r, g, b, a, chunk_size=None, force=False):
+        """Tint a whole group using batched requests.
+
+        Meshes already showing this color according to ``self.tint_state``
+        are skipped unless ``force`` is set. The rest are sent in chunks of
+        ``chunk_size`` (defaults to ``self.tint_chunk_size``), pipelined over
+        the shared socket. When a chunk matches fewer meshes than it
+        contains, only that chunk falls back to per-mesh exact/contains
+        requests. Returns ``(tinted, failed, unchanged)`` name lists.
+
+        While the supervisor is reconnecting the call waits, and meshes
+        lost to a connection drop mid-call are retried once it is back.
+        """
+        await self._wait_online()
+        tinted, failed, unchanged = await self._tint_artmeshes(names, r, g, b, a, chunk_size, force)
+        if failed and self._online is not None and not self._online.is_set():
+            await self._wait_online()
+            retried, failed, _ = await self._tint_artmeshes(failed, r, g, b, a, chunk_size, force)
+            tinted.extend(retried)
+        return tinted, failed, unchanged
+
+    async def _tint_artmeshes(self, names, r, g, b, a, chunk_size=None, force=False):
+        names = list(dict.fromkeys(names))  # Drop duplicates, keep order
+        rgba = tint_rgba(r, g, b, a)
+        unchanged = []
+        if not force:
+            to_send = self.tint_state.diff(names, rgba)
+            if len(to_send) < len(names):
+                pending = set(to_send)
+                unchanged = [name for name in names if name not in pending]
+            names = to_send
+
+        chunk_size = max(1, chunk_size or self.tint_chunk_size)
+        chunks = [names[i:i + chunk_size] for i in range(0, len(names), chunk_size)]
+
+        matched_counts = await asyncio.gather(
+            *(self._send_tint(rgba, "nameExact", chunk) for chunk in chunks)
+        )
+
+        tinted = []
+        retry = []
+        for chunk, matched_count in zip(chunks, matched_counts):
+            if matched_count >= len(chunk):
+                tinted.extend(chunk)
+            else:
+                log.info("Batch matched %d/%d artmeshes, falling back per mesh", matched_count, len(chunk))
+                retry.extend(chunk)
+
+        failed = []
+        retried = await asyncio.gather(
+            *(self._tint_single_with_fallback(name, r, g, b, a) for name in retry)
+        )
+        for name, success in zip(retry, retried):
+            (tinted if success else failed).append(name)
+
+        self.tint_state.update(tinted, rgba)
+        return tinted, failed, unchanged
+
+    async def tint_scene(self, mesh_colors, force=False):
+        """Apply a resolved artmesh -> [r, g, b] (0-255) map.
+
+        Meshes sharing a final color are merged into one batched
+        ``tint_artmeshes`` call, and all colors are sent concurrently.
+        Returns ``(tinted, failed, unchanged)`` name lists.
+        """
+        by_color = {}
+        for name, color in mesh_colors.items():
+            by_color.setdefault(tuple(color), []).append(name)
+
+        results = await asyncio.gather(*(
+            self.tint_artmeshes(names, r / 255, g / 255, b / 255, 1.0, force=force)
+            for (r, g, b), names in by_color.items()
+        ))
+
+        tinted, failed, unchanged = [], [], []
+        for group_tinted, group_failed, group_unchanged in results:
+            tinted.extend(group_tinted)
+            failed.extend(group_failed)
+            unchanged.extend(group_unchanged)
+        return tinted, failed, unchanged
+
+    async def restore_tints(self, previous):
+        """Put back a ``{name: rgba or None}`` map taken from ``self.tint_state``.
+
+        None means the tint is unknown (the cache is cleared on every
+        refresh, reload and reconnect), so that mesh is left as it is.
+        """
+        by_color = {}
+        for name, rgba in previous.items():
+            if rgba is not None:
+                by_color.setdefault(rgba, []).append(name)
+        await asyncio.gather(*(
+            self.tint_artmeshes(names, *(c / 255 for c in rgba))
+            for rgba, names in by_color.items()
+        ))
+
+    async def _tint_single_with_fallback(self, name, r, g, b, a):
+        """Tint one artmesh with nameExact, then nameContains if nothing matched"""
         try:
-            response = await self.ws.recv()
-            result = json.loads(response)
-            return result
+            if await self.tint_artmesh_exact(name, r, g, b, a) > 0:
+                return True
+
+            log.info("Exact match failed for %s, trying contains match", name)
+            if await self.tint_artmesh_contains(name, r, g, b, a) > 0:
+                return True
+
+            log.warning("Failed both exact and contains: %s", name)
         except Exception as e:
-            print(f"Error receiving response for {name_exact}: {e}")
-            return {"data": {"matchedArtMeshes": 0}}
+            log.error("Exception tinting %s: %s", name, e)
+        return False
 
-    async def tint_artmesh_contains(self, name_contains, r, g, b, a):
-        """Tint using contains matching as fallback"""
-        msg = {
-            "apiName": "VTubeStudioPublicAPI",
-            "apiVersion": "1.0",
-            "messageType": "ColorTintRequest",
-            "data": {
-                "colorTint": {
-                    "colorR": int(r * 255),
-                    "colorG": int(g * 255),
-                    "colorB": int(b * 255),
-                    "colorA": int(a * 255)
-                },
-                "artMeshMatcher": {
-                    "tintAll": False,
-                    "nameContains": [name_contains]
-                }
-            }
-        }
-        print(f"Sending contains tint request for: {name_contains}")
-        await self.ws.send(json.dumps(msg))
-        
+
+def token_file_for(uri):
+    """Token file for an endpoint; the default endpoint keeps ``auth_token.txt``"""
+    if uri == DEFAULT_URI:
+        return TOKEN_FILE
+    endpoint = re.sub(r"^wss?://", "", uri).rstrip("/")
+    return f"auth_token_{re.sub(r'[^A-Za-z0-9_-]', '_', endpoint)}.txt"
+
+
+class ClientPool:
+    """Several VTube Studio instances driven side by side.
+
+    Each instance has its own client, endpoint and token file. Calls fan
+    out to any subset of instances concurrently, so they take as long as
+    the slowest instance rather than the sum of all of them. Every
+    instance is timed and its errors are kept to itself: results come
+    back as ``{name: {"ok", "result", "error", "seconds"}}``.
+    """
+
+    def __init__(self):
+        self.clients = {}  # name -> VTubeStudioClient, in the order added
+
+    def add(self, name, uri=DEFAULT_URI, token_file=None):
+        if name in self.clients:
+            raise ValueError(f"Duplicate instance name: {name}")
+        client = self.clients[name] = VTubeStudioClient(uri, token_file or token_file_for(uri))
+        return client
+
+    def select(self, names=None):
+        """Instance names to act on; None means all of them"""
+        if names is None:
+            return list(self.clients)
+        unknown = [name for name in names if name not in self.clients]
+        if unknown:
+            raise ValueError(f"Unknown instances: {', '.join(unknown)}")
+        return list(dict.fromkeys(names))
+
+    async def _timed(self, name, coro):
+        started = time.perf_counter()
         try:
-            response = await self.ws.recv()
-            result = json.loads(response)
-            return result
+            result, error = await coro, None
         except Exception as e:
-            print(f"Error receiving response for {name_contains}: {e}")
-            return {"data": {"matchedArtMeshes": 0}}
+            log.debug("Instance %s failed: %s", name, e)
+            result, error = None, str(e) or type(e).__name__
+        return {"ok": error is None, "result": result, "error": error,
+                "seconds": time.perf_counter() - started}
+
+    async def fan_out(self, func, names=None):
+        """Await ``func(name, client)`` on each selected instance at once"""
+        selected = self.select(names)
+        results = await asyncio.gather(*(self._timed(name, func(name, self.clients[name])) for name in selected))
+        return dict(zip(selected, results))
+
+    async def connect(self, names=None):
+        """Connect, authenticate and load the artmesh list; the result is the catalog"""
+        async def open_client(name, client):
+            if not await client.connect():
+                raise ConnectionError(client.last_error)
+            try:
+                await client.authenticate()
+                return await client.get_artmeshes()
+            except Exception:
+                await client.close()
+                raise
+        return await self.fan_out(open_client, names)
 
+    def groups_for(self, name, store):
+        """Saved groups in ``store`` for the model loaded on instance ``name``"""
+        return store.load(self.clients[name].catalog.model_id or DEFAULT_GROUPS_MODEL)
 
-class ColorPreviewWidget(QtWidgets.QWidget):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.color = QtGui.QColor(255, 255, 255)
-        self.setFixedSize(40, 40)
-        self.setStyleSheet("border: 2px solid black; border-radius: 5px;")
+    async def apply_groups(self, groups_by_instance, force=False):
+        """Apply ``{instance name: groups}``, each against its own catalog.
 
-    def set_color(self, color):
-        self.color = color
-        self.update()
+        The result of each instance is a dict with the ``tinted``,
+        ``failed``, ``unchanged`` and ``invalid`` names plus the number of
+        ``layers`` and ``colors`` it resolved to.
+        """
+        async def apply(name, client):
+            mesh_colors, invalid = resolve_scene(groups_by_instance[name], client.catalog)
+            tinted, failed, unchanged = await client.tint_scene(mesh_colors, force=force)
+            return {
+                "layers": len(mesh_colors),
+                "colors": len({tuple(color) for color in mesh_colors.values()}),
+                "tinted": tinted,
+                "failed": failed,
+                "unchanged": unchanged,
+                "invalid": invalid,
+            }
+        return await self.fan_out(apply, list(groups_by_instance))
+
+    def metrics_snapshot(self, names=None):
+        return {
+            name: dict(self.clients[name].metrics.snapshot(), uri=self.clients[name].uri)
+            for name in self.select(names)
+        }
 
-    def paintEvent(self, event):
-        painter = QtGui.QPainter(self)
-        painter.fillRect(self.rect(), self.color)
+    async def close(self):
+        await asyncio.gather(*(client.close() for client in self.clients.values()))
 
 
-class StatusBar(QtWidgets.QLabel):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.setText("Ready")
-        self.setStyleSheet("QLabel { background-color: #f0f0f0; padding: 5px; border-top: 1px solid #ccc; }")
+class TintStream:
+    """Stream colors to a fixed set of artmeshes, newest color wins.
 
-    def show_message(self, message, timeout=3000):
-        self.setText(message)
-        if timeout > 0:
-            QtCore.QTimer.singleShot(timeout, lambda: self.setText("Ready"))
+    ``push`` only records the color; a single sender task sends it as one
+    batched request, at most ``max_fps`` times per second. Colors pushed
+    while a frame is in flight replace each other, so there is never more
+    than one frame outstanding and the last color pushed is always the one
+    that ends up on the model.
 
+    ``revert`` restores what ``client.tint_state`` recorded before
+    streaming; meshes it has no record of go back to ``fallback`` (an
+    rgba tuple, e.g. the group's stored color) or, without one, are left
+    showing the last streamed color.
+    """
 
-class MainWindow(QtWidgets.QWidget):
-    def __init__(self, client):
-        super().__init__()
+    def __init__(self, client, names, max_fps=PREVIEW_MAX_FPS, fallback=None):
         self.client = client
-        self.setWindowTitle("VTS Artmesh Color Tool with Groups")
-        self.setGeometry(100, 100, 900, 600)
-
-        self.groups = {}  # group_name: { "color": [r,g,b], "layers": [names...] }
-        self.selected_color = QtGui.QColor(255, 255, 255)
-        self.current_artmeshes = []  # Store current artmesh names for validation
-
-        self.init_ui()
-        self.load_groups()  # Auto-load groups on startup
-
-    def init_ui(self):
-        main_layout = QtWidgets.QVBoxLayout()
-
-        # Add refresh button at the top
-        refresh_layout = QtWidgets.QHBoxLayout()
-        self.refresh_btn = QtWidgets.QPushButton("🔄 Refresh Artmeshes")
-        self.refresh_btn.clicked.connect(self.refresh_artmeshes_clicked)
-        self.refresh_btn.setStyleSheet("QPushButton { background-color: #9C27B0; color: white; font-weight: bold; }")
-        refresh_layout.addWidget(self.refresh_btn)
-        refresh_layout.addStretch()
-        main_layout.addLayout(refresh_layout)
-
-        # Create horizontal layout for main content
-        content_layout = QtWidgets.QHBoxLayout()
-
-        # Left panel - Layers
-        left_panel = QtWidgets.QVBoxLayout()
-        left_panel.addWidget(QtWidgets.QLabel("<b>Available Layers</b>"))
-        
-        # Search box for layers
-        self.layer_search = QtWidgets.QLineEdit()
-        self.layer_search.setPlaceholderText("Search layers...")
-        self.layer_search.textChanged.connect(self.filter_layers)
-        left_panel.addWidget(self.layer_search)
-        
-        self.layer_list = QtWidgets.QListWidget()
-        self.layer_list.setSelectionMode(QtWidgets.QAbstractItemView.MultiSelection)
-        self.layer_list.setSortingEnabled(True)
-        left_panel.addWidget(self.layer_list)
-        
-        # Layer count label
-        self.layer_count_label = QtWidgets.QLabel("Layers: 0")
-        self.layer_count_label.setStyleSheet("QLabel { font-size: 10px; color: #666; }")
-        left_panel.addWidget(self.layer_count_label)
-        
-        content_layout.addLayout(left_panel, 1)
-
-        # Middle panel - Assignment buttons
-        middle_panel = QtWidgets.QVBoxLayout()
-        middle_panel.addStretch()
-        
-        self.assign_btn = QtWidgets.QPushButton("Add to Group →")
-        self.assign_btn.setFixedSize(120, 35)
-        self.assign_btn.clicked.connect(self.assign_selected_layers)
-        self.assign_btn.setStyleSheet("QPushButton { background-color: #4CAF50; color: white; font-weight: bold; }")
-        
-        self.remove_btn = QtWidgets.QPushButton("← Remove")
-        self.remove_btn.setFixedSize(120, 35)
-        self.remove_btn.clicked.connect(self.remove_selected_layers)
-        self.remove_btn.setStyleSheet("QPushButton { background-color: #f44336; color: white; font-weight: bold; }")
-        
-        middle_panel.addWidget(self.assign_btn)
-        middle_panel.addWidget(self.remove_btn)
-        middle_panel.addStretch()
-        
-        content_layout.addLayout(middle_panel, 0)
-
-        # Right panel - Groups
-        right_panel = QtWidgets.QVBoxLayout()
-        right_panel.addWidget(QtWidgets.QLabel("<b>Groups</b>"))
-        
-        # Group creation controls
-        group_create_layout = QtWidgets.QHBoxLayout()
-        self.group_input = QtWidgets.QLineEdit()
-        self.group_input.setPlaceholderText("New group name")
-        self.group_input.returnPressed.connect(self.create_group)
-        self.add_group_btn = QtWidgets.QPushButton("Create")
-        self.add_group_btn.clicked.connect(self.create_group)
-        self.add_group_btn.setStyleSheet("QPushButton { background-color: #2196F3; color: white; }")
-        group_create_layout.addWidget(self.group_input)
-        group_create_layout.addWidget(self.add_group_btn)
-        right_panel.addLayout(group_create_layout)
-
-        self.group_list = QtWidgets.QListWidget()
-        self.group_list.itemSelectionChanged.connect(self.update_group_details)
-        self.group_list.itemDoubleClicked.connect(self.rename_group)
-        right_panel.addWidget(self.group_list)
-
-        # Group details
-        group_detail_layout = QtWidgets.QVBoxLayout()
-        group_detail_layout.addWidget(QtWidgets.QLabel("<b>Group Contents</b>"))
-        self.group_detail = QtWidgets.QListWidget()
-        self.group_detail.setSelectionMode(QtWidgets.QAbstractItemView.MultiSelection)
-        group_detail_layout.addWidget(self.group_detail)
-        right_panel.addLayout(group_detail_layout)
-
-        # Color controls
-        color_layout = QtWidgets.QHBoxLayout()
-        self.color_preview = ColorPreviewWidget()
-        self.color_picker = QtWidgets.QPushButton("Pick Color")
-        self.color_picker.clicked.connect(self.pick_color)
-        self.apply_color_btn = QtWidgets.QPushButton("Apply Color")
-        self.apply_color_btn.clicked.connect(self.apply_color_clicked)
-        self.apply_color_btn.setStyleSheet("QPushButton { background-color: #FF9800; color: white; font-weight: bold; }")
-        
-        color_layout.addWidget(QtWidgets.QLabel("Color:"))
-        color_layout.addWidget(self.color_preview)
-        color_layout.addWidget(self.color_picker)
-        color_layout.addWidget(self.apply_color_btn)
-        right_panel.addLayout(color_layout)
-
-        # Group management buttons
-        group_mgmt_layout = QtWidgets.QHBoxLayout()
-        self.delete_group_btn = QtWidgets.QPushButton("Delete Group")
-        self.delete_group_btn.clicked.connect(self.delete_group)
-        self.delete_group_btn.setStyleSheet("QPushButton { background-color: #f44336; color: white; }")
-        
-        self.clear_group_btn = QtWidgets.QPushButton("Clear Group")
-        self.clear_group_btn.clicked.connect(self.clear_group)
-        
-        self.validate_btn = QtWidgets.QPushButton("Validate Names")
-        self.validate_btn.clicked.connect(self.validate_group_names)
-        self.validate_btn.setStyleSheet("QPushButton { background-color: #FF5722; color: white; }")
-        
-        group_mgmt_layout.addWidget(self.delete_group_btn)
-        group_mgmt_layout.addWidget(self.clear_group_btn)
-        group_mgmt_layout.addWidget(self.validate_btn)
-        right_panel.addLayout(group_mgmt_layout)
-
-        # File controls
-        file_layout = QtWidgets.QHBoxLayout()
-        self.save_btn = QtWidgets.QPushButton("Save Groups")
-        self.load_btn = QtWidgets.QPushButton("Load Groups")
-        self.save_btn.clicked.connect(self.save_groups)
-        self.load_btn.clicked.connect(self.load_groups)
-        file_layout.addWidget(self.save_btn)
-        file_layout.addWidget(self.load_btn)
-        right_panel.addLayout(file_layout)
-
-        content_layout.addLayout(right_panel, 2)
-        main_layout.addLayout(content_layout)
-
-        # Status bar
-        self.status_bar = StatusBar()
-        main_layout.addWidget(self.status_bar)
-
-        self.setLayout(main_layout)
-
-    def filter_layers(self, text):
-        for i in range(self.layer_list.count()):
-            item = self.layer_list.item(i)
-            item.setHidden(text.lower() not in item.text().lower())
-
-    def load_artmeshes(self, artmeshes):
-        self.layer_list.clear()
-        self.current_artmeshes = []
-        for mesh in artmeshes:
-            self.layer_list.addItem(mesh["name"])
-            self.current_artmeshes.append(mesh["name"])
-        self.layer_count_label.setText(f"Layers: {len(artmeshes)}")
-        self.status_bar.show_message(f"Loaded {len(artmeshes)} artmeshes")
-
-    def refresh_artmeshes_clicked(self):
-        """Wrapper to call async refresh from button click"""
+        self.names = list(dict.fromkeys(names))
+        self.min_interval = 1.0 / max_fps
+        self.frames_sent = 0
+        self.frames_coalesced = 0  # Colors replaced before they were sent
+        # Tints shown before streaming started, for revert()
+        self.original = {name: client.tint_state.get(name) or fallback for name in self.names}
+        self._latest = None
+        self._last_sent_at = 0.0
+        self._task = None
+
+    def push(self, r, g, b, a=1.0):
+        if self._latest is not None:
+            self.frames_coalesced += 1
+        self._latest = (r, g, b, a)
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self):
         loop = asyncio.get_event_loop()
-        # Use ensure_future to properly schedule the coroutine
-        asyncio.ensure_future(self.refresh_artmeshes())
+        while self._latest is not None:
+            wait = self._last_sent_at + self.min_interval - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue  # Reverted while waiting?
+            color, self._latest = self._latest, None
+            self._last_sent_at = loop.time()
+            try:
+                await self.client.tint_artmeshes(self.names, *color, chunk_size=len(self.names))
+            except Exception as e:
+                log.warning("Error streaming color: %s", e)
+            self.frames_sent += 1
 
-    async def refresh_artmeshes(self):
-        """Refresh the artmesh list from VTube Studio"""
-        try:
-            self.status_bar.show_message("Refreshing artmeshes...")
-            meshes = await self.client.get_artmeshes()
-            self.load_artmeshes(meshes)
-            self.status_bar.show_message("Artmeshes refreshed successfully")
-        except Exception as e:
-            QtWidgets.QMessageBox.critical(self, "Refresh Error", f"Failed to refresh artmeshes: {str(e)}")
-            self.status_bar.show_message("Refresh failed")
-
-    def validate_group_names(self):
-        """Check which artmesh names in groups are valid"""
-        group_item = self.group_list.currentItem()
-        if not group_item:
-            QtWidgets.QMessageBox.warning(self, "No Group Selected", "Please select a group first.")
-            return
-        
-        group_name = group_item.text()
-        layers = self.groups[group_name]["layers"]
-        
-        if not layers:
-            QtWidgets.QMessageBox.information(self, "Empty Group", "The selected group has no layers.")
-            return
-        
-        valid_names = []
-        invalid_names = []
-        case_mismatch_names = []
-        
-        # Create lowercase lookup for case-insensitive matching
-        artmesh_lookup = {name.lower(): name for name in self.current_artmeshes}
-        
-        for layer in layers:
-            layer_lower = layer.lower()
-            if layer in self.current_artmeshes:
-                # Exact match
-                valid_names.append(layer)
-            elif layer_lower in artmesh_lookup:
-                # Case mismatch - store both the stored name and actual name
-                actual_name = artmesh_lookup[layer_lower]
-                case_mismatch_names.append((layer, actual_name))
-            else:
-                # No match at all
-                invalid_names.append(layer)
-        
-        # Show results
-        message = f"Group: {group_name}\n\n"
-        message += f"Exact matches ({len(valid_names)}):\n"
-        for name in valid_names[:10]:
-            message += f"  ✓ {name}\n"
-        if len(valid_names) > 10:
-            message += f"  ... and {len(valid_names) - 10} more\n"
-        
-        if case_mismatch_names:
-            message += f"\nCase mismatches ({len(case_mismatch_names)}):\n"
-            for stored_name, actual_name in case_mismatch_names[:10]:
-                message += f"  ⚠ '{stored_name}' → '{actual_name}'\n"
-            if len(case_mismatch_names) > 10:
-                message += f"  ... and {len(case_mismatch_names) - 10} more\n"
-        
-        message += f"\nNo matches ({len(invalid_names)}):\n"
-        for name in invalid_names[:10]:
-            message += f"  ✗ {name}\n"
-        if len(invalid_names) > 10:
-            message += f"  ... and {len(invalid_names) - 10} more\n"
-        
-        # Suggest fixing case mismatches
-        if case_mismatch_names:
-            reply = QtWidgets.QMessageBox.question(
-                self, "Fix Case Mismatches?",
-                message + f"\n\nWould you like to automatically fix the {len(case_mismatch_names)} case mismatches?",
-                QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No
-            )
-            
-            if reply == QtWidgets.QMessageBox.Yes:
-                # Fix case mismatches
-                for stored_name, actual_name in case_mismatch_names:
-                    idx = self.groups[group_name]["layers"].index(stored_name)
-                    self.groups[group_name]["layers"][idx] = actual_name
-                
-                self.update_group_details()
-                self.status_bar.show_message(f"Fixed {len(case_mismatch_names)} case mismatches")
-                return
-        
-        # Show suggestions for completely invalid names
-        if invalid_names:
-            message += f"\nSuggestions for invalid names:\n"
-            for invalid_name in invalid_names[:5]:
-                suggestions = self.find_similar_names(invalid_name)
-                if suggestions:
-                    message += f"  '{invalid_name}' → maybe: {', '.join(suggestions[:3])}\n"
-        
-        QtWidgets.QMessageBox.information(self, "Name Validation Results", message)
-
-    def find_similar_names(self, target_name, max_suggestions=3):
-        """Find similar artmesh names using simple string matching"""
-        target_lower = target_name.lower()
-        suggestions = []
-        
-        # Look for names containing parts of the target
-        for name in self.current_artmeshes:
-            name_lower = name.lower()
-            # Check for partial matches
-            if any(part in name_lower for part in target_lower.split('_') if len(part) > 2):
-                suggestions.append(name)
-            elif target_lower in name_lower or name_lower in target_lower:
-                suggestions.append(name)
-        
-        return suggestions[:max_suggestions]
-
-    def create_group(self):
-        name = self.group_input.text().strip()
-        if not name:
-            QtWidgets.QMessageBox.warning(self, "Invalid Input", "Group name cannot be empty.")
-            return
-        if name in self.groups:
-            QtWidgets.QMessageBox.warning(self, "Duplicate Name", "Group name already exists.")
-            return
-        self.groups[name] = {"color": [255, 255, 255], "layers": []}
-        self.group_list.addItem(name)
-        self.group_input.clear()
-        self.status_bar.show_message(f"Created group: {name}")
-
-    def delete_group(self):
-        group_item = self.group_list.currentItem()
-        if not group_item:
-            QtWidgets.QMessageBox.warning(self, "No Selection", "Please select a group to delete.")
-            return
-        
-        group_name = group_item.text()
-        reply = QtWidgets.QMessageBox.question(
-            self, "Confirm Delete", 
-            f"Are you sure you want to delete group '{group_name}'?",
-            QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No
-        )
-        
-        if reply == QtWidgets.QMessageBox.Yes:
-            del self.groups[group_name]
-            self.group_list.takeItem(self.group_list.row(group_item))
-            self.group_detail.clear()
-            self.status_bar.show_message(f"Deleted group: {group_name}")
-
-    def clear_group(self):
-        group_item = self.group_list.currentItem()
-        if not group_item:
-            QtWidgets.QMessageBox.warning(self, "No Selection", "Please select a group to clear.")
-            return
-        
-        group_name = group_item.text()
-        self.groups[group_name]["layers"] = []
-        self.update_group_details()
-        self.status_bar.show_message(f"Cleared group: {group_name}")
-
-    def rename_group(self, item):
-        old_name = item.text()
-        new_name, ok = QtWidgets.QInputDialog.getText(
-            self, "Rename Group", "Enter new group name:", text=old_name
-        )
-        
-        if ok and new_name.strip() and new_name != old_name:
-            new_name = new_name.strip()
-            if new_name in self.groups:
-                QtWidgets.QMessageBox.warning(self, "Duplicate Name", "Group name already exists.")
-                return
-            
-            self.groups[new_name] = self.groups.pop(old_name)
-            item.setText(new_name)
-            self.status_bar.show_message(f"Renamed group: {old_name} → {new_name}")
-
-    def update_group_details(self):
-        self.group_detail.clear()
-        group_item = self.group_list.currentItem()
-        if not group_item:
-            return
-        
-        group_name = group_item.text()
-        layers = self.groups[group_name]["layers"]
-        
-        # Add visual indicators for valid/invalid names
-        for layer in layers:
-            item = QtWidgets.QListWidgetItem()
-            if layer in self.current_artmeshes:
-                item.setText(f"✓ {layer}")
-                item.setForeground(QtGui.QColor(0, 150, 0))  # Green for valid
-            else:
-                item.setText(f"✗ {layer}")
-                item.setForeground(QtGui.QColor(200, 0, 0))  # Red for invalid
-            self.group_detail.addItem(item)
-        
-        # Update color preview
-        color_rgb = self.groups[group_name]["color"]
-        color = QtGui.QColor(color_rgb[0], color_rgb[1], color_rgb[2])
-        self.color_preview.set_color(color)
-        self.selected_color = color
-
-    def assign_selected_layers(self):
-        group_item = self.group_list.currentItem()
-        if not group_item:
-            QtWidgets.QMessageBox.warning(self, "No Group Selected", "Please select a group first.")
-            return
-        
-        group_name = group_item.text()
-        selected_layers = [item.text() for item in self.layer_list.selectedItems()]
-        
-        if not selected_layers:
-            QtWidgets.QMessageBox.warning(self, "No Layers Selected", "Please select layers to assign.")
-            return
-        
-        added_count = 0
-        for layer in selected_layers:
-            if layer not in self.groups[group_name]["layers"]:
-                self.groups[group_name]["layers"].append(layer)
-                added_count += 1
-        
-        self.update_group_details()
-        self.status_bar.show_message(f"Added {added_count} layers to {group_name}")
-
-    def remove_selected_layers(self):
-        group_item = self.group_list.currentItem()
-        if not group_item:
-            QtWidgets.QMessageBox.warning(self, "No Group Selected", "Please select a group first.")
-            return
-        
-        group_name = group_item.text()
-        selected_items = self.group_detail.selectedItems()
-        
-        if not selected_items:
-            QtWidgets.QMessageBox.warning(self, "No Layers Selected", "Please select layers to remove.")
-            return
-        
-        # Extract actual layer names (remove the ✓/✗ prefix)
-        selected_layers = []
-        for item in selected_items:
-            text = item.text()
-            if text.startswith('✓ ') or text.startswith('✗ '):
-                layer_name = text[2:]  # Remove prefix
-            else:
-                layer_name = text
-            selected_layers.append(layer_name)
-        
-        for layer in selected_layers:
-            if layer in self.groups[group_name]["layers"]:
-                self.groups[group_name]["layers"].remove(layer)
-        
-        self.update_group_details()
-        self.status_bar.show_message(f"Removed {len(selected_layers)} layers from {group_name}")
-
-    def pick_color(self):
-        color = QtWidgets.QColorDialog.getColor(self.selected_color)
-        if color.isValid():
-            self.selected_color = color
-            self.color_preview.set_color(color)
-
-    def apply_color_clicked(self):
-        """Wrapper to call async apply_color from button click"""
+    async def drain(self):
+        """Wait until the newest pushed color has been sent"""
+        if self._task is not None:
+            await self._task
+
+    async def revert(self):
+        """Drop pending colors and restore the tints shown before streaming"""
+        self._latest = None
+        await self.drain()
+        await self.client.restore_tints(self.original)
+
+
+def blend_color(start, end, t):
+    """Color ``t`` of the way from ``start`` to ``end`` (0-255 components)"""
+    return tuple(round(a + (b - a) * t) for a, b in zip(start, end))
+
+
+class ColorAnimation:
+    """Base class for animations over a fixed list of artmeshes.
+
+    ``frame(elapsed)`` returns ``{name: (r, g, b)}`` (0-255) for a time in
+    seconds. A ``duration`` of None runs until the animation is stopped.
+    """
+
+    def __init__(self, names, duration=None):
+        self.names = list(dict.fromkeys(names))
+        self.duration = duration
+
+    def finished(self, elapsed):
+        return self.duration is not None and elapsed >= self.duration
+
+    def frame(self, elapsed):
+        raise NotImplementedError
+
+
+class Fade(ColorAnimation):
+    """Move every mesh from ``start`` to ``end`` over ``duration`` seconds"""
+
+    def __init__(self, names, start, end, duration=1.0):
+        super().__init__(names, duration)
+        self.start = start
+        self.end = end
+
+    def frame(self, elapsed):
+        t = min(1.0, elapsed / self.duration) if self.duration else 1.0
+        color = blend_color(self.start, self.end, t)
+        return dict.fromkeys(self.names, color)
+
+
+class Pulse(ColorAnimation):
+    """Breathe between ``low`` and ``high`` once every ``period`` seconds"""
+
+    def __init__(self, names, low, high, period=2.0, duration=None):
+        super().__init__(names, duration)
+        self.low = low
+        self.high = high
+        self.period = period
+
+    def frame(self, elapsed):
+        t = 0.5 - 0.5 * math.cos(2 * math.pi * elapsed / self.period)
+        return dict.fromkeys(self.names, blend_color(self.low, self.high, t))
+
+
+class Gradient(ColorAnimation):
+    """Spread ``start`` -> ``end`` along the meshes in list order.
+
+    The gradient is cut into ``steps`` bands so a long group only needs a
+    handful of requests. With a ``period`` the gradient is mirrored
+    (start -> end -> start) and scrolls once per period; without one it is
+    drawn once.
+    """
+
+    def __init__(self, names, start, end, steps=GRADIENT_STEPS, period=None, duration=0.0):
+        super().__init__(names, duration)
+        self.period = period
+        self.steps = max(1, steps)
+        self.bands = [
+            blend_color(start, end, i / (self.steps - 1) if self.steps > 1 else 0.0)
+            for i in range(self.steps)
+        ]
+        last = max(1, len(self.names) - 1)
+        self.positions = [i / last for i in range(len(self.names))]
+
+    def frame(self, elapsed):
+        offset = (elapsed / self.period) % 1.0 if self.period else 0.0
+        bands, steps = self.bands, self.steps
+        colors = {}
+        for name, position in zip(self.names, self.positions):
+            if self.period:
+                # Fold every frame, including the first, so the bands scroll
+                # start -> end -> start without a seam or a jump at offset 0
+                position = (position + offset) % 1.0
+                position = 1.0 - abs(2.0 * position - 1.0)
+            colors[name] = bands[min(steps - 1, int(position * steps))]
+        return colors
+
+
+class Animator:
+    """Drive color animations at a steady frame rate.
+
+    Each tick the colors of all running animations are computed, meshes
+    that end up with the same color are merged into shared batched
+    requests (``tint_scene``), and only meshes whose color changed are
+    sent. When a frame takes longer than a tick the missed ticks are
+    dropped rather than queued, so the model never lags behind the clock.
+    """
+
+    def __init__(self, client, fps=ANIMATION_FPS):
+        self.client = client
+        self.fps = fps
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self._animations = []  # (animation, start time)
+        self._frame_times = deque(maxlen=max(2, fps))
+        self._task = None
+
+    @property
+    def running(self):
+        return bool(self._animations)
+
+    @property
+    def achieved_fps(self):
+        """Frame rate over roughly the last second"""
+        times = self._frame_times
+        if len(times) < 2 or times[-1] == times[0]:
+            return 0.0
+        return (len(times) - 1) / (times[-1] - times[0])
+
+    def start(self, animation):
+        """Run ``animation``, replacing running ones that share meshes with it"""
+        names = set(animation.names)
+        self._animations = [
+            (running, started) for running, started in self._animations
+            if names.isdisjoint(running.names)
+        ]
+        self._animations.append((animation, asyncio.get_event_loop().time()))
+        if self._task is None or self._task.done():
+            self._frame_times.clear()
+            self._task = asyncio.ensure_future(self._run())
+
+    def stop(self):
+        """Stop all animations, leaving meshes at their current colors"""
+        self._animations = []
+
+    async def wait(self):
+        """Wait until every animation has finished or been stopped"""
+        if self._task is not None:
+            await self._task
+
+    async def _run(self):
         loop = asyncio.get_event_loop()
-        # Use ensure_future to properly schedule the coroutine
-        asyncio.ensure_future(self.apply_color_to_selected_group())
+        interval = 1.0 / self.fps
+        next_tick = loop.time()
+        while self._animations:
+            now = loop.time()
+            if now - next_tick >= interval:
+                missed = int((now - next_tick) / interval)
+                self.frames_dropped += missed
+                next_tick += missed * interval
 
-    async def apply_color_to_selected_group(self):
-        group_item = self.group_list.currentItem()
-        if not group_item:
-            QtWidgets.QMessageBox.warning(self, "No Group Selected", "Please select a group first.")
-            return
-        
-        group_name = group_item.text()
-        layers = self.groups[group_name]["layers"]
-        
-        if not layers:
-            QtWidgets.QMessageBox.warning(self, "Empty Group", "The selected group has no layers.")
-            return
-        
-        # Create case-insensitive lookup
-        artmesh_lookup = {name.lower(): name for name in self.current_artmeshes}
-        
-        # Filter and fix case issues
-        valid_layers = []
-        case_fixed_layers = []
-        invalid_layers = []
-        
-        for layer in layers:
-            layer_lower = layer.lower()
-            if layer in self.current_artmeshes:
-                # Exact match
-                valid_layers.append(layer)
-            elif layer_lower in artmesh_lookup:
-                # Case mismatch - use the correct case
-                correct_name = artmesh_lookup[layer_lower]
-                valid_layers.append(correct_name)
-                case_fixed_layers.append((layer, correct_name))
-            else:
-                # No match
-                invalid_layers.append(layer)
-        
-        if not valid_layers:
-            QtWidgets.QMessageBox.warning(
-                self, "No Valid Names", 
-                f"None of the {len(layers)} artmesh names in this group are currently valid.\n\n"
-                f"Use 'Validate Names' to see suggestions or 'Refresh Artmeshes' to update the list."
-            )
-            return
-        
-        # Show case fixes if any
-        if case_fixed_layers:
-            QtWidgets.QMessageBox.information(
-                self, "Case Mismatches Fixed",
-                f"Fixed {len(case_fixed_layers)} case mismatches automatically:\n" +
-                '\n'.join([f"'{old}' → '{new}'" for old, new in case_fixed_layers[:5]]) +
-                (f"\n... and {len(case_fixed_layers) - 5} more" if len(case_fixed_layers) > 5 else "")
-            )
-        
-        if invalid_layers:
-            reply = QtWidgets.QMessageBox.question(
-                self, "Invalid Names Found",
-                f"Group contains {len(invalid_layers)} invalid artmesh names.\n\n"
-                f"Continue with {len(valid_layers)} valid names only?",
-                QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No
-            )
-            if reply != QtWidgets.QMessageBox.Yes:
-                return
+            mesh_colors = {}
+            for animation, started in list(self._animations):
+                elapsed = now - started
+                if animation.duration is not None:
+                    elapsed = min(elapsed, animation.duration)
+                mesh_colors.update(animation.frame(elapsed))
+                if animation.finished(now - started):
+                    self._animations.remove((animation, started))
 
-        color = self.selected_color
-        self.groups[group_name]["color"] = [color.red(), color.green(), color.blue()]
+            try:
+                await self.client.tint_scene(mesh_colors)
+            except Exception as e:
+                log.warning("Error sending animation frame: %s", e)
+            self.frames_sent += 1
+            self._frame_times.append(loop.time())
 
-        # Convert to float values (0.0 to 1.0)
-        r, g, b, a = color.redF(), color.greenF(), color.blueF(), 1.0
-        
-        print(f"Applying color ({r:.3f}, {g:.3f}, {b:.3f}, {a:.3f}) to group '{group_name}' with {len(valid_layers)} valid layers")
-        self.status_bar.show_message(f"Applying colors to {len(valid_layers)} layers...")
-        
-        try:
-            success_count = 0
-            failed_layers = []
-            
-            for name in valid_layers:
+            next_tick += interval
+            delay = next_tick - loop.time()
+            if delay > 0 and self._animations:
+                await asyncio.sleep(delay)
+
+
+def parse_control_command(path, params):
+    """Turn a control request into a command dict, or raise ValueError.
+
+    ``/apply`` takes ``group`` and an optional ``color`` (``#rrggbb`` or
+    ``[r, g, b]``; the group's stored color when missing). ``/scene``
+    applies every group.
+    """
+    if path == "/scene":
+        return {"action": "scene"}
+    group = params.get("group")
+    if not isinstance(group, str) or not group:
+        raise ValueError("missing group")
+    color = params.get("color")
+    if isinstance(color, str):
+        palette = parse_palette(color)
+        if len(palette) != 1:
+            raise ValueError("expected one #rrggbb color")
+        color = list(palette[0])
+    elif color is not None:
+        if (not isinstance(color, list) or len(color) != 3
+                or not all(isinstance(c, int) and 0 <= c <= 255 for c in color)):
+            raise ValueError("color must be #rrggbb or [r, g, b] with 0-255 values")
+    return {"action": "apply", "group": group, "color": color}
+
+
+async def run_control_command(client, groups, command):
+    """Tint what ``command`` asks for; returns ``(tinted, failed, unchanged)``.
+
+    An apply with a color only changes the live tint, not the stored group.
+    """
+    if command["action"] == "scene":
+        scene = groups
+    else:
+        group = groups.get(command["group"])
+        if group is None:
+            raise ValueError(f"unknown group: {command['group']}")
+        scene = {command["group"]: dict(group, color=command["color"] or group["color"])}
+    mesh_colors, _ = resolve_scene(scene, client.catalog)
+    return await client.tint_scene(mesh_colors)
+
+
+class ControlServer:
+    """Local HTTP endpoint that lets chat bots and stream decks trigger colors.
+
+        POST /apply  {"group": "hair", "color": "#ff0000"}
+        POST /scene
+        GET  /apply?group=hair&color=ff0000
+        GET  /status
+
+    Requests are answered right away (202) and run one at a time by
+    ``handler(command)`` on the event loop. ``validate(command)`` may
+    raise ValueError to reject a command (400) before it is queued; an
+    OSError (e.g. groups that can't be read) answers 500. While
+    ``ready()`` returns False commands are refused with a 503. Commands
+    for a target that is already waiting replace it (latest wins, keeping
+    its place in line), so a burst for one group costs one tint. At most
+    ``max_pending`` targets wait; beyond that new targets are shed with a
+    503, which keeps trigger-to-tint latency flat under spam.
+    """
+
+    COUNTERS = ("received", "queued", "coalesced", "shed", "executed", "failed", "rejected", "unavailable",
+                "errors")
+
+    def __init__(self, handler, port=CONTROL_PORT, max_pending=CONTROL_MAX_PENDING, host=CONTROL_HOST,
+                 validate=None, ready=None):
+        self.handler = handler
+        self.validate = validate
+        self.ready = ready
+        self.host = host
+        self.port = port
+        self.max_pending = max_pending
+        self.latency = LatencyHistogram()  # Receipt of the command that ran -> tint done
+        self.counts = Counter()  # See COUNTERS
+        self._pending = {}  # target -> (command, received); insertion order is run order
+        self._wakeup = None
+        self._server = None
+        self._worker = None
+
+    async def start(self):
+        """Start listening; with ``port=0`` a free port is picked"""
+        self._wakeup = asyncio.Event()
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._worker = asyncio.ensure_future(self._run())
+        log.info("Control endpoint listening on http://%s:%d", self.host, self.port)
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        self._pending.clear()
+
+    def submit(self, command):
+        """Queue ``command``; returns "queued", "coalesced" or "shed" """
+        target = (command["action"], command.get("group"))
+        self.counts["received"] += 1
+        if target in self._pending:
+            self._pending[target] = (command, time.perf_counter())
+            self.counts["coalesced"] += 1
+            return "coalesced"
+        if len(self._pending) >= self.max_pending:
+            self.counts["shed"] += 1
+            return "shed"
+        self._pending[target] = (command, time.perf_counter())
+        self.counts["queued"] += 1
+        self._wakeup.set()
+        return "queued"
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._pending:
+                target = next(iter(self._pending))
+                command, received = self._pending.pop(target)
                 try:
-                    # Try nameExact first
-                    result = await self.client.tint_artmesh_exact(name, r, g, b, a)
-                    
-                    # Check the actual matchedArtMeshes count
-                    success = False
-                    if isinstance(result.get("data"), dict):
-                        matched_count = result["data"].get("matchedArtMeshes", 0)
-                        success = matched_count > 0
-                    
-                    if success:
-                        success_count += 1
-                        print(f"✓ Successfully tinted: {name} (matched {matched_count} meshes)")
-                    else:
-                        # Try nameContains as fallback
-                        print(f"Exact match failed for {name}, trying contains match...")
-                        result = await self.client.tint_artmesh_contains(name, r, g, b, a)
-                        
-                        if isinstance(result.get("data"), dict):
-                            matched_count = result["data"].get("matchedArtMeshes", 0)
-                            success = matched_count > 0
-                        
-                        if success:
-                            success_count += 1
-                            print(f"✓ Successfully tinted (contains): {name} (matched {matched_count} meshes)")
-                        else:
-                            failed_layers.append(name)
-                            print(f"✗ Failed both exact and contains: {name}")
-                            
+                    await self.handler(command)
+                    self.counts["executed"] += 1
                 except Exception as e:
-                    failed_layers.append(name)
-                    print(f"✗ Exception tinting {name}: {e}")
-                
-                # Small delay to avoid overwhelming the API
-                await asyncio.sleep(0.05)
-            
-            # Show results
-            if success_count > 0:
-                self.status_bar.show_message(
-                    f"Applied color to {success_count}/{len(valid_layers)} layers"
-                )
-                if failed_layers:
-                    QtWidgets.QMessageBox.information(
-                        self, "Partial Success",
-                        f"Successfully colored {success_count} layers.\n"
-                        f"Failed to color {len(failed_layers)} layers:\n" +
-                        '\n'.join(failed_layers[:10]) +
-                        (f"\n... and {len(failed_layers) - 10} more" if len(failed_layers) > 10 else "")
-                    )
-            else:
-                self.status_bar.show_message("No artmeshes were colored")
-                QtWidgets.QMessageBox.warning(
-                    self, "No Success", 
-                    f"None of the {len(valid_layers)} layers were successfully colored.\n\n"
-                    f"Debug info for troubleshooting:\n" +
-                    f"First few layer names: {', '.join(valid_layers[:3])}\n\n"
-                    f"Try refreshing the artmesh list or check if the correct model is loaded."
+                    self.counts["failed"] += 1
+                    log.warning("Control command %s failed: %s", command, e)
+                self.latency.record((time.perf_counter() - received) * 1000)
+
+    def stats(self):
+        return dict(
+            {key: self.counts[key] for key in self.COUNTERS},
+            pending=len(self._pending),
+            latency=self.latency.to_dict(),
+        )
+
+    def _dispatch(self, method, target, body):
+        """Route one request; returns ``(status, payload)``"""
+        url = urlsplit(target)
+        if url.path == "/status":
+            return (HTTPStatus.OK, self.stats()) if method == "GET" else (HTTPStatus.METHOD_NOT_ALLOWED, {})
+        if url.path not in ("/apply", "/scene"):
+            return HTTPStatus.NOT_FOUND, {"error": f"unknown path: {url.path}"}
+        if method not in ("GET", "POST"):
+            return HTTPStatus.METHOD_NOT_ALLOWED, {}
+        if self.ready is not None and not self.ready():
+            self.counts["unavailable"] += 1
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": "not connected to VTube Studio yet"}
+
+        params = dict(parse_qsl(url.query))
+        try:
+            if body:
+                data = json.loads(body)
+                if not isinstance(data, dict):
+                    raise ValueError("body must be a JSON object")
+                params.update(data)
+            command = parse_control_command(url.path, params)
+            if self.validate is not None:
+                self.validate(command)
+        except ValueError as e:
+            self.counts["rejected"] += 1
+            return HTTPStatus.BAD_REQUEST, {"error": str(e)}
+        except OSError as e:
+            self.counts["errors"] += 1
+            log.warning("Control command %s could not be checked: %s", url.path, e)
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}
+
+        status = self.submit(command)
+        code = HTTPStatus.SERVICE_UNAVAILABLE if status == "shed" else HTTPStatus.ACCEPTED
+        return code, {"status": status, "pending": len(self._pending)}
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), CONTROL_IDLE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line:
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                length = int(headers.get("content-length") or 0)
+                if length > CONTROL_MAX_BODY:
+                    status, payload, keep_alive = HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {}, False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    status, payload = self._dispatch(method, target, body)
+
+                raw = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(raw)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + raw
                 )
-                
-        except Exception as e:
-            error_msg = f"Failed to apply colors: {str(e)}"
-            QtWidgets.QMessageBox.critical(self, "Error", error_msg)
-            self.status_bar.show_message("Color application failed")
-            print(f"Exception in apply_color_to_selected_group: {e}")
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass  # Malformed request or client went away
+        finally:
+            writer.close()
+
+
+# Exit codes for the command-line mode
+EXIT_OK = 0
+EXIT_PARTIAL = 1  # Some layers could not be tinted
+EXIT_USAGE = 2  # Bad arguments or unknown groups (also used by argparse)
+EXIT_CONNECTION = 3  # Could not connect to or authenticate with VTube Studio
+
+
+def parse_instance(spec):
+    """``NAME=URI`` (or just a URI) from the command line to ``(name, uri)``"""
+    name, sep, uri = spec.partition("=")
+    if not sep:
+        name, uri = spec, spec
+    if not name or not re.match(r"^wss?://", uri):
+        raise argparse.ArgumentTypeError(f"expected NAME=ws://HOST:PORT, got {spec!r}")
+    return name, uri
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(
+        description="Recolor VTube Studio artmesh groups. Starts the GUI when no action is given."
+    )
+    action = parser.add_mutually_exclusive_group()
+    action.add_argument("--apply", nargs="+", metavar="GROUP",
+                        help="apply the stored colors of one or more groups and exit")
+    action.add_argument("--scene", action="store_true",
+                        help="apply every group (the whole scene) and exit")
+    action.add_argument("--list-groups", action="store_true",
+                        help="print the groups in the groups file and exit")
+    action.add_argument("--serve", action="store_true",
+                        help="run only the local control endpoint (no GUI) until interrupted")
+    parser.add_argument("--groups-file",
+                        help="read groups from this file instead of the saved groups of the loaded model")
+    parser.add_argument("--instance", action="append", type=parse_instance, metavar="NAME=URI",
+                        help="VTube Studio instance to apply to, repeat for several "
+                             f"(default: {DEFAULT_URI}); all are updated at once")
+    parser.add_argument("--control-port", type=int, metavar="PORT",
+                        help="serve the local control endpoint for bots and stream decks on PORT "
+                             f"(with --serve the default is {CONTROL_PORT}; the GUI only serves it when given)")
+    parser.add_argument("--force", action="store_true",
+                        help="send every layer even if it already has the color")
+    parser.add_argument("--log-level", default="info", choices=["debug", "info", "warning", "error"],
+                        help="how much to log to stderr (default: info; debug logs every request)")
+    parser.add_argument("--log-json", action="store_true",
+                        help="log one JSON object per line instead of plain text")
+    parser.add_argument("--metrics-out", metavar="FILE",
+                        help="write request latency/size metrics as JSON to FILE after applying")
+    return parser
+
+
+def _print_groups(groups):
+    for name, group in groups.items():
+        rules = f" + rules {json.dumps(group['rules'])}" if group.get("rules") else ""
+        print(f"{name}: {len(group['layers'])} layers{rules}, color {group['color']}")
+
+
+async def serve_control(args, groups, store):
+    """Keep one client connected and run control commands until cancelled"""
+    if args.instance and len(args.instance) > 1:
+        print("--serve drives a single instance", file=sys.stderr)
+        return EXIT_USAGE
+    uri = args.instance[0][1] if args.instance else DEFAULT_URI
+    client = VTubeStudioClient(uri, token_file_for(uri))
+    catalog_loaded = asyncio.Event()  # Commands get a 503 until the live artmesh list is in
+
+    def current_groups():
+        return groups if groups is not None else store.load(client.catalog.model_id or DEFAULT_GROUPS_MODEL)
 
-    def save_groups(self):
+    def validate(command):
+        if command["action"] == "apply" and command["group"] not in current_groups():
+            raise ValueError(f"unknown group: {command['group']}")
+
+    async def refresh_artmeshes():
         try:
-            with open(GROUPS_FILE, "w") as f:
-                json.dump(self.groups, f, indent=4)
-            self.status_bar.show_message("Groups saved successfully")
+            await client.get_artmeshes()
         except Exception as e:
-            QtWidgets.QMessageBox.critical(self, "Save Error", f"Failed to save groups: {str(e)}")
+            log.warning("Failed to load artmeshes: %s", e)
+            return
+        catalog_loaded.set()
+
+    def on_state(state):
+        if state == "connected":
+            asyncio.ensure_future(refresh_artmeshes())
+
+    async def on_model_loaded(data):
+        if data.get("modelLoaded"):
+            await refresh_artmeshes()
+
+    async def execute(command):
+        started = time.perf_counter()
+        tinted, failed, unchanged = await run_control_command(client, current_groups(), command)
+        log.info("%s: %d tinted, %d up to date, %d failed in %.1f ms",
+                 command.get("group") or "scene", len(tinted), len(unchanged), len(failed),
+                 (time.perf_counter() - started) * 1000)
+
+    client.add_state_handler(on_state)
+    client.add_event_handler("ModelLoadedEvent", on_model_loaded)
+    client.start_supervisor()
+
+    port = CONTROL_PORT if args.control_port is None else args.control_port
+    server = ControlServer(execute, port, validate=validate, ready=catalog_loaded.is_set)
+    try:
+        await server.start()
+    except OSError as e:
+        print(f"Failed to start the control endpoint: {e}", file=sys.stderr)
+        await client.shutdown()
+        return EXIT_USAGE
+    print(f"Control endpoint on http://{server.host}:{server.port} (Ctrl+C to stop)")
+    try:
+        await asyncio.Future()
+    finally:
+        await server.stop()
+        await client.shutdown()
+        if args.metrics_out:
+            client.metrics.export_json(args.metrics_out, {"control": server.stats()})
+
+
+async def run_cli(args):
+    """Apply groups without the GUI; returns a process exit code"""
+    started = time.perf_counter()
+    store = GroupStore()
+
+    try:
+        if args.list_groups:
+            if args.groups_file:
+                _print_groups(load_groups_file(args.groups_file))
+            else:
+                models = store.models() or {DEFAULT_GROUPS_MODEL: {}}
+                for model_id, entry in models.items():
+                    print(f"[{entry.get('name') or model_id or 'default'}]")
+                    _print_groups(store.load(model_id))
+            return EXIT_OK
+
+        groups = load_groups_file(args.groups_file) if args.groups_file else None
+    except (OSError, ValueError) as e:
+        print(f"Failed to load groups: {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    if args.serve:
+        return await serve_control(args, groups, store)
+
+    pool = ClientPool()
+    try:
+        for name, uri in args.instance or [("default", DEFAULT_URI)]:
+            pool.add(name, uri)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return EXIT_USAGE
+    multi = len(pool.clients) > 1
+
+    try:
+        connections = await pool.connect()
+        connected = time.perf_counter()
+        for name, outcome in connections.items():
+            if not outcome["ok"]:
+                prefix = f"{name}: " if multi else ""
+                print(f"{prefix}Failed to initialize: {outcome['error']}", file=sys.stderr)
+        online = [name for name, outcome in connections.items() if outcome["ok"]]
+        if not online:
+            return EXIT_CONNECTION
 
-    def load_groups(self):
-        if not os.path.exists(GROUPS_FILE):
-            return  # Silent fail on startup
-        
         try:
-            with open(GROUPS_FILE, "r") as f:
-                self.groups = json.load(f)
-            self.group_list.clear()
-            for name in self.groups.keys():
-                self.group_list.addItem(name)
-            self.group_detail.clear()
-            self.status_bar.show_message("Groups loaded successfully")
-        except Exception as e:
-            QtWidgets.QMessageBox.critical(self, "Load Error", f"Failed to load groups: {str(e)}")
-
-
-class AppInitializer(QtCore.QObject):
-    def __init__(self, app):
-        super().__init__()
-        self.app = app
-        self.client = None
-        self.window = None
-
-    async def initialize(self):
-        self.client = VTubeStudioClient()
-        
-        # Show a simple connection dialog
-        progress = QtWidgets.QProgressDialog("Connecting to VTube Studio...", "Cancel", 0, 0)
-        progress.setWindowModality(QtCore.Qt.WindowModal)
-        progress.show()
-        self.app.processEvents()
-        
+            scenes = {name: groups if groups is not None else pool.groups_for(name, store) for name in online}
+        except (OSError, ValueError) as e:
+            print(f"Failed to load groups: {e}", file=sys.stderr)
+            return EXIT_USAGE
+
+        if args.apply:
+            for name, instance_groups in scenes.items():
+                unknown = [group for group in args.apply if group not in instance_groups]
+                if unknown:
+                    where = f" on {name}" if multi else ""
+                    print(f"Unknown groups{where}: {', '.join(unknown)}", file=sys.stderr)
+                    return EXIT_USAGE
+            # Keep stored order so overlapping groups resolve the same way as in the GUI
+            scenes = {
+                name: {group: value for group, value in instance_groups.items() if group in args.apply}
+                for name, instance_groups in scenes.items()
+            }
+
+        results = await pool.apply_groups(scenes, force=args.force)
+        finished = time.perf_counter()
+    finally:
+        await pool.close()
+
+    exit_code = EXIT_OK if len(online) == len(pool.clients) else EXIT_PARTIAL
+    for name, outcome in results.items():
+        client = pool.clients[name]
+        if multi:
+            print(f"[{name}] {client.catalog.model_name or 'no model'} at {client.uri}")
+        if not outcome["ok"]:
+            print(f"Apply failed: {outcome['error']}", file=sys.stderr)
+            exit_code = EXIT_PARTIAL
+            continue
+        result = outcome["result"]
+        print(f"Groups: {len(scenes[name])}, layers: {result['layers']} in {result['colors']} colors")
+        print(f"Tinted: {len(result['tinted'])}, already up to date: {len(result['unchanged'])}, "
+              f"failed: {len(result['failed'])}, invalid names skipped: {len(result['invalid'])}")
+        print(f"Requests sent: {client.requests_sent}")
+        if multi:
+            print(f"Connect: {connections[name]['seconds'] * 1000:.1f} ms, "
+                  f"apply: {outcome['seconds'] * 1000:.1f} ms")
+        for mesh_name in result["failed"]:
+            print(f"  failed: {mesh_name}", file=sys.stderr)
+        if result["failed"]:
+            exit_code = EXIT_PARTIAL
+
+    if multi:
+        print(f"All {len(online)}/{len(pool.clients)} instances:")
+    print(f"Connect: {(connected - started) * 1000:.1f} ms, "
+          f"apply: {(finished - connected) * 1000:.1f} ms, "
+          f"total: {(finished - started) * 1000:.1f} ms")
+    if args.metrics_out:
         try:
-            connected = await self.client.connect()
-            if not connected:
-                progress.close()
-                QtWidgets.QMessageBox.critical(None, "Connection Error", 
-                                             "Failed to connect to VTube Studio. Make sure VTube Studio is running and the API is enabled.")
-                self.app.quit()
-                return
-            
-            await self.client.authenticate()
-            meshes = await self.client.get_artmeshes()
-            
-            progress.close()
-            
-            self.window = MainWindow(self.client)
-            self.window.load_artmeshes(meshes)
-            self.window.show()
-            
-        except Exception as e:
-            progress.close()
-            QtWidgets.QMessageBox.critical(None, "Error", f"Failed to initialize: {str(e)}")
-            self.app.quit()
+            if multi:
+                write_json_atomic(args.metrics_out, {"instances": pool.metrics_snapshot()})
+            else:
+                pool.clients[online[0]].metrics.export_json(args.metrics_out)
+        except OSError as e:
+            print(f"Failed to write metrics: {e}", file=sys.stderr)
+
+    return exit_code
+
 
 def main():
-    app = QtWidgets.QApplication(sys.argv)
-    
-    # Set up the event loop
-    loop = qasync.QEventLoop(app)
-    asyncio.set_event_loop(loop)
-    
-    # Initialize the application
-    initializer = AppInitializer(app)
-    
-    # Start initialization
-    loop.create_task(initializer.initialize())
-    
-    # Run the event loop
-    with loop:
-        loop.run_forever()
+    args = build_arg_parser().parse_args()
+    configure_logging(args.log_level, args.log_json)
+    if args.apply or args.scene or args.list_groups or args.serve:
+        try:
+            sys.exit(asyncio.run(run_cli(args)))
+        except KeyboardInterrupt:
+            sys.exit(EXIT_OK)
+
+    # Qt is only needed (and only imported) for the GUI. Register this
+    # module under its import name so the GUI shares it when run as a script.
+    sys.modules.setdefault("vtube_recolor_tool", sys.modules[__name__])
+    from vtube_recolor_gui import run_gui
+    run_gui(control_port=args.control_port)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()